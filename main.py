@@ -22,6 +22,8 @@ if 'show_success' not in st.session_state:
     st.session_state.show_success = False
 if 'last_journey' not in st.session_state:
     st.session_state.last_journey = None
+if 'vehicle' not in st.session_state:
+    st.session_state.vehicle = utils.DEFAULT_VEHICLE
 if 'carbon_offsets' not in st.session_state:
     st.session_state.carbon_offsets = []
 if 'offset_selected' not in st.session_state:
@@ -1518,21 +1520,46 @@ def main():
                         "Environmental Impact": "🌍 Environmental Impact",
                         "Eco-Challenges": "🌱 Eco-Challenges"
                     }.get(x, x))
+        
+        show_vehicle_selector()
     
-    # Load existing data
-    df = load_data()
-    
-    # Display the selected page
+    # Display the selected page, loading only the journey data it needs for the selected vehicle
+    vehicle = st.session_state.vehicle
     if page == "Add Journey":
-        show_journey_form(df)
+        show_journey_form()
     elif page == "View History":
-        show_journey_history(df)
+        show_journey_history(utils.get_journey_frame(vehicle=vehicle))
     elif page == "Statistics":
-        show_statistics(df)
+        show_statistics(load_data(columns=utils.ANALYSIS_COLUMNS, vehicle=vehicle))
     elif page == "Environmental Impact":
         display_achievements_dashboard()
     elif page == "Eco-Challenges":
-        display_eco_challenges(df)
+        display_eco_challenges(load_data(columns=utils.ANALYSIS_COLUMNS, vehicle=vehicle))
+
+def format_vehicle(vehicle):
+    """Display name of a vehicle id"""
+    return "🚗 My Car" if vehicle == utils.DEFAULT_VEHICLE else f"🚙 {vehicle.replace('_', ' ')}"
+
+def show_vehicle_selector():
+    """Sidebar selector for the vehicle whose journeys are shown and recorded"""
+    st.markdown("<div class='sidebar-title'>🚙 Vehicle</div>", unsafe_allow_html=True)
+    vehicles = utils.list_vehicles()
+    if st.session_state.vehicle not in vehicles:
+        st.session_state.vehicle = utils.DEFAULT_VEHICLE
+    
+    st.session_state.vehicle = st.selectbox(
+        "Vehicle",
+        vehicles,
+        index=vehicles.index(st.session_state.vehicle),
+        format_func=format_vehicle,
+        label_visibility="collapsed"
+    )
+    
+    with st.expander("➕ Add Vehicle"):
+        new_vehicle = st.text_input("Vehicle name")
+        if st.button("Add Vehicle") and new_vehicle.strip():
+            st.session_state.vehicle = utils.add_vehicle(new_vehicle)
+            st.experimental_rerun()
 
 def display_carbon_offset_options(co2_emissions):
     """Display carbon offset options with interactive animations."""
@@ -2407,7 +2434,7 @@ def display_journey_summary(journey_data):
                 st.balloons()  # Show balloons for added fun
                 display_carbon_offset_options(co2)
 
-def show_journey_form(df):
+def show_journey_form():
     # Apply form styling
     st.markdown("""
     <style>
@@ -2590,14 +2617,54 @@ def show_journey_form(df):
                     # Store the journey data in session state for summary display
                     st.session_state.last_journey = new_journey
                     
-                    df = pd.concat([df, pd.DataFrame([new_journey])], ignore_index=True)
-                    save_data(df)
+                    utils.append_journey(new_journey, vehicle=st.session_state.vehicle)
                     st.success("Journey recorded successfully!")
                     st.session_state.show_success = True
                     st.experimental_rerun()  # Rerun to show the summary
-        
+
         st.markdown("</div>", unsafe_allow_html=True)
 
+    show_bulk_import()
+
+def show_bulk_import():
+    """Bulk import of journeys from a CSV export, e.g. a vehicle's odometer log"""
+    with st.expander("📤 Bulk Import from CSV"):
+        st.markdown(
+            "Upload a CSV export with a date, start and end odometer readings and optionally "
+            "purpose, fuel, category, tags and vehicle. Rows without a vehicle are added to the "
+            "selected vehicle; rows that fail validation are skipped."
+        )
+        uploaded_file = st.file_uploader("Journey CSV file", type=["csv"])
+
+        if uploaded_file is not None and st.button("📥 Import Journeys"):
+            progress_text = st.empty()
+
+            def show_progress(report):
+                progress_text.text(
+                    f"Imported {report['rows_imported']:,} of {report['rows_read']:,} rows "
+                    f"({report['rows_per_sec']:,.0f} rows/sec)"
+                )
+
+            try:
+                report = utils.import_journeys_csv(
+                    uploaded_file, progress=show_progress, vehicle=st.session_state.vehicle
+                )
+            except (ValueError, pd.errors.ParserError) as e:
+                st.error(f"Could not read the CSV file: {e}")
+                return
+
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Imported", f"{report['rows_imported']:,}")
+            col2.metric("Rejected", f"{report['rows_rejected']:,}")
+            col3.metric("Rows/sec", f"{report['rows_per_sec']:,.0f}")
+
+            for reason, count in report['rejected_reasons'].items():
+                if count:
+                    st.warning(f"{count:,} rows skipped: {utils.VALIDATION_MESSAGES[reason]}")
+
+            if report['rows_imported']:
+                st.success(f"Imported {report['rows_imported']:,} journeys in {report['seconds']:.1f} seconds.")
+
 def show_journey_history(df):
     # Apply overall styling for the page
     st.markdown("""
@@ -2656,6 +2723,11 @@ def show_journey_history(df):
     st.markdown("<div class='filter-section'>", unsafe_allow_html=True)
     st.markdown("<p class='section-title'>🔍 Filter & Sort Journeys</p>", unsafe_allow_html=True)
     
+    # Default filter values, used when a filter widget is not shown
+    selected_category = 'All Categories'
+    selected_tags = []
+    tag_match = 'any'
+    
     col1, col2 = st.columns(2)
     with col1:
         sort_col = st.selectbox(
@@ -2679,52 +2751,73 @@ def show_journey_history(df):
     
     # Add tag filter if we have tags
     if 'Tags' in df.columns and not df['Tags'].isna().all():
-        # Extract all unique tags from the dataframe
-        all_tags = []
-        for tags_str in df['Tags'].dropna():
-            if tags_str:
-                all_tags.extend(utils.parse_tags(tags_str))
-        
-        unique_tags = sorted(list(set(all_tags)))
-        
-        if unique_tags:
-            st.markdown("<p style='margin-top: 15px; margin-bottom: 5px;'>Filter by Tag:</p>", unsafe_allow_html=True)
-            selected_tag = st.selectbox(
-                "Tag",
-                options=['All Tags'] + unique_tags,
-                index=0,
-                label_visibility="collapsed"
-            )
+        # Tags come from the inverted tag index rather than re-parsing every row
+        tag_counts = utils.get_journey_tags(vehicle=st.session_state.vehicle, with_counts=True)
+        
+        if tag_counts:
+            st.markdown("<p style='margin-top: 15px; margin-bottom: 5px;'>Filter by Tags:</p>", unsafe_allow_html=True)
+            tag_col1, tag_col2 = st.columns([3, 1])
+            with tag_col1:
+                selected_tags = st.multiselect(
+                    "Tags",
+                    options=list(tag_counts),
+                    format_func=lambda tag: f"{tag} ({tag_counts[tag]})",
+                    placeholder="All Tags",
+                    label_visibility="collapsed"
+                )
+            with tag_col2:
+                tag_match = st.radio(
+                    "Match",
+                    options=['any', 'all'],
+                    format_func=lambda option: "Any tag" if option == 'any' else "All tags",
+                    horizontal=True,
+                    label_visibility="collapsed",
+                    disabled=len(selected_tags) < 2
+                )
     
     st.markdown("</div>", unsafe_allow_html=True)
     
-    # Apply filters
-    filtered_df = df.copy()
-    
-    # Initialize default filter variables
-    selected_category = 'All Categories'
-    selected_tag = 'All Tags'
-    
-    # Apply category filter if available
-    if 'Category' in df.columns and 'selected_category' in locals():
-        if selected_category != 'All Categories':
-            filtered_df = filtered_df[filtered_df['Category'] == selected_category]
-    
-    # Apply tag filter if available
-    if 'Tags' in df.columns and 'selected_tag' in locals():
-        if selected_tag != 'All Tags':
-            filtered_df = filtered_df[filtered_df['Tags'].apply(
-                lambda x: selected_tag in utils.parse_tags(x) if pd.notna(x) else False
-            )]
-    
-    # Apply sorting
-    df_sorted = filtered_df.sort_values(
-        by=sort_col,
-        ascending=(sort_order == "Ascending")
+    # Sort and filter on row positions: the sort permutation is cached per data
+    # version, and journeys are only taken out of df for display
+    order = utils.get_journey_sort_order(
+        df, sort_col,
+        ascending=(sort_order == "Ascending"),
+        vehicle=st.session_state.vehicle
     )
+    if selected_category != 'All Categories' or selected_tags:
+        mask = utils.get_journey_filter_mask(
+            df,
+            category=selected_category if selected_category != 'All Categories' else None,
+            tag=selected_tags or None,
+            tag_match=tag_match,
+            vehicle=st.session_state.vehicle
+        )
+        order = order[mask[order]]
     
     # Display the data with a caption
     st.markdown("<p class='section-title'>📊 All Recorded Journeys</p>", unsafe_allow_html=True)
+    
+    if 'history_page' not in st.session_state:
+        st.session_state.history_page = 1
+    
+    page_col1, page_col2, page_col3 = st.columns([1, 1, 2])
+    with page_col1:
+        page_size = st.selectbox("Journeys per page", options=utils.JOURNEY_PAGE_SIZES, index=1)
+    page_count = max(1, -(-len(order) // page_size))
+    # Keep the page in range when filters or the page size shrink the result
+    st.session_state.history_page = min(max(1, st.session_state.history_page), page_count)
+    with page_col2:
+        st.number_input("Page", min_value=1, max_value=page_count, step=1, key="history_page")
+    
+    page_df, page, page_count = utils.get_journey_page(df, order, st.session_state.history_page, page_size)
+    with page_col3:
+        if len(order):
+            first_shown = (page - 1) * page_size + 1
+            caption = f"Showing {first_shown}–{first_shown + len(page_df) - 1} of {len(order)} journeys (page {page} of {page_count})"
+        else:
+            caption = "No journeys match the selected filters"
+        st.markdown(f"<p style='margin-top: 35px;'>{caption}</p>", unsafe_allow_html=True)
+    
     # Format the dataframe for display
     format_dict = {
         'Distance': '{:.1f} km',
@@ -2734,15 +2827,16 @@ def show_journey_history(df):
     }
     
     # Add cost formatting if column exists
-    if 'Cost' in df_sorted.columns:
+    if 'Cost' in page_df.columns:
         format_dict['Cost'] = '${:.2f}'
     
     # Add fuel price formatting if column exists
-    if 'Fuel_Price' in df_sorted.columns:
+    if 'Fuel_Price' in page_df.columns:
         format_dict['Fuel_Price'] = '${:.2f}/L'
     
+    # Only the visible page is formatted and sent to the browser
     st.dataframe(
-        df_sorted.style.format(format_dict),
+        page_df.style.format(format_dict),
         use_container_width=True
     )
     
@@ -2750,15 +2844,22 @@ def show_journey_history(df):
     st.markdown("<div class='summary-select-container'>", unsafe_allow_html=True)
     st.markdown("<p class='section-title'>✨ View Personalized Journey Summary</p>", unsafe_allow_html=True)
     
-    # Create selectbox with journey dates and purposes for easy identification
-    journey_options = [f"{row['Date']} - {row['Purpose']} ({row['Distance']:.1f} km)" 
-                      for _, row in df_sorted.iterrows()]
+    # Search the precomputed journey labels instead of formatting an option per journey
+    journey_labels = utils.get_journey_labels(vehicle=st.session_state.vehicle, df=df)
+    journey_search = st.text_input(
+        "Search journeys",
+        placeholder="Type a date or purpose, e.g. 2024-03 or grocery",
+        key="journey_search"
+    )
+    journey_positions, match_count = utils.search_journey_labels(journey_labels, order, journey_search)
+    if match_count > len(journey_positions):
+        st.caption(f"Showing the first {len(journey_positions)} of {match_count} matching journeys. Refine your search to narrow the list.")
     
-    if journey_options:
-        selected_journey_idx = st.selectbox(
+    if len(journey_positions):
+        selected_position = st.selectbox(
             "Select a journey to view its detailed summary:",
-            range(len(journey_options)),
-            format_func=lambda idx: journey_options[idx]
+            journey_positions,
+            format_func=lambda position: journey_labels[position]
         )
         
         # Center the button
@@ -2766,10 +2867,27 @@ def show_journey_history(df):
         with col2:
             if st.button("🔍 Show Journey Summary"):
                 # Get the selected journey data
-                selected_journey = df_sorted.iloc[selected_journey_idx].to_dict()
+                selected_journey = df.iloc[selected_position].to_dict()
                 # Display the journey summary
                 display_journey_summary(selected_journey)
-    
+
+        # Summaries for every journey shown, as a downloadable report
+        with col2:
+            if st.button("📝 Build Summary Report"):
+                df_sorted = df.iloc[order]
+                report_dates = pd.to_datetime(df_sorted['Date'], errors='coerce').dt.strftime('%Y-%m-%d')
+                report = "\n\n".join(
+                    f"## {report_dates[index]} - {df_sorted.at[index, 'Purpose']}\n"
+                    + "\n".join(f"- {part}" for part in summary_parts)
+                    for index, summary_parts in utils.generate_journey_summaries(df_sorted)
+                )
+                st.download_button(
+                    "📥 Download Summary Report",
+                    data=report,
+                    file_name="journey_summaries.md",
+                    mime="text/markdown"
+                )
+
     st.markdown("</div>", unsafe_allow_html=True)
 
 def show_statistics(df):
@@ -3056,15 +3174,28 @@ def show_statistics(df):
     
     # Monthly distance chart in its own styled container
     st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
-    st.markdown("<p class='stats-section-title'>📈 Monthly Travel Analysis</p>", unsafe_allow_html=True)
+    st.markdown("<p class='stats-section-title'>📈 Travel Over Time</p>", unsafe_allow_html=True)
+    
+    granularity = st.radio(
+        "Group journeys by",
+        options=['monthly', 'weekly', 'daily'],
+        format_func=str.title,
+        horizontal=True,
+        key="stats_rollup_period"
+    )
+    
+    # Read the pre-aggregated rollup rather than regrouping every journey
+    rollup = utils.get_rollup(granularity, vehicle=st.session_state.vehicle, by_category=False)
+    period_label = {'monthly': 'Month', 'weekly': 'Week', 'daily': 'Day'}[granularity]
     
     # Configure the plot with better styling
     fig = px.bar(
-        stats['monthly_distance'],
-        x='Month',
+        rollup,
+        x='Period',
         y='Distance',
         title=None,  # We'll use our custom title above
-        labels={'Month': 'Month', 'Distance': 'Distance (km)'}
+        labels={'Period': period_label, 'Distance': 'Distance (km)'},
+        hover_data={'Journeys': True, 'CO2': ':.1f'}
     )
     
     # Customize the plot appearance
@@ -3237,6 +3368,12 @@ def show_statistics(df):
     # Display driving pattern analysis
     display_driving_patterns_analysis(stats)
     
+    # Display odometer continuity checks
+    display_odometer_continuity()
+    
+    # Display fleet-wide totals when there is more than one vehicle
+    display_fleet_overview()
+    
     # Add a tip or insight at the bottom
     if stats['total_journeys'] > 1:
         st.markdown("""
@@ -3249,6 +3386,98 @@ def show_statistics(df):
     # Check for any new achievements to display
     check_achievements()
 
+def display_odometer_continuity():
+    """Show unlogged distance and overlapping readings between consecutive journeys"""
+    path = utils.get_vehicle_data_file(st.session_state.vehicle)
+    report = utils.get_odometer_continuity_report(min_gap=0.5, top=5, path=path)
+    if report['journeys'] < 2:
+        return
+    
+    st.markdown("<div class='stats-card'>", unsafe_allow_html=True)
+    st.markdown("<p class='stats-section-title'>🔗 Odometer Continuity</p>", unsafe_allow_html=True)
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Unlogged Distance", f"{report['unlogged_distance']:.1f} km")
+    col2.metric("Gaps Between Journeys", report['gap_count'])
+    col3.metric("Overlapping Readings", report['overlap_count'])
+    
+    if report['largest_gaps'] or report['largest_overlaps']:
+        journeys = utils.load_data(columns=['Date', 'Purpose'], vehicle=st.session_state.vehicle)
+        
+        def describe(rows, label):
+            return pd.DataFrame([
+                {
+                    label: f"{low:.1f} → {high:.1f} km ({high - low:.1f} km)",
+                    'Previous Journey': f"{journeys.at[before, 'Date']} - {journeys.at[before, 'Purpose']}",
+                    'Next Journey': f"{journeys.at[after, 'Date']} - {journeys.at[after, 'Purpose']}"
+                }
+                for low, high, before, after in rows
+            ])
+        
+        if report['largest_gaps']:
+            st.markdown("**Largest unlogged stretches**")
+            st.dataframe(describe(report['largest_gaps'], 'Gap'), use_container_width=True)
+        if report['largest_overlaps']:
+            st.markdown("**Largest overlapping readings**")
+            st.dataframe(describe(report['largest_overlaps'], 'Overlap'), use_container_width=True)
+    
+    st.markdown("</div>", unsafe_allow_html=True)
+
+def display_fleet_overview():
+    """Show totals across all vehicles, merged from each vehicle's running statistics"""
+    if len(utils.list_vehicles()) < 2:
+        return
+    
+    fleet_stats = utils.get_fleet_statistics()
+    
+    st.markdown("<div class='stats-card'>", unsafe_allow_html=True)
+    st.markdown("<p class='stats-section-title'>🚚 Fleet Overview</p>", unsafe_allow_html=True)
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Fleet Journeys", fleet_stats['total_journeys'])
+    col2.metric("Fleet Distance", f"{fleet_stats['total_distance']:.1f} km")
+    col3.metric("Fleet CO₂ Emissions", f"{fleet_stats['co2_emissions']:.1f} kg")
+    
+    vehicles = fleet_stats['vehicles'].copy()
+    vehicles['Vehicle'] = vehicles['Vehicle'].map(format_vehicle)
+    st.dataframe(
+        vehicles.style.format({
+            'Distance': '{:.1f} km',
+            'Fuel': '{:.1f} L',
+            'Cost': '${:.2f}',
+            'CO2': '{:.1f} kg'
+        }),
+        use_container_width=True
+    )
+
+    # Full per-vehicle analysis, fanned out to worker processes
+    compare_serial = st.checkbox(
+        "Compare with serial run",
+        value=utils.FLEET_REPORT_COMPARE_SERIAL,
+        help="Also analyze the vehicles one after another to show the parallel speedup (doubles the work)"
+    )
+    if st.button("⚡ Build Fleet Report"):
+        with st.spinner("Analyzing every vehicle..."):
+            report = utils.generate_fleet_report(compare_serial=compare_serial)
+
+        st.dataframe(pd.DataFrame([
+            {
+                'Vehicle': format_vehicle(vehicle),
+                'Fuel Economy': f"{stats['fuel_economy']:.2f} km/L",
+                'Eco Score': stats['driving_patterns'].get('eco_score', 0),
+                'Route Suggestions': len(stats['route_optimization'])
+            }
+            for vehicle, stats in report['vehicles'].items()
+        ]), use_container_width=True)
+
+        timing = report['timing']
+        caption = f"Analyzed with {timing['workers']} worker processes in {timing['parallel_seconds']:.2f}s"
+        if 'speedup' in timing:
+            caption += f" ({timing['speedup']:.1f}x the serial time of {timing['serial_seconds']:.2f}s)"
+        st.caption(caption)
+
+    st.markdown("</div>", unsafe_allow_html=True)
+
 # Display the eco-challenges weekly missions
 def display_eco_challenges(df):
     """Display gamified eco-challenges and weekly missions"""
@@ -3265,7 +3494,8 @@ def display_eco_challenges(df):
     if len(df) > 0:
         st.session_state.weekly_challenges = update_eco_challenge_progress(
             st.session_state.weekly_challenges, 
-            df
+            df,
+            weekly_rollup=utils.get_rollup('weekly', vehicle=st.session_state.vehicle, by_category=False)
         )
     
     # Check for newly completed challenges
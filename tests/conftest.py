@@ -0,0 +1,41 @@
+import datetime
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils  # noqa: E402
+
+
+@pytest.fixture
+def data_file(tmp_path, monkeypatch):
+    """Point the journey store at a fresh CSV file in a temporary directory."""
+    path = str(tmp_path / "journeys.csv")
+    monkeypatch.setattr(utils, "DATA_FILE", path)
+    monkeypatch.setattr(utils, "VEHICLES_DIR", str(tmp_path / "vehicles"))
+    utils.invalidate_data_cache()
+    yield path
+    utils.invalidate_data_cache()
+
+
+@pytest.fixture
+def make_journey():
+    """Return a factory for journey rows, as dictionaries with every stored column."""
+    def make(start=0.0, distance=10.0, day=1, purpose='Work', category='Business', tags='',
+             fuel=1.0, price=1.5, vehicle=utils.DEFAULT_VEHICLE):
+        return {
+            'Date': datetime.date(2024, 3, 1) + datetime.timedelta(days=day - 1),
+            'Start_Reading': start,
+            'End_Reading': start + distance,
+            'Distance': distance,
+            'Purpose': purpose,
+            'Fuel_Consumption': fuel,
+            'Category': category,
+            'Tags': tags,
+            'Fuel_Price': price,
+            'Cost': fuel * price if fuel is not None else 0.0,
+            'Vehicle': vehicle
+        }
+    return make
@@ -0,0 +1,47 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import utils
+
+DISTANCES = [12.5, 40.0, 0.0, 7.0, 100.0]
+FUEL = [1.2, np.nan, None, 0.0, -3.0]
+
+
+def expected_co2(distance, fuel_consumption, vehicle_type):
+    """The per-journey rule: fuel burned when known and positive, the vehicle type's per-km factor otherwise."""
+    if fuel_consumption is not None and not math.isnan(fuel_consumption) and fuel_consumption > 0:
+        return fuel_consumption * utils.CO2_PER_LITER
+    return distance * utils.CO2_EMISSION_FACTORS.get(vehicle_type.lower(), utils.CO2_EMISSION_FACTORS['medium'])
+
+
+@pytest.mark.parametrize('vehicle_type', list(utils.CO2_EMISSION_FACTORS) + ['SUV', 'tractor'])
+def test_co2_series_matches_scalar(vehicle_type):
+    distance = pd.Series(DISTANCES, index=[10, 11, 12, 13, 14])
+
+    series = utils.calculate_co2_emissions_series(distance, FUEL, vehicle_type)
+
+    assert series.index.tolist() == [10, 11, 12, 13, 14]
+    for value, d, fuel in zip(series, DISTANCES, FUEL):
+        assert value == pytest.approx(utils.calculate_co2_emissions(d, fuel, vehicle_type))
+        assert value == pytest.approx(expected_co2(d, fuel, vehicle_type))
+
+
+def test_co2_series_with_vehicle_type_per_journey():
+    vehicle_types = ['small', 'medium', 'large', 'suv', 'unknown']
+
+    emissions = utils.calculate_co2_emissions_series(DISTANCES, FUEL, vehicle_types)
+
+    assert isinstance(emissions, np.ndarray)
+    np.testing.assert_allclose(emissions, [
+        expected_co2(d, fuel, vehicle_type) for d, fuel, vehicle_type in zip(DISTANCES, FUEL, vehicle_types)
+    ])
+
+
+def test_co2_without_fuel_uses_distance_factor():
+    emissions = utils.calculate_co2_emissions_series(DISTANCES, vehicle_type='large')
+
+    np.testing.assert_allclose(emissions, np.array(DISTANCES) * utils.CO2_EMISSION_FACTORS['large'])
+    assert utils.calculate_co2_emissions(40.0, float('nan'), 'large') == pytest.approx(10.0)
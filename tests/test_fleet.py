@@ -0,0 +1,38 @@
+import pandas as pd
+
+import utils
+
+
+def journeys(make_journey, purposes, categories, first_reading=0.0):
+    return pd.DataFrame([
+        make_journey(first_reading + day * 12.0, 12.0, day=day + 1, purpose=purpose, category=category,
+                     fuel=1.0 if day % 2 else None)
+        for day, (purpose, category) in enumerate(zip(purposes, categories))
+    ])
+
+
+def test_fleet_report_matches_serial_statistics(data_file, make_journey):
+    utils.append_journeys(journeys(make_journey, ['Work', 'Gym', 'Work'], ['Commute', 'Personal', 'Commute']))
+    utils.append_journeys(journeys(make_journey, ['Delivery', 'Depot'], ['Business', 'Business'], 500.0), vehicle='Van 2')
+
+    report = utils.generate_fleet_report(max_workers=2)
+
+    assert set(report['vehicles']) == {'default', 'Van_2'}
+    for vehicle, stats in report['vehicles'].items():
+        expected = utils._compute_statistics(utils.load_data(columns=utils.ANALYSIS_COLUMNS, vehicle=vehicle))
+        assert stats['total_journeys'] == expected['total_journeys']
+        assert stats['fuel_economy'] == expected['fuel_economy']
+        pd.testing.assert_frame_equal(stats['category_stats'], expected['category_stats'])
+        assert stats['route_optimization'] == expected['route_optimization']
+    assert report['fleet']['total_journeys'] == 5
+    assert 'serial_seconds' not in report['timing']
+
+
+def test_fleet_report_compares_with_serial_run_on_request(data_file, make_journey):
+    utils.append_journeys(journeys(make_journey, ['Work', 'Gym'], ['Commute', 'Personal']))
+    utils.append_journeys(journeys(make_journey, ['Delivery'], ['Business'], 500.0), vehicle='Van 2')
+
+    timing = utils.generate_fleet_report(max_workers=2, compare_serial=True)['timing']
+
+    assert timing['serial_seconds'] > 0
+    assert timing['speedup'] == timing['serial_seconds'] / timing['parallel_seconds']
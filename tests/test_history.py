@@ -0,0 +1,74 @@
+import pandas as pd
+
+import utils
+
+
+def test_history_views_follow_the_frame_after_an_append(data_file, make_journey):
+    utils.save_data(pd.DataFrame([
+        make_journey(10.0, day=1, purpose='Work', tags='rain'),
+        make_journey(20.0, day=2, purpose='Gym')
+    ]))
+    df = utils.get_journey_frame()
+    utils.get_journey_labels(df=df)
+    utils.get_tag_index()
+
+    # A journey is appended (e.g. by another session) after df was fetched
+    utils.append_journey(make_journey(30.0, day=3, purpose='Dentist', tags='rain'))
+
+    labels = utils.get_journey_labels(df=df)
+    assert list(labels) == ['2024-03-01 - Work (10.0 km)', '2024-03-02 - Gym (10.0 km)']
+    assert utils.get_journey_filter_mask(df, tag=['rain']).tolist() == [True, False]
+    assert utils.get_journey_sort_order(df, 'Date', ascending=False).tolist() == [1, 0]
+
+    current = utils.get_journey_frame()
+    assert len(utils.get_journey_labels(df=current)) == 3
+    assert utils.get_journey_labels(df=current) is utils.get_journey_labels()
+    assert utils.get_journey_filter_mask(current, tag=['rain']).tolist() == [True, False, True]
+    assert utils.get_journey_sort_order(current, 'Date', ascending=False).tolist() == [2, 1, 0]
+
+
+def test_sort_order_is_stable_and_cached(data_file, make_journey):
+    distances = [20.0, 10.0, 20.0, None, 10.0]
+    utils.save_data(pd.DataFrame([make_journey(i * 30.0) for i in range(5)]).assign(Distance=distances))
+    df = utils.get_journey_frame()
+
+    ascending = utils.get_journey_sort_order(df, 'Distance')
+    descending = utils.get_journey_sort_order(df, 'Distance', ascending=False)
+
+    # Ties keep storage order and missing values sort last in both directions
+    assert ascending.tolist() == [1, 4, 0, 2, 3]
+    assert descending.tolist() == [0, 2, 1, 4, 3]
+    assert utils.get_journey_sort_order(df, 'Distance') is ascending
+    assert not ascending.flags.writeable
+
+
+def test_journey_page_clamps_to_partial_last_page(data_file, make_journey):
+    utils.save_data(pd.DataFrame([make_journey(i * 10.0, day=i + 1) for i in range(7)]))
+    df = utils.get_journey_frame()
+    order = utils.get_journey_sort_order(df, 'Date', ascending=False)
+
+    page, number, count = utils.get_journey_page(df, order, page=5, page_size=3)
+    assert (number, count) == (3, 3)
+    assert page['Start_Reading'].tolist() == [0.0]
+
+    page, number, count = utils.get_journey_page(df, order, page=0, page_size=3)
+    assert (number, count) == (1, 3)
+    assert page['Start_Reading'].tolist() == [60.0, 50.0, 40.0]
+
+    page, number, count = utils.get_journey_page(df, order[:0], page=2, page_size=3)
+    assert (number, count, len(page)) == (1, 1, 0)
+
+
+def test_sort_order_rebuilt_after_save(data_file, make_journey):
+    utils.save_data(pd.DataFrame([make_journey(0.0, 10.0), make_journey(10.0, 30.0)]))
+    df = utils.get_journey_frame()
+    order = utils.get_journey_sort_order(df, 'Distance')
+
+    utils.save_data(pd.DataFrame([make_journey(0.0, 30.0), make_journey(30.0, 20.0), make_journey(50.0, 10.0)]))
+    current = utils.get_journey_frame()
+
+    rebuilt = utils.get_journey_sort_order(current, 'Distance')
+    assert rebuilt is not order
+    assert rebuilt.tolist() == [2, 1, 0]
+    assert order.tolist() == [0, 1]
+    assert utils.get_journey_sort_order(df, 'Distance').tolist() == [0, 1]
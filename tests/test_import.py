@@ -0,0 +1,73 @@
+import io
+import threading
+
+import pandas as pd
+import pytest
+
+import utils
+
+# Aliased headers as an odometer app might export them
+EXPORT = """Trip Date,Start km,End km,Description,Litres,Car
+2024-03-01,0,40,Work,3.0,
+2024-03-02,40,95,Shopping,,Van 2
+not a date,95,100,Gym,,
+2024-03-04,100,180,Beach,6.5,Van 2
+2024-03-05,180,170,Typo,,
+2024-03-06,180,200,Gym,,
+03/07/2024,200,230,Dentist,,Van 2
+"""
+
+
+def test_import_maps_aliases_and_reports_rejections_across_chunks(data_file):
+    reports = []
+
+    report = utils.import_journeys_csv(io.StringIO(EXPORT), chunksize=2, progress=lambda r: reports.append(dict(r)))
+
+    assert [r['rows_read'] for r in reports] == [2, 4, 6, 7]
+    assert [r['rows_rejected'] for r in reports] == [0, 1, 2, 2]
+    assert report['rows_read'] == 7
+    assert report['rows_imported'] == 5
+    assert report['rows_rejected'] == 2
+    assert report['rejected_reasons']['invalid_date'] == 1
+    assert report['rejected_reasons']['negative_distance'] == 1
+    assert report['rows_per_sec'] == pytest.approx(report['rows_read'] / report['seconds'])
+
+    df = utils.load_data()
+    assert df['Purpose'].tolist() == ['Work', 'Gym']
+    assert df['Distance'].tolist() == [40.0, 20.0]
+    assert df['Fuel_Consumption'].tolist()[0] == 3.0
+
+
+def test_import_routes_rows_to_vehicle_partitions(data_file, make_journey):
+    utils.append_journeys(pd.DataFrame([make_journey(0.0)]), vehicle='Van 2')
+    cached = utils.load_data(vehicle='Van 2')
+    van_file = utils.get_vehicle_data_file('Van 2')
+    lock_held = []
+    van_cached = []
+
+    def progress(report):
+        # Another thread must not be able to write while the import runs
+        other = threading.Thread(target=lambda: lock_held.append(not utils._journey_write_lock.acquire(blocking=False)))
+        other.start()
+        other.join()
+        # The partition's cached frames are dropped, not extended chunk by chunk
+        van_cached.append(van_file in utils._journey_store)
+
+    utils.import_journeys_csv(io.StringIO(EXPORT), chunksize=3, progress=progress)
+
+    assert lock_held == [True, True, True]
+    assert van_cached == [False, False, False]
+    assert utils.load_data()['Purpose'].tolist() == ['Work', 'Gym']
+    van = utils.load_data(vehicle='Van 2')
+    assert van is not cached
+    assert van['Purpose'].tolist() == ['Work', 'Shopping', 'Beach', 'Dentist']
+    assert set(van['Vehicle']) == {'Van_2'}
+
+
+def test_import_into_columnar_file_writes_once(data_file, monkeypatch):
+    monkeypatch.setattr(utils, 'DATA_FILE', data_file.replace('.csv', '.parquet'))
+
+    report = utils.import_journeys_csv(io.StringIO(EXPORT), chunksize=2, vehicle='Van 2')
+
+    assert report['rows_imported'] == 5
+    assert utils.load_data(vehicle='Van 2')['Purpose'].tolist() == ['Work', 'Shopping', 'Beach', 'Gym', 'Dentist']
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+import utils
+
+INDEX_ARRAYS = ('starts', 'ends', 'rows', 'reach', 'gaps', 'gap_prefix')
+
+
+def readings(starts, lengths):
+    starts = np.asarray(starts, dtype=float)
+    return pd.DataFrame({'Start_Reading': starts, 'End_Reading': starts + np.asarray(lengths, dtype=float)})
+
+
+def fold(index, new_rows, monkeypatch):
+    """Run the odometer index data change hook on a standalone index and return the updated index."""
+    utils._odometer_indexes['test'] = index
+    monkeypatch.setattr(utils, 'get_appended_data_version', lambda path: (index['version'], index['version'] + 1))
+    utils._update_odometer_index('test', new_rows)
+    return utils._odometer_indexes.pop('test', None)
+
+
+def build(frame):
+    index = utils._build_odometer_index(*utils._odometer_readings(frame))
+    index.update({'count': len(frame), 'version': 1})
+    return index
+
+
+def assert_matches_rebuild(index, frame):
+    rebuilt = utils._build_odometer_index(*utils._odometer_readings(frame))
+    for name in INDEX_ARRAYS:
+        np.testing.assert_allclose(index[name], rebuilt[name])
+
+
+def test_in_order_appends_extend_index(monkeypatch):
+    frame = readings([0, 100, 250], [90, 120, 40])
+    index = build(frame)
+    earlier_reach = index['reach']
+
+    for start, length in [(300, 20), (320, 50), (400, 10)]:
+        new_rows = readings([start], [length])
+        index = fold(index, new_rows, monkeypatch)
+        frame = pd.concat([frame, new_rows], ignore_index=True)
+        assert_matches_rebuild(index, frame)
+
+    assert index['count'] == 6
+    assert 'buffers' in index
+    np.testing.assert_allclose(earlier_reach, [90, 220, 290])
+
+
+def test_out_of_order_append_matches_rebuild(monkeypatch):
+    frame = readings([0, 100, 250, 400], [90, 120, 40, 30])
+    index = build(frame)
+
+    new_rows = readings([95, 500, 10], [3, 10, 200])
+    index = fold(index, new_rows, monkeypatch)
+
+    assert_matches_rebuild(index, pd.concat([frame, new_rows], ignore_index=True))
+    assert index['count'] == 7
+
+
+def test_index_held_by_reader_unchanged_by_appends(data_file, make_journey):
+    utils.save_data(pd.DataFrame([make_journey(0.0, 90.0), make_journey(100.0, 120.0)]))
+    index = utils.get_odometer_index()
+    snapshot = {name: index[name].copy() for name in INDEX_ARRAYS}
+
+    # Journeys are appended (e.g. by another session) between a reader's lookups
+    utils.append_journey(make_journey(250.0, 40.0))
+    utils.append_journey(make_journey(300.0, 20.0))
+    utils.append_journey(make_journey(95.0, 3.0))
+
+    for name in INDEX_ARRAYS:
+        np.testing.assert_array_equal(index[name], snapshot[name])
+    assert index['count'] == 2
+
+    current = utils.get_odometer_index()
+    assert current is not index
+    assert current['count'] == 5
+    assert utils.get_unlogged_distance() == 47.0
+    assert_matches_rebuild(current, utils.load_data())
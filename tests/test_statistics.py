@@ -0,0 +1,52 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import utils
+
+
+def journeys():
+    return pd.DataFrame({
+        'Date': pd.Series([
+            datetime.date(2024, 1, 5),
+            datetime.date(2024, 1, 20),
+            datetime.date(2024, 2, 3),
+            datetime.date(2024, 3, 9)
+        ], dtype=object),
+        'Start_Reading': [0.0, 40.0, 95.0, 180.0],
+        'End_Reading': [40.0, 95.0, 180.0, 200.0],
+        'Distance': [40.0, 55.0, 85.0, 20.0],
+        'Purpose': ['Work', 'Grocery shopping', 'Beach trip', 'Gym'],
+        'Fuel_Consumption': [3.0, np.nan, 6.5, np.nan],
+        'Category': ['Commute', 'Shopping', 'Vacation', 'Personal'],
+        'Tags': ['rush-hour', '', 'highway, rain', None],
+        'Fuel_Price': [1.5, 1.5, 1.6, 1.5],
+        'Cost': [4.5, 0.0, 10.4, 0.0]
+    })
+
+
+@pytest.mark.parametrize('compute', [utils.calculate_statistics, utils._compute_statistics])
+def test_statistics_leave_input_untouched(compute):
+    utils.clear_statistics_cache()
+    df = journeys()
+    before = df.copy(deep=True)
+
+    stats = compute(df)
+
+    pd.testing.assert_frame_equal(df, before)
+    assert 'Month' not in df.columns
+    assert df['Date'].dtype == object
+    assert stats['monthly_distance']['Month'].tolist() == ['2024-01', '2024-02', '2024-03']
+    assert stats['monthly_distance']['Distance'].tolist() == [95.0, 85.0, 20.0]
+
+
+def test_statistics_on_loaded_frame_leave_store_untouched(data_file):
+    utils.save_data(journeys())
+    df = utils.get_journey_frame(columns=utils.ANALYSIS_COLUMNS)
+    before = df.copy(deep=True)
+
+    utils.calculate_statistics(df)
+
+    pd.testing.assert_frame_equal(utils.get_journey_frame(columns=utils.ANALYSIS_COLUMNS), before)
@@ -0,0 +1,142 @@
+import os
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import utils
+
+
+def test_append_keeps_cached_dtypes(data_file, make_journey):
+    utils.save_data(pd.DataFrame([make_journey(0.0, tags='rain'), make_journey(10.0, tags='highway')]))
+    utils.get_journey_frame()
+
+    utils.append_journey(make_journey(20.0))
+    cached = utils.get_journey_frame()
+    utils.invalidate_data_cache()
+    reloaded = utils.get_journey_frame()
+
+    pd.testing.assert_series_equal(cached.dtypes, reloaded.dtypes)
+    pd.testing.assert_frame_equal(cached, reloaded)
+
+
+def test_unknown_columns_skipped_whether_or_not_file_exists(data_file):
+    created = utils.load_data(columns=['Distance', 'Odometer_Photo'])
+    utils.invalidate_data_cache()
+    reloaded = utils.load_data(columns=['Distance', 'Odometer_Photo'])
+
+    assert created.columns.tolist() == ['Distance']
+    assert reloaded.columns.tolist() == ['Distance']
+
+
+def test_append_logs_running_statistics_delta(data_file, make_journey):
+    utils.save_data(pd.DataFrame([make_journey(0.0, tags='rain'), make_journey(10.0)]))
+    utils.load_running_statistics()
+    stats_path = utils._running_statistics_path(data_file)
+    stats_mtime = os.stat(stats_path).st_mtime_ns
+
+    utils.append_journey(make_journey(20.0, tags='highway'))
+    utils.append_journey(make_journey(30.0))
+
+    assert os.stat(stats_path).st_mtime_ns == stats_mtime
+    assert len(utils._read_running_statistics_log(data_file)) == 2
+
+    aggregates = utils.load_running_statistics()
+    assert aggregates['count'] == 4
+    assert not os.path.exists(utils._running_statistics_log_path(data_file))
+    assert utils.verify_running_statistics() == []
+
+
+def test_unchained_delta_log_rebuilds_statistics(data_file, make_journey):
+    utils.save_data(pd.DataFrame([make_journey(0.0)]))
+    utils.append_journey(make_journey(10.0))
+    # Change the file behind the log's back
+    utils.invalidate_data_cache()
+    with open(data_file, 'a') as f:
+        f.write('2024-03-02,20.0,30.0,10.0,Work,1.0,Business,,1.5,1.5,default\n')
+
+    assert utils.load_running_statistics()['count'] == 3
+    assert utils.verify_running_statistics() == []
+
+
+def test_get_rollup_cached_until_statistics_change(data_file, make_journey):
+    utils.save_data(pd.DataFrame([make_journey(0.0), make_journey(10.0)]))
+
+    monthly = utils.get_rollup('monthly', by_category=False)
+    assert utils.get_rollup('monthly', by_category=False) is monthly
+    assert monthly['Journeys'].tolist() == [2]
+
+    utils.append_journey(make_journey(20.0))
+
+    refreshed = utils.get_rollup('monthly', by_category=False)
+    assert refreshed is not monthly
+    assert refreshed['Journeys'].tolist() == [3]
+    assert refreshed['Distance'].tolist() == [30.0]
+
+
+@pytest.fixture(params=['.csv', '.parquet', '.db'])
+def store_file(request, data_file, monkeypatch):
+    """Point the journey store at a fresh file of each storage backend."""
+    path = os.path.splitext(data_file)[0] + request.param
+    monkeypatch.setattr(utils, 'DATA_FILE', path)
+    return path
+
+
+def test_query_journeys_projects_after_filtering(store_file, make_journey):
+    utils.save_data(pd.DataFrame([
+        make_journey(0.0, day=1, category='Commute'),
+        make_journey(10.0, 20.0, day=2, category='Business'),
+        make_journey(30.0, 30.0, day=3, category='Business')
+    ]))
+
+    df = utils.query_journeys(start_date='2024-03-02', end_date='2024-03-02', category='Business', columns=['Distance'])
+
+    assert df.columns.tolist() == ['Distance']
+    assert df['Distance'].tolist() == [20.0]
+
+
+def test_query_journeys_any_and_all_tags(store_file, make_journey):
+    utils.save_data(pd.DataFrame([
+        make_journey(0.0, tags='rain, night'),
+        make_journey(10.0, tags='rain'),
+        make_journey(20.0, tags='night'),
+        make_journey(30.0, tags='highway')
+    ]))
+
+    any_tag = utils.query_journeys(tag=['rain', 'night'], columns=['Start_Reading'])
+    all_tags = utils.query_journeys(tag=['rain', 'night'], tag_match='all', columns=['Start_Reading'])
+
+    assert any_tag['Start_Reading'].tolist() == [0.0, 10.0, 20.0]
+    assert all_tags['Start_Reading'].tolist() == [0.0]
+    assert utils.query_journeys(tag=[], columns=['Start_Reading']).empty
+
+
+def test_sqlite_store_uses_wal_and_indexes(data_file, monkeypatch, make_journey):
+    path = os.path.splitext(data_file)[0] + '.db'
+    monkeypatch.setattr(utils, 'DATA_FILE', path)
+    utils.save_data(pd.DataFrame([make_journey(0.0)]))
+
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        plan = conn.execute('EXPLAIN QUERY PLAN SELECT * FROM journeys WHERE "Date" >= ?', ('2024-03-01',)).fetchall()
+    finally:
+        conn.close()
+    assert {'idx_journeys_date', 'idx_journeys_category', 'idx_journeys_purpose'} <= indexes
+    assert any('idx_journeys_date' in row[-1] for row in plan)
+
+
+def test_sqlite_tag_filter_matches_whole_tags_literally(data_file, monkeypatch, make_journey):
+    monkeypatch.setattr(utils, 'DATA_FILE', os.path.splitext(data_file)[0] + '.db')
+    stored = ['100%', '1000', 'a_b', 'axb', 'rainy', 'rain, night', 'back\\slash']
+    utils.save_data(pd.DataFrame([make_journey(i * 10.0, tags=tags) for i, tags in enumerate(stored)]))
+
+    def matching(tag):
+        return utils.query_journeys(tag=tag)['Tags'].tolist()
+
+    assert matching('100%') == ['100%']
+    assert matching('a_b') == ['a_b']
+    assert matching('rain') == ['rain, night']
+    assert matching('back\\slash') == ['back\\slash']
+    assert matching('%') == []
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+import utils
+
+
+def test_encode_decode_round_trip():
+    tags = pd.Series(['rain, highway', None, '', 'highway', 'city, rain, city'])
+    encoded = utils.encode_tags(tags)
+
+    assert encoded['vocabulary'] == ['rain', 'highway', 'city']
+    assert list(np.diff(encoded['offsets'])) == [2, 0, 0, 1, 3]
+    assert utils.decode_tags(encoded).tolist() == ['rain, highway', '', '', 'highway', 'city, rain, city']
+
+
+def test_encode_without_tags():
+    encoded = utils.encode_tags(pd.Series(['', None]))
+
+    assert encoded['vocabulary'] == []
+    assert utils._tag_postings(encoded, 5) == {}
+
+
+def test_round_trip_normalizes_commas_and_spaces():
+    tags = pd.Series([' rain ,,highway , ', 'school run,rain', ',', 'rain, rain'])
+    decoded = utils.decode_tags(utils.encode_tags(tags))
+
+    assert decoded.tolist() == ['rain, highway', 'school run, rain', '', 'rain, rain']
+    assert utils.decode_tags(utils.encode_tags(decoded)).tolist() == decoded.tolist()
+
+
+def test_stored_tags_round_trip_with_duplicates(data_file, make_journey):
+    stored = ['school run, rain, rain', ' rain ,,highway , ', '']
+    utils.save_data(pd.DataFrame([make_journey(i * 10.0, tags=tags) for i, tags in enumerate(stored)]))
+    utils.append_journey(make_journey(30.0, tags='rain,rain, school run'))
+
+    index = utils.get_tag_index()
+    expected = [utils.format_tags_for_storage(utils.parse_tags(tags)) for tags in stored + ['rain,rain, school run']]
+    assert utils.decode_tags(index['encoded']).tolist() == expected
+    # A tag repeated on one journey still counts, and matches, that journey once
+    assert utils.get_journey_tags(with_counts=True) == {'highway': 1, 'rain': 3, 'school run': 2}
+    assert utils.find_journey_rows_by_tags('rain').tolist() == [0, 1, 3]
+    assert utils.find_journey_rows_by_tags(['school run', 'rain'], match='all').tolist() == [0, 3]
+
+
+def test_append_tagless_journey_after_index_built(data_file, make_journey):
+    utils.save_data(pd.DataFrame([make_journey(0.0, tags='rain'), make_journey(10.0, tags='rain, highway')]))
+    index = utils.get_tag_index()
+
+    utils.append_journey(make_journey(20.0, tags=''))
+
+    assert utils.get_tag_index() is index
+    assert index['count'] == 3
+    assert utils.find_journey_rows_by_tags('rain').tolist() == [0, 1]
+    assert utils.get_journey_tags(with_counts=True) == {'highway': 1, 'rain': 2}
+
+
+def test_append_tagged_journey_updates_postings(data_file, make_journey):
+    utils.save_data(pd.DataFrame([make_journey(0.0, tags='rain'), make_journey(10.0, tags='')]))
+    utils.get_tag_index()
+
+    utils.append_journey(make_journey(20.0, tags='rain, night'))
+
+    assert utils.find_journey_rows_by_tags(['rain', 'night'], match='all').tolist() == [2]
+    assert utils.find_journey_rows_by_tags(['rain', 'night'], match='any').tolist() == [0, 2]
+
+
+def test_tag_cooccurrence_counts_pairs_per_journey(data_file, make_journey):
+    stored = ['rain, night, rain', 'night, rain', 'highway', '', 'rain']
+    utils.save_data(pd.DataFrame([make_journey(i * 10.0, tags=tags) for i, tags in enumerate(stored)]))
+
+    matrix = utils.get_tag_cooccurrence()
+
+    assert matrix.index.tolist() == ['highway', 'night', 'rain']
+    assert matrix.columns.tolist() == ['highway', 'night', 'rain']
+    assert matrix.to_numpy().tolist() == [[1, 0, 0], [0, 2, 2], [0, 2, 3]]
@@ -0,0 +1,37 @@
+import pandas as pd
+
+import utils
+
+
+def journeys(make_journey, starts, ends):
+    return pd.DataFrame([
+        make_journey(start, end - start, day=day + 1)
+        for day, (start, end) in enumerate(zip(starts, ends))
+    ])
+
+
+def test_odometer_regression_within_tolerance_passes(make_journey):
+    # 0.1 + 0.2 is stored as 0.30000000000000004
+    df = journeys(make_journey, [0.1, 0.3], [0.1 + 0.2, 10.0])
+
+    valid, reasons = utils.validate_journeys(df, checks=['odometer_regression'])
+
+    assert valid.tolist() == [True, True]
+    assert reasons.tolist() == [0, 0]
+
+
+def test_odometer_regression_beyond_tolerance_flagged(make_journey):
+    df = journeys(make_journey, [0.0, 99.0, 100.0], [100.0, 120.0, 130.0])
+
+    valid, reasons = utils.validate_journeys(df, checks=['odometer_regression'], odometer_tolerance=0.5)
+
+    assert valid.tolist() == [True, False, False]
+    assert utils.describe_validation_reasons(reasons[1]) == ['odometer_regression']
+
+
+def test_odometer_tolerance_is_configurable(make_journey):
+    df = journeys(make_journey, [0.0, 99.0], [100.0, 120.0])
+
+    valid, _ = utils.validate_journeys(df, checks=['odometer_regression'], odometer_tolerance=1.0)
+
+    assert valid.tolist() == [True, True]
@@ -1,67 +1,2263 @@
 import pandas as pd
+import numpy as np
 import os
 import re
+import io
+import copy
 import json
+import hashlib
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from collections import OrderedDict
 from datetime import datetime, timedelta
 
-DATA_FILE = "data/journeys.csv"
+# Journey log location. The file extension selects the storage backend
+# (.csv, .parquet, .feather or .db, see STORAGE_BACKENDS).
+DATA_FILE = os.environ.get("JOURNEY_DATA_FILE", "data/journeys.csv")
+
+# Journeys are partitioned per vehicle. The default vehicle's journeys live in
+# DATA_FILE; every other vehicle gets its own file in VEHICLES_DIR, stored in
+# the same format as DATA_FILE.
+DEFAULT_VEHICLE = "default"
+VEHICLES_DIR = os.environ.get("JOURNEY_VEHICLES_DIR", os.path.join(os.path.dirname(DATA_FILE) or '.', 'vehicles'))
+
+# Default of the fleet report's "Compare with serial run" option, which also
+# times a serial run to show the parallel speedup. Set
+# FLEET_REPORT_COMPARE_SERIAL=1 to have it ticked; off by default because it
+# doubles the work of every report.
+FLEET_REPORT_COMPARE_SERIAL = os.environ.get("FLEET_REPORT_COMPARE_SERIAL") == "1"
 
 # Journey categories
 JOURNEY_CATEGORIES = [
     "Personal", "Business", "Commute", "Shopping", "Vacation", "Medical", "Education", "Family", "Other"
 ]
 
-# Default fuel price (per liter)
-DEFAULT_FUEL_PRICE = 1.50
+# Default fuel price (per liter)
+DEFAULT_FUEL_PRICE = 1.50
+
+# Columns of the journey log, in file order
+JOURNEY_COLUMNS = [
+    'Date', 'Start_Reading', 'End_Reading', 'Distance', 'Purpose', 
+    'Fuel_Consumption', 'Category', 'Tags', 'Fuel_Price', 'Cost', 'Vehicle'
+]
+
+# Journey columns holding numbers
+_NUMERIC_COLUMNS = ['Start_Reading', 'End_Reading', 'Distance', 'Fuel_Consumption', 'Fuel_Price', 'Cost']
+
+# Columns needed by the statistics and eco-challenge pages
+ANALYSIS_COLUMNS = ['Date', 'Distance', 'Purpose', 'Fuel_Consumption', 'Category', 'Cost']
+
+# Process-wide cache of parsed journey data, keyed by data file path.
+# Streamlit serves every session from the same process, so all sessions share it.
+_journey_store = {}
+_journey_store_lock = threading.Lock()
+_journey_store_stats = {'hits': 0, 'misses': 0}
+_journey_store_version = 0
+
+# Serializes writers to the journey files within this process
+_journey_write_lock = threading.RLock()
+
+# Functions called as hook(path, new_rows) whenever journey data is written
+# through this module; new_rows holds appended rows, or None after a rewrite
+_data_change_hooks = []
+
+def _data_file_key(path):
+    """
+    Return a cheap fingerprint of a data file (mtime, size), or None if it is missing.
+    
+    For SQLite files the write-ahead log is included, since committed writes
+    may only touch the -wal file until the next checkpoint.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    key = (stat.st_mtime_ns, stat.st_size)
+    if os.path.exists(path + '-wal'):
+        wal_stat = os.stat(path + '-wal')
+        key += (wal_stat.st_mtime_ns, wal_stat.st_size)
+    return key
+
+def _read_csv_header(path):
+    """Return the column names of a CSV file, or None if it is missing or empty."""
+    try:
+        with open(path, 'r', newline='') as f:
+            first_line = f.readline()
+    except FileNotFoundError:
+        return None
+    if not first_line.strip():
+        return None
+    return list(pd.read_csv(io.StringIO(first_line), nrows=0).columns)
+
+def _read_csv_backend(path, columns=None):
+    """Read a CSV journey file, optionally limited to some columns."""
+    if columns is None:
+        return pd.read_csv(path)
+    return pd.read_csv(path, usecols=lambda column: column in columns)
+
+def _write_csv_backend(df, path):
+    """Write a journey frame as CSV."""
+    df.to_csv(path, index=False)
+
+def _append_csv_backend(path, rows):
+    """
+    Append journey rows to a CSV file and fsync it.
+    
+    Returns the new rows parsed back from the written text, or None if the
+    file's header lacks some of the row columns and needs a full rewrite.
+    """
+    header = _read_csv_header(path)
+    fields = set(rows.columns)
+    
+    if header is not None and not fields.issubset(header):
+        return None
+    
+    write_header = header is None
+    columns = header if header is not None else JOURNEY_COLUMNS + sorted(fields - set(JOURNEY_COLUMNS))
+    row_text = rows.reindex(columns=columns).to_csv(header=False, index=False)
+    
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a+', newline='') as f:
+        if write_header:
+            f.write(','.join(columns) + '\n')
+        else:
+            # Guard against a file that was left without a trailing newline
+            f.seek(0, os.SEEK_END)
+            if f.tell() > 0:
+                f.seek(f.tell() - 1)
+                if f.read(1) != '\n':
+                    f.write('\n')
+        f.write(row_text)
+        f.flush()
+        os.fsync(f.fileno())
+    
+    return pd.read_csv(io.StringIO(row_text), names=columns)
+
+def _read_parquet_backend(path, columns=None):
+    """Read a Parquet journey file, optionally limited to some columns."""
+    import pyarrow.parquet as pq
+    
+    if columns is not None:
+        available = pq.read_schema(path).names
+        columns = [column for column in available if column in columns]
+    return pd.read_parquet(path, columns=columns)
+
+def _write_parquet_backend(df, path):
+    """Write a journey frame as Parquet."""
+    df.to_parquet(path, index=False)
+
+def _read_feather_backend(path, columns=None):
+    """Read a Feather (Arrow IPC) journey file, optionally limited to some columns."""
+    import pyarrow as pa
+    
+    if columns is not None:
+        with pa.memory_map(path) as source:
+            available = pa.ipc.open_file(source).schema.names
+        columns = [column for column in available if column in columns]
+    return pd.read_feather(path, columns=columns)
+
+def _write_feather_backend(df, path):
+    """Write a journey frame as Feather (Arrow IPC)."""
+    df.reset_index(drop=True).to_feather(path)
+
+# SQLite storage: one 'journeys' table ordered by its integer primary key
+_SQLITE_COLUMN_TYPES = {
+    'Date': 'TEXT',
+    'Start_Reading': 'REAL',
+    'End_Reading': 'REAL',
+    'Distance': 'REAL',
+    'Purpose': 'TEXT',
+    'Fuel_Consumption': 'REAL',
+    'Category': 'TEXT',
+    'Tags': 'TEXT',
+    'Fuel_Price': 'REAL',
+    'Cost': 'REAL',
+    'Vehicle': 'TEXT'
+}
+
+def _connect_sqlite(path):
+    """Open a SQLite journey database in WAL mode, creating the table and indexes if needed."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    column_defs = ', '.join(f'"{column}" {sql_type}' for column, sql_type in _SQLITE_COLUMN_TYPES.items())
+    conn.execute(f'CREATE TABLE IF NOT EXISTS journeys (id INTEGER PRIMARY KEY AUTOINCREMENT, {column_defs})')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_journeys_date ON journeys ("Date")')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_journeys_category ON journeys ("Category")')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_journeys_purpose ON journeys ("Purpose")')
+    return conn
+
+def _sqlite_columns(conn):
+    """Return the journey columns stored in a SQLite database, in table order."""
+    return [row[1] for row in conn.execute('PRAGMA table_info(journeys)') if row[1] != 'id']
+
+def _sqlite_select(path, columns=None, where='', params=()):
+    """Run a SELECT against the journeys table and return the rows as a DataFrame."""
+    conn = _connect_sqlite(path)
+    try:
+        available = _sqlite_columns(conn)
+        if columns is not None:
+            available = [column for column in available if column in columns]
+        column_list = ', '.join(f'"{column}"' for column in available)
+        query = f'SELECT {column_list} FROM journeys {where} ORDER BY id'
+        return pd.read_sql_query(query, conn, params=params)
+    finally:
+        conn.close()
+
+def _sqlite_insert(conn, df):
+    """Insert journey rows into the journeys table, adding any unknown columns first."""
+    existing = set(_sqlite_columns(conn))
+    for column in df.columns:
+        if column not in existing:
+            conn.execute(f'ALTER TABLE journeys ADD COLUMN "{column}"')
+    
+    rows = df.copy()
+    if 'Date' in rows.columns:
+        rows['Date'] = pd.to_datetime(rows['Date']).dt.strftime('%Y-%m-%d')
+    rows = rows.astype(object).where(rows.notna(), None)
+    
+    column_list = ', '.join(f'"{column}"' for column in rows.columns)
+    placeholders = ', '.join('?' for _ in rows.columns)
+    conn.executemany(
+        f'INSERT INTO journeys ({column_list}) VALUES ({placeholders})',
+        rows.itertuples(index=False, name=None)
+    )
+
+def _read_sqlite_backend(path, columns=None):
+    """Read journeys from a SQLite database, optionally limited to some columns."""
+    return _sqlite_select(path, columns)
+
+def _write_sqlite_backend(df, path):
+    """Replace all journeys in a SQLite database in a single transaction."""
+    conn = _connect_sqlite(path)
+    try:
+        with conn:
+            conn.execute('DELETE FROM journeys')
+            _sqlite_insert(conn, df)
+    finally:
+        conn.close()
+
+def _append_sqlite_backend(path, rows):
+    """Insert journey rows into a SQLite database and return them as stored."""
+    conn = _connect_sqlite(path)
+    try:
+        with conn:
+            last_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM journeys').fetchone()[0]
+            _sqlite_insert(conn, rows)
+    finally:
+        conn.close()
+    return _sqlite_select(path, where='WHERE id > ?', params=(last_id,))
+
+# Storage backends by data file extension.
+# - typed: the format keeps column dtypes, so loading skips the CSV re-coercion
+# - append: adds rows without rewriting the file (columnar formats have none)
+# - transactional: the backend writes atomically itself, so save_data does not
+#   go through a temporary file
+# Parquet and Feather need the optional 'pyarrow' package.
+STORAGE_BACKENDS = {
+    '.csv': {
+        'read': _read_csv_backend,
+        'write': _write_csv_backend,
+        'append': _append_csv_backend,
+        'typed': False,
+        'transactional': False
+    },
+    '.parquet': {
+        'read': _read_parquet_backend,
+        'write': _write_parquet_backend,
+        'append': None,
+        'typed': True,
+        'transactional': False
+    },
+    '.feather': {
+        'read': _read_feather_backend,
+        'write': _write_feather_backend,
+        'append': None,
+        'typed': True,
+        'transactional': False
+    },
+    '.db': {
+        'read': _read_sqlite_backend,
+        'write': _write_sqlite_backend,
+        'append': _append_sqlite_backend,
+        'typed': False,
+        'transactional': True
+    }
+}
+STORAGE_BACKENDS['.sqlite'] = STORAGE_BACKENDS['.db']
+
+def _get_storage_backend(path):
+    """Return the storage backend for a data file based on its extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in STORAGE_BACKENDS:
+        raise ValueError(f"Unsupported journey file format '{extension}'. Use one of: {', '.join(STORAGE_BACKENDS)}")
+    return STORAGE_BACKENDS[extension]
+
+def _read_journeys(path, columns=None):
+    """Read a journey file with its storage backend and normalize it to the current schema."""
+    backend = _get_storage_backend(path)
+    
+    read_columns = None
+    if columns is not None:
+        read_columns = set(columns)
+        if 'Cost' in read_columns:
+            # Needed to backfill Cost for files that predate the column
+            read_columns.update(['Fuel_Consumption', 'Fuel_Price'])
+    
+    df = _normalize_journeys(backend['read'](path, read_columns), typed=backend['typed'])
+    if columns is not None:
+        df = df[[column for column in columns if column in df.columns]]
+    return df
+
+def _normalize_journeys(df, typed=False):
+    """Coerce freshly parsed journey rows to the current schema, in place."""
+    if 'Date' in df.columns and (not typed or pd.api.types.is_datetime64_any_dtype(df['Date'])):
+        df['Date'] = pd.to_datetime(df['Date']).dt.date
+    
+    # Columns that are entirely empty come back as objects (e.g. NULLs from SQLite)
+    for column in _NUMERIC_COLUMNS:
+        if column in df.columns and df[column].dtype == object:
+            df[column] = pd.to_numeric(df[column], errors='coerce')
+    
+    # Handle backward compatibility for new columns
+    if 'Category' not in df.columns:
+        df['Category'] = 'Personal'  # Default category
+    
+    if 'Tags' not in df.columns:
+        df['Tags'] = ''  # Empty tags by default
+    
+    if 'Fuel_Price' not in df.columns:
+        df['Fuel_Price'] = DEFAULT_FUEL_PRICE
+    
+    if 'Vehicle' not in df.columns:
+        df['Vehicle'] = DEFAULT_VEHICLE  # Logs from before vehicle partitions
+    
+    if 'Cost' not in df.columns and 'Fuel_Consumption' in df.columns:
+        # Calculate cost for existing entries (column-wise equivalent of calculate_journey_cost)
+        fuel = pd.to_numeric(df['Fuel_Consumption'], errors='coerce')
+        price = pd.to_numeric(df['Fuel_Price'], errors='coerce')
+        df['Cost'] = (fuel * price).where((fuel > 0) & price.notna(), 0.0)
+    
+    return df
+
+def _cached_frame(entry, columns):
+    """Return a cached frame for the requested columns from a store entry, or None."""
+    frames = entry['frames']
+    if None in frames:
+        df = frames[None]
+        if columns is None:
+            return df
+        return df[[column for column in columns if column in df.columns]]
+    return frames.get(tuple(columns)) if columns is not None else None
+
+def normalize_vehicle_id(vehicle):
+    """Turn a vehicle name into a vehicle id usable as a partition file name."""
+    vehicle_id = re.sub(r'[^A-Za-z0-9_-]+', '_', str(vehicle).strip()).strip('_')
+    return vehicle_id or DEFAULT_VEHICLE
+
+def get_vehicle_data_file(vehicle=None):
+    """Return the journey file holding a vehicle's partition (DATA_FILE for the default vehicle)."""
+    if vehicle is None:
+        return DATA_FILE
+    vehicle_id = normalize_vehicle_id(vehicle)
+    if vehicle_id == DEFAULT_VEHICLE:
+        return DATA_FILE
+    return os.path.join(VEHICLES_DIR, vehicle_id + os.path.splitext(DATA_FILE)[1])
+
+def list_vehicles():
+    """Return the ids of all vehicles with a journey partition, default vehicle first."""
+    extension = os.path.splitext(DATA_FILE)[1]
+    vehicles = []
+    if os.path.isdir(VEHICLES_DIR):
+        for name in os.listdir(VEHICLES_DIR):
+            vehicle_id, file_extension = os.path.splitext(name)
+            # Skip temporary files left by save_data and sidecar files
+            if file_extension == extension and not name.startswith('.') and '.' not in vehicle_id:
+                vehicles.append(vehicle_id)
+    return [DEFAULT_VEHICLE] + sorted(vehicle for vehicle in vehicles if vehicle != DEFAULT_VEHICLE)
+
+def add_vehicle(vehicle):
+    """
+    Create an empty journey partition for a vehicle if it has none yet.
+    
+    Returns the vehicle id
+    """
+    vehicle_id = normalize_vehicle_id(vehicle)
+    _load_journeys(get_vehicle_data_file(vehicle_id))
+    return vehicle_id
+
+def load_data(columns=None, vehicle=None):
+    """
+    Load journey data from the journey file.
+    
+    The parsed DataFrame is cached process-wide and reused until the file's
+    mtime/size changes or the data is written through save_data. Callers get
+    their own copy, so modifying it never leaks into other sessions.
+    
+    Parameters:
+    - columns: list of columns to load (optional, defaults to all). Columnar
+      backends only read these columns from disk.
+    - vehicle: vehicle whose partition to load (optional, defaults to the
+      default vehicle). Only that vehicle's file is read.
+    """
+    return _load_journeys(get_vehicle_data_file(vehicle), columns).copy()
+
+def get_journey_frame(columns=None, vehicle=None):
+    """
+    Return the shared cached journey frame of a vehicle without copying it.
+    
+    For read-only views that render from row positions (see
+    get_journey_sort_order). Modifying the returned frame would change it
+    for every session, so use load_data for a private copy.
+    """
+    return _load_journeys(get_vehicle_data_file(vehicle), columns)
+
+def _load_journeys(path, columns=None):
+    """Return the cached journey frame of a data file, loading it if needed. Callers must not modify it."""
+    global _journey_store_version
+    
+    if not os.path.exists(path):
+        # Create data directory if it doesn't exist
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # Create empty DataFrame with specified columns
+        df = pd.DataFrame(columns=JOURNEY_COLUMNS)
+        _get_storage_backend(path)['write'](df, path)
+        return df if columns is None else df[[column for column in columns if column in df.columns]]
+    
+    key = _data_file_key(path)
+    with _journey_store_lock:
+        entry = _journey_store.get(path)
+        if entry is not None and entry['key'] == key:
+            df = _cached_frame(entry, columns)
+            if df is not None:
+                _journey_store_stats['hits'] += 1
+                return df
+    
+    df = _read_journeys(path, columns)
+    
+    with _journey_store_lock:
+        _journey_store_stats['misses'] += 1
+        entry = _journey_store.get(path)
+        if entry is None or entry['key'] != key:
+            _journey_store_version += 1
+            entry = {'key': key, 'frames': {}, 'version': _journey_store_version}
+            _journey_store[path] = entry
+        entry['frames'][None if columns is None else tuple(columns)] = df
+    
+    return df
+
+def invalidate_data_cache(path=None):
+    """Drop cached journey data for one data file, or for all files if path is None."""
+    with _journey_store_lock:
+        if path is None:
+            _journey_store.clear()
+        else:
+            _journey_store.pop(path, None)
+
+def register_data_change_hook(hook):
+    """
+    Register a function to be called whenever journey data is written.
+    
+    The hook is called as hook(path, new_rows): new_rows is a DataFrame of the
+    appended journeys after append_journey, or None after a full save_data
+    rewrite. Derived caches use this to update or drop their state.
+    """
+    if hook not in _data_change_hooks:
+        _data_change_hooks.append(hook)
+
+def _notify_data_changed(path, new_rows=None):
+    """Call every registered data change hook."""
+    for hook in list(_data_change_hooks):
+        hook(path, new_rows)
+
+def get_data_cache_stats():
+    """Return hit/miss counters and the number of cached files for the journey store."""
+    with _journey_store_lock:
+        return {
+            'hits': _journey_store_stats['hits'],
+            'misses': _journey_store_stats['misses'],
+            'cached_files': len(_journey_store)
+        }
+
+def get_data_version(path=None):
+    """
+    Return the version number of the cached journey data.
+    
+    The version changes every time the data is (re)loaded from disk, so it can
+    be used to key derived caches. Returns None if the data is not cached.
+    """
+    with _journey_store_lock:
+        entry = _journey_store.get(path or DATA_FILE)
+        return entry['version'] if entry is not None else None
+
+def _frame_data_version(path, df):
+    """
+    Return the data version of a cached journey frame handed out by
+    _load_journeys (e.g. through get_journey_frame), or None for any other
+    frame, including frames cached for an older version.
+    """
+    with _journey_store_lock:
+        entry = _journey_store.get(path)
+        if entry is not None and any(frame is df for frame in entry['frames'].values()):
+            return entry['version']
+    return None
+
+def _describes_journey_frame(path, df, version, count):
+    """
+    Return whether a derived cache built from data version `version` with
+    `count` rows describes df, a journey frame of the file at path.
+    
+    Cached frames are matched by version; for other frames (e.g. copies from
+    load_data) matching row counts is the best available check.
+    """
+    frame_version = _frame_data_version(path, df)
+    if frame_version is not None:
+        return version == frame_version
+    return count == len(df)
+
+def get_appended_data_version(path=None):
+    """
+    Return (previous_version, version) if the cached journey data last
+    changed by append_journeys extending it in place, otherwise None.
+    
+    Derived caches built for previous_version can be brought up to version
+    by folding in just the appended rows handed to their data change hook.
+    """
+    with _journey_store_lock:
+        entry = _journey_store.get(path or DATA_FILE)
+        if entry is None or 'previous_version' not in entry:
+            return None
+        return entry['previous_version'], entry['version']
+
+def append_journey(record, vehicle=None):
+    """
+    Append a single journey to the data file without rewriting it.
+    
+    Only the new row is written (with a header if a CSV file is new) and
+    flushed to disk, so inserts cost the same however long the log grows.
+    CSV files written by older versions that lack some columns are upgraded
+    once through a full save_data rewrite, as are columnar files, which
+    cannot be appended to in place.
+    
+    Parameters:
+    - record: dictionary with the journey fields (see JOURNEY_COLUMNS)
+    - vehicle: vehicle whose partition the journey goes to (optional,
+      defaults to the default vehicle)
+    """
+    append_journeys(pd.DataFrame([record]), vehicle)
+
+def _cast_like(rows, frame):
+    """
+    Cast appended rows to the column dtypes of a cached frame, so the
+    extended frame is typed exactly as a fresh reload would be.
+    
+    Columns whose values cannot take the cached dtype are left as they are.
+    """
+    casted = {}
+    for column in rows.columns:
+        dtype = frame[column].dtype
+        if rows[column].dtype != dtype:
+            try:
+                casted[column] = rows[column].astype(dtype)
+            except (TypeError, ValueError):
+                pass
+    return rows.assign(**casted) if casted else rows
+
+def append_journeys(rows, vehicle=None):
+    """
+    Append several journeys to the data file in one write.
+    
+    Same storage rules as append_journey. The rows' Vehicle column is set
+    to the vehicle they are stored for.
+    
+    Parameters:
+    - rows: DataFrame with the journey fields (see JOURNEY_COLUMNS)
+    - vehicle: vehicle whose partition the journeys go to (optional,
+      defaults to the default vehicle)
+    """
+    global _journey_store_version
+    
+    path = get_vehicle_data_file(vehicle)
+    rows = rows.assign(Vehicle=normalize_vehicle_id(vehicle) if vehicle is not None else DEFAULT_VEHICLE)
+    
+    with _journey_write_lock:
+        backend = _get_storage_backend(path)
+        key_before = _data_file_key(path)
+        
+        new_rows = backend['append'](path, rows) if backend['append'] else None
+        if new_rows is None:
+            df = pd.concat([_load_journeys(path), rows], ignore_index=True)
+            save_data(df, path)
+            return
+        
+        # Normalize the rows exactly as a full reload would and extend the cached frames
+        new_rows = _normalize_journeys(new_rows, typed=backend['typed'])
+        _append_running_statistics(path, key_before, new_rows)
+        with _journey_store_lock:
+            entry = _journey_store.get(path)
+            if entry is not None and key_before is not None and entry['key'] == key_before:
+                _journey_store_version += 1
+                entry['frames'] = {
+                    cols: pd.concat([frame, _cast_like(new_rows[frame.columns], frame)], ignore_index=True)
+                    for cols, frame in entry['frames'].items()
+                }
+                entry['key'] = _data_file_key(path)
+                entry['previous_version'] = entry['version']
+                entry['version'] = _journey_store_version
+            else:
+                _journey_store.pop(path, None)
+        
+        _notify_data_changed(path, new_rows)
+
+def save_data(df, path=None, vehicle=None):
+    """
+    Save journey data to the journey file.
+    
+    The data is written to a temporary file that is then renamed over the
+    journey log, so a crash mid-write never leaves a truncated file. Use
+    append_journey for single inserts.
+    
+    Parameters:
+    - df: DataFrame with all journeys
+    - path: destination file (optional, defaults to the vehicle's partition).
+      The extension selects the storage backend.
+    - vehicle: vehicle whose partition to replace (optional, defaults to the
+      default vehicle)
+    """
+    path = path or get_vehicle_data_file(vehicle)
+    backend = _get_storage_backend(path)
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    
+    with _journey_write_lock:
+        if backend['transactional']:
+            backend['write'](df, path)
+        else:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.journeys-', suffix=os.path.splitext(path)[1])
+            os.close(fd)
+            try:
+                backend['write'](df, tmp_path)
+                with open(tmp_path, 'rb') as f:
+                    os.fsync(f.fileno())
+                if os.path.exists(path):
+                    shutil.copymode(path, tmp_path)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+        
+        invalidate_data_cache(path)
+        _save_running_statistics(path, build_running_statistics(df))
+        _notify_data_changed(path)
+
+def migrate_csv_to_columnar(csv_path=None, dest_path=None):
+    """
+    Convert a CSV journey log into a typed columnar file (Parquet or Feather).
+    
+    The CSV is read and normalized once, so the columnar copy already holds
+    the backfilled columns and proper dtypes. Point DATA_FILE (or the
+    JOURNEY_DATA_FILE environment variable) at the new file to use it.
+    
+    Parameters:
+    - csv_path: CSV journey file to convert (optional, defaults to DATA_FILE)
+    - dest_path: destination file (optional, defaults to the CSV path with a .parquet extension)
+    
+    Returns the destination path
+    """
+    csv_path = csv_path or DATA_FILE
+    if dest_path is None:
+        dest_path = os.path.splitext(csv_path)[0] + '.parquet'
+    
+    if not _get_storage_backend(dest_path)['typed']:
+        raise ValueError("Destination must be a columnar format such as .parquet or .feather")
+    
+    df = _read_journeys(csv_path)
+    save_data(df, dest_path)
+    return dest_path
+
+# Column names accepted by import_journeys_csv, after lowercasing and
+# replacing runs of other characters with '_'
+IMPORT_COLUMN_ALIASES = {
+    'date': 'Date', 'journey_date': 'Date', 'trip_date': 'Date',
+    'start_reading': 'Start_Reading', 'start': 'Start_Reading', 'start_km': 'Start_Reading',
+    'start_odometer': 'Start_Reading', 'odometer_start': 'Start_Reading', 'start_reading_km': 'Start_Reading',
+    'end_reading': 'End_Reading', 'end': 'End_Reading', 'end_km': 'End_Reading',
+    'end_odometer': 'End_Reading', 'odometer_end': 'End_Reading', 'end_reading_km': 'End_Reading',
+    'distance': 'Distance', 'distance_km': 'Distance', 'km': 'Distance',
+    'purpose': 'Purpose', 'description': 'Purpose',
+    'fuel_consumption': 'Fuel_Consumption', 'fuel': 'Fuel_Consumption', 'fuel_l': 'Fuel_Consumption',
+    'liters': 'Fuel_Consumption', 'litres': 'Fuel_Consumption', 'fuel_consumption_l': 'Fuel_Consumption',
+    'category': 'Category', 'tags': 'Tags',
+    'fuel_price': 'Fuel_Price', 'price_per_liter': 'Fuel_Price', 'price_per_litre': 'Fuel_Price',
+    'cost': 'Cost',
+    'vehicle': 'Vehicle', 'vehicle_id': 'Vehicle', 'car': 'Vehicle',
+    'registration': 'Vehicle', 'plate': 'Vehicle', 'license_plate': 'Vehicle'
+}
+
+# validate_journeys checks applied to imported rows. Odometer regressions
+# are left out: a chunk cannot see the journeys around it.
+IMPORT_VALIDATION_CHECKS = ['invalid_date', 'invalid_reading', 'negative_distance', 'future_date', 'distance_mismatch']
+
+def _map_import_columns(columns, column_map=None):
+    """Map the columns of an import file to journey columns; unknown columns map to None."""
+    mapping = {}
+    for column in columns:
+        if column_map and column in column_map:
+            mapping[column] = column_map[column]
+        elif column in JOURNEY_COLUMNS:
+            mapping[column] = column
+        else:
+            mapping[column] = IMPORT_COLUMN_ALIASES.get(re.sub(r'[^a-z0-9]+', '_', str(column).lower()).strip('_'))
+    return mapping
+
+def _prepare_import_chunk(chunk, vehicle=DEFAULT_VEHICLE):
+    """
+    Turn a chunk of mapped import rows into journey rows.
+    
+    Fills in the derived fields the journey form would (distance, tags
+    format, cost), gives rows without a vehicle the given one, and validates
+    the rows with validate_journeys.
+    
+    Returns (rows, reasons): the valid journey rows, and a Series with the
+    VALIDATION_FLAGS reason code of each rejected row
+    """
+    def column(name):
+        return chunk[name] if name in chunk.columns else pd.Series(np.nan, index=chunk.index)
+    
+    # ISO dates parse in one fast pass; anything else falls back to per-value parsing
+    raw_dates = column('Date')
+    dates = pd.to_datetime(raw_dates, errors='coerce', format='ISO8601')
+    retry = dates.isna() & raw_dates.notna()
+    if retry.any():
+        dates[retry] = pd.to_datetime(raw_dates[retry], errors='coerce', format='mixed')
+    start = pd.to_numeric(column('Start_Reading'), errors='coerce')
+    end = pd.to_numeric(column('End_Reading'), errors='coerce')
+    fuel = pd.to_numeric(column('Fuel_Consumption'), errors='coerce')
+    fuel = fuel.where(fuel > 0)
+    fuel_price = pd.to_numeric(column('Fuel_Price'), errors='coerce').fillna(DEFAULT_FUEL_PRICE)
+    fuel_cost = (fuel * fuel_price).fillna(0.0)
+    tags = column('Tags').fillna('').astype(str)
+    vehicles = column('Vehicle').fillna(vehicle).astype(str)
+    
+    rows = pd.DataFrame({
+        'Date': dates,
+        'Start_Reading': start,
+        'End_Reading': end,
+        'Distance': pd.to_numeric(column('Distance'), errors='coerce').fillna(end - start),
+        'Purpose': column('Purpose').fillna('').astype(str),
+        'Fuel_Consumption': fuel,
+        'Category': column('Category').fillna('Personal').astype(str),
+        'Tags': tags.map({value: format_tags_for_storage(parse_tags(value)) for value in tags.unique()}),
+        'Fuel_Price': fuel_price,
+        'Cost': pd.to_numeric(column('Cost'), errors='coerce').fillna(fuel_cost),
+        'Vehicle': vehicles.map({value: normalize_vehicle_id(value) for value in vehicles.unique()})
+    }, columns=JOURNEY_COLUMNS)
+    
+    valid, reasons = validate_journeys(rows, checks=IMPORT_VALIDATION_CHECKS)
+    rows = rows[valid].reset_index(drop=True)
+    rows['Date'] = rows['Date'].dt.date
+    return rows, reasons[~valid]
+
+def import_journeys_csv(source, chunksize=10000, column_map=None, progress=None, vehicle=None):
+    """
+    Import journeys in bulk from a CSV export, such as an odometer log.
+    
+    The file is streamed in chunks of chunksize rows, so memory use stays
+    bounded however large the export is. Each chunk's columns are mapped to
+    the journey schema (see IMPORT_COLUMN_ALIASES), rows failing
+    validate_journeys (IMPORT_VALIDATION_CHECKS) are rejected, and the rest
+    are appended with append_journeys. Rows go to the partition of their
+    Vehicle column when the export has one, otherwise to the given vehicle.
+    Columnar data files, which cannot be appended to, are rewritten once at
+    the end instead; their valid rows are held in memory until then, so
+    memory use is only bounded for appendable (CSV and SQLite) files.
+    
+    Parameters:
+    - source: path or file-like object of the CSV to import
+    - chunksize: number of rows read and appended at a time
+    - column_map: dictionary mapping source column names to journey columns (optional)
+    - progress: function called with the import report after every chunk (optional)
+    - vehicle: vehicle for rows without a vehicle of their own (optional,
+      defaults to the default vehicle)
+    
+    Returns a report dictionary with rows_read, rows_imported, rows_rejected,
+    rejected_reasons (rejected rows per failed check; a row can fail
+    several), seconds and rows_per_sec
+    """
+    report = {
+        'rows_read': 0,
+        'rows_imported': 0,
+        'rows_rejected': 0,
+        'rejected_reasons': {reason: 0 for reason in IMPORT_VALIDATION_CHECKS},
+        'seconds': 0.0,
+        'rows_per_sec': 0.0
+    }
+    started = time.perf_counter()
+    
+    default_vehicle = normalize_vehicle_id(vehicle) if vehicle is not None else DEFAULT_VEHICLE
+    
+    with _journey_write_lock:
+        appendable = _get_storage_backend(DATA_FILE)['append'] is not None
+        pending = {}
+        
+        for chunk in pd.read_csv(source, chunksize=chunksize, dtype=str, skipinitialspace=True):
+            mapping = _map_import_columns(chunk.columns, column_map)
+            chunk = chunk[[column for column, target in mapping.items() if target]]
+            chunk.columns = [mapping[column] for column in chunk.columns]
+            chunk = chunk.loc[:, ~chunk.columns.duplicated()]
+            
+            rows, reasons = _prepare_import_chunk(chunk, default_vehicle)
+            for vehicle_id, vehicle_rows in rows.groupby('Vehicle', sort=False):
+                if vehicle_id not in pending:
+                    # Dropping the cached frames up front saves extending them chunk by chunk
+                    invalidate_data_cache(get_vehicle_data_file(vehicle_id))
+                    pending[vehicle_id] = []
+                if appendable:
+                    append_journeys(vehicle_rows, vehicle_id)
+                else:
+                    pending[vehicle_id].append(vehicle_rows)
+            
+            report['rows_read'] += len(chunk)
+            report['rows_imported'] += len(rows)
+            report['rows_rejected'] += len(reasons)
+            for reason in report['rejected_reasons']:
+                report['rejected_reasons'][reason] += int(((reasons.to_numpy() & VALIDATION_FLAGS[reason]) != 0).sum())
+            report['seconds'] = time.perf_counter() - started
+            report['rows_per_sec'] = report['rows_read'] / report['seconds'] if report['seconds'] > 0 else 0.0
+            if progress is not None:
+                progress(report)
+        
+        for vehicle_id, vehicle_chunks in pending.items():
+            if vehicle_chunks:
+                append_journeys(pd.concat(vehicle_chunks, ignore_index=True), vehicle_id)
+    
+    report['seconds'] = time.perf_counter() - started
+    report['rows_per_sec'] = report['rows_read'] / report['seconds'] if report['seconds'] > 0 else 0.0
+    return report
+
+def query_journeys(start_date=None, end_date=None, category=None, tag=None, columns=None, vehicle=None, tag_match='any'):
+    """
+    Load only the journeys matching the given filters.
+    
+    With a SQLite journey file the filters run as indexed SQL queries, so
+    only matching rows are read. Other backends filter the cached frame.
+    
+    Parameters:
+    - start_date: earliest journey date, inclusive (optional)
+    - end_date: latest journey date, inclusive (optional)
+    - category: journey category (optional)
+    - tag: tag, or list of tags, that must be present on the journey (optional)
+    - columns: list of columns to return (optional, defaults to all)
+    - vehicle: vehicle whose partition to search (optional, defaults to the
+      default vehicle)
+    - tag_match: with several tags, 'any' to match journeys carrying at least
+      one of them or 'all' to require every tag (default 'any')
+    
+    Returns a DataFrame of matching journeys in storage order
+    """
+    if tag_match not in ('any', 'all'):
+        raise ValueError("tag_match must be 'any' or 'all'")
+    tags = None if tag is None else list(dict.fromkeys([tag] if isinstance(tag, str) else tag))
+    
+    path = get_vehicle_data_file(vehicle)
+    backend = _get_storage_backend(path)
+    
+    if backend['read'] is _read_sqlite_backend and os.path.exists(path):
+        conditions = []
+        params = []
+        if start_date is not None:
+            conditions.append('"Date" >= ?')
+            params.append(pd.Timestamp(start_date).strftime('%Y-%m-%d'))
+        if end_date is not None:
+            conditions.append('"Date" <= ?')
+            params.append(pd.Timestamp(end_date).strftime('%Y-%m-%d'))
+        if category is not None:
+            conditions.append('"Category" = ?')
+            params.append(category)
+        if tags is not None:
+            # Tags are stored as ', '-separated text; match whole tags only
+            tag_conditions = []
+            for tag in tags:
+                escaped = tag.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                tag_conditions.append("(',' || REPLACE(\"Tags\", ', ', ',') || ',') LIKE ? ESCAPE '\\'")
+                params.append(f'%,{escaped},%')
+            joiner = ' AND ' if tag_match == 'all' else ' OR '
+            conditions.append('(' + (joiner.join(tag_conditions) or '0') + ')')
+        
+        where = 'WHERE ' + ' AND '.join(conditions) if conditions else ''
+        df = _normalize_journeys(_sqlite_select(path, columns, where, params))
+        if columns is not None:
+            df = df[[column for column in columns if column in df.columns]]
+        return df
+    
+    load_columns = columns
+    if columns is not None:
+        # Load the filtered columns too, and drop them again after masking
+        load_columns = list(columns)
+        if (start_date is not None or end_date is not None) and 'Date' not in load_columns:
+            load_columns.append('Date')
+        if category is not None and 'Category' not in load_columns:
+            load_columns.append('Category')
+    df = load_data(columns=load_columns, vehicle=vehicle)
+    mask = pd.Series(True, index=df.index)
+    if start_date is not None:
+        mask &= df['Date'] >= pd.Timestamp(start_date).date()
+    if end_date is not None:
+        mask &= df['Date'] <= pd.Timestamp(end_date).date()
+    if category is not None:
+        mask &= df['Category'] == category
+    if tags is not None:
+        # Row numbers from the tag index are positions in the load_data frame
+        tagged = np.zeros(len(df), dtype=bool)
+        tagged[find_journey_rows_by_tags(tags, tag_match, path)] = True
+        mask &= tagged
+    df = df[mask]
+    if columns is not None:
+        df = df[[column for column in columns if column in df.columns]]
+    return df
+
+def get_journeys_in_date_range(start_date, end_date, columns=None, vehicle=None):
+    """Load journeys dated between start_date and end_date (inclusive)."""
+    return query_journeys(start_date=start_date, end_date=end_date, columns=columns, vehicle=vehicle)
+
+def get_journeys_by_category(category, columns=None, vehicle=None):
+    """Load journeys of one category."""
+    return query_journeys(category=category, columns=columns, vehicle=vehicle)
+
+def get_journeys_by_tag(tag, columns=None, vehicle=None, tag_match='any'):
+    """Load journeys carrying a given tag (or any/all of a list of tags)."""
+    return query_journeys(tag=tag, columns=columns, vehicle=vehicle, tag_match=tag_match)
+
+# Page sizes offered by the paginated journey history
+JOURNEY_PAGE_SIZES = [25, 50, 100, 250]
+
+def get_journey_filter_mask(df, category=None, tag=None, tag_match='any', vehicle=None):
+    """
+    Return a boolean array selecting the journeys of a vehicle's load_data
+    frame that match the filters, without copying any rows.
+    
+    Tag filters are answered from the inverted tag index (see get_tag_index).
+    If the cached index was built from a different data version than df
+    (e.g. a journey was appended in between), an index of df's own tags is
+    built instead, so row positions always refer to df.
+    
+    Parameters:
+    - df: The vehicle's full journey frame (see get_journey_frame)
+    - category: journey category (optional)
+    - tag: tag, or list of tags, that must be present on the journey (optional)
+    - tag_match: 'any' or 'all' when several tags are given (default 'any')
+    - vehicle: vehicle the frame belongs to (optional, defaults to the default vehicle)
+    """
+    mask = np.ones(len(df), dtype=bool)
+    if category is not None:
+        mask &= (df['Category'] == category).to_numpy(dtype=bool, na_value=False)
+    if tag is not None:
+        path = get_vehicle_data_file(vehicle)
+        index = get_tag_index(path)
+        if not _describes_journey_frame(path, df, index['version'], index['count']):
+            index = {'postings': _tag_postings(encode_tags(df['Tags']))}
+        tagged = np.zeros(len(df), dtype=bool)
+        tagged[find_journey_rows_by_tags(tag, tag_match, index=index)] = True
+        mask &= tagged
+    return mask
+
+def sort_journey_positions(df, column, ascending=True):
+    """
+    Return the row positions of df ordered by one column.
+    
+    Ties keep their storage order and missing values sort last, whichever
+    the direction.
+    """
+    values = df[column].reset_index(drop=True)
+    return values.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+
+# Display labels of journeys by data file path, cached per data version.
+# See get_journey_labels.
+_journey_labels = {}
+_journey_labels_lock = threading.Lock()
+
+# Most journeys offered at once by the journey picker
+JOURNEY_PICKER_LIMIT = 200
+
+def format_journey_labels(df):
+    """
+    Format 'Date - Purpose (Distance km)' labels for a frame of journeys
+    with vectorized string operations.
+    
+    Returns a NumPy array of label strings, one per row
+    """
+    distance = np.char.mod('%.1f', pd.to_numeric(df['Distance'], errors='coerce').to_numpy(dtype=float))
+    labels = df['Date'].astype(str) + ' - ' + df['Purpose'].fillna('').astype(str) + ' (' + distance + ' km)'
+    return labels.to_numpy(dtype=object)
+
+def get_journey_labels(vehicle=None, df=None):
+    """
+    Return the display labels of a vehicle's journeys, by load_data row position.
+    
+    Labels are formatted once per data version and extended as journeys are
+    appended (see _update_journey_labels).
+    
+    Parameters:
+    - vehicle: Vehicle whose journeys to label (defaults to the default vehicle)
+    - df: The journey frame the labels will be used with (optional). If the
+      cached labels come from a different data version than df, labels are
+      formatted from df itself so positions always line up.
+    """
+    path = get_vehicle_data_file(vehicle)
+    cached = _cached_journey_labels(path)
+    if df is not None and not _describes_journey_frame(path, df, cached['version'], len(cached['labels'])):
+        return format_journey_labels(df)
+    return cached['labels']
+
+def _cached_journey_labels(path):
+    """Return the label cache entry of a journey file, building it if needed."""
+    key = _data_file_key(path)
+    with _journey_store_lock:
+        entry = _journey_store.get(path)
+        version = entry['version'] if entry is not None and entry['key'] == key else None
+    with _journey_labels_lock:
+        cached = _journey_labels.get(path)
+        if cached is not None and version is not None and cached['version'] == version:
+            return cached
+    
+    df = _load_journeys(path, ['Date', 'Purpose', 'Distance'])
+    cached = {'labels': format_journey_labels(df), 'version': get_data_version(path)}
+    with _journey_labels_lock:
+        _journey_labels[path] = cached
+    return cached
+
+def _update_journey_labels(path, new_rows):
+    """
+    Add labels for appended journeys to a cached label array, or drop it
+    after a rewrite. Registered as a data change hook.
+    """
+    with _journey_labels_lock:
+        cached = _journey_labels.get(path)
+        versions = get_appended_data_version(path)
+        if cached is None:
+            return
+        if new_rows is None or versions is None or cached['version'] != versions[0]:
+            del _journey_labels[path]
+            return
+        cached['labels'] = np.concatenate([cached['labels'], format_journey_labels(new_rows)])
+        cached['version'] = versions[1]
+
+register_data_change_hook(_update_journey_labels)
+
+def search_journey_labels(labels, positions, query, limit=JOURNEY_PICKER_LIMIT):
+    """
+    Return the positions whose label contains every word of a search query.
+    
+    Parameters:
+    - labels: Label array from get_journey_labels
+    - positions: Row positions to search, in display order
+    - query: Search text, matched case-insensitively against date and purpose
+    - limit: Most positions to return (None for all)
+    
+    Returns (matching positions, number of matches before the limit)
+    """
+    words = query.lower().split()
+    if words:
+        candidates = pd.Series(labels[positions]).str.lower()
+        matches = np.ones(len(positions), dtype=bool)
+        for word in words:
+            matches &= candidates.str.contains(word, regex=False).to_numpy(dtype=bool)
+        positions = positions[matches]
+    total = len(positions)
+    return (positions if limit is None else positions[:limit]), total
+
+# Sort permutations of journey files by path, for the data version they
+# were computed from: {'version', 'count', 'orders': {(column, ascending): positions}}.
+# See get_journey_sort_order.
+_sort_orders = {}
+_sort_orders_lock = threading.Lock()
+
+def get_journey_sort_order(df, column, ascending=True, vehicle=None):
+    """
+    Return the row positions of a vehicle's journeys ordered by one column.
+    
+    Each (column, direction) permutation is computed once per data version
+    and cached, so switching the sort column or direction is a lookup;
+    combining it with a filter mask is then a single O(N) take.
+    
+    Parameters:
+    - df: The vehicle's full journey frame (see get_journey_frame)
+    - column: Column to sort by
+    - ascending: Sort direction (default True)
+    - vehicle: vehicle the frame belongs to (optional, defaults to the default vehicle)
+    
+    Only frames handed out by get_journey_frame are cached by their data
+    version; any other frame is sorted directly.
+    
+    Returns a read-only array of row positions, as sort_journey_positions
+    """
+    path = get_vehicle_data_file(vehicle)
+    version = _frame_data_version(path, df)
+    if version is None:
+        order = sort_journey_positions(df, column, ascending)
+        order.flags.writeable = False
+        return order
+    
+    with _sort_orders_lock:
+        cached = _sort_orders.get(path)
+        if cached is None or cached['version'] != version or cached['count'] != len(df):
+            cached = {'version': version, 'count': len(df), 'orders': {}}
+            _sort_orders[path] = cached
+        order = cached['orders'].get((column, ascending))
+    if order is not None:
+        return order
+    
+    order = sort_journey_positions(df, column, ascending)
+    order.flags.writeable = False
+    with _sort_orders_lock:
+        cached['orders'][(column, ascending)] = order
+    return order
+
+def get_journey_page(df, positions, page=1, page_size=50):
+    """
+    Return one page of journeys from an ordered array of row positions.
+    
+    Only the rows of the requested page are taken from df, so the cost
+    does not grow with the length of the history.
+    
+    Parameters:
+    - df: Journey frame the positions refer to
+    - positions: Row positions in display order (e.g. from sort_journey_positions)
+    - page: 1-based page number, clamped to the available pages
+    - page_size: Number of journeys per page
+    
+    Returns (page frame, page number, page count)
+    """
+    page_count = max(1, -(-len(positions) // page_size))
+    page = min(max(1, int(page)), page_count)
+    start = (page - 1) * page_size
+    return df.iloc[positions[start:start + page_size]], page, page_count
+
+# Layout version of the persisted running statistics; files written with a
+# different version are rebuilt
+RUNNING_STATISTICS_VERSION = 2
+
+def _iso_week_keys(days):
+    """Return 'YYYY-Www' ISO week keys for a datetime Series."""
+    iso = days.dt.isocalendar()
+    return iso['year'].astype(str) + '-W' + iso['week'].astype(str).str.zfill(2)
+
+# Rollup tables kept in the running statistics: period name -> function
+# turning a datetime Series into period keys
+ROLLUP_PERIODS = {
+    'daily': lambda days: days.dt.strftime('%Y-%m-%d'),
+    'weekly': _iso_week_keys,
+    'monthly': lambda days: days.dt.strftime('%Y-%m')
+}
+
+# Size in bytes at which the running statistics delta log is compacted into
+# the statistics file during an append
+RUNNING_STATISTICS_LOG_LIMIT = 256 * 1024
+
+def _running_statistics_path(path):
+    """Return the path of the running statistics file kept next to a journey file."""
+    return os.path.splitext(path)[0] + '.stats.json'
+
+def _running_statistics_log_path(path):
+    """Return the path of the running statistics delta log kept next to a journey file."""
+    return os.path.splitext(path)[0] + '.stats.log'
+
+def build_running_statistics(df):
+    """
+    Build running aggregates (counts, sums, max, per-month and per-category
+    accumulators, and the daily/weekly/monthly rollups) from a journey frame.
+    
+    This is the full rebuild; append_journey keeps the persisted aggregates
+    up to date by merging in the aggregates of each new journey.
+    
+    Parameters:
+    - df: DataFrame with journey information
+    
+    Returns a JSON-serializable dictionary of aggregates
+    """
+    distance = pd.to_numeric(df['Distance'], errors='coerce') if 'Distance' in df.columns else pd.Series(dtype=float)
+    fuel = pd.to_numeric(df['Fuel_Consumption'], errors='coerce') if 'Fuel_Consumption' in df.columns else pd.Series(np.nan, index=df.index)
+    cost = pd.to_numeric(df['Cost'], errors='coerce') if 'Cost' in df.columns else pd.Series(0.0, index=df.index)
+    
+    aggregates = {
+        'count': int(len(df)),
+        'distance_sum': float(distance.sum()),
+        'distance_max': None if distance.dropna().empty else float(distance.max()),
+        'fuel_sum': float(fuel.sum()),
+        'fuel_count': int(fuel.notna().sum()),
+        'fuel_distance_sum': float(distance[fuel.notna()].sum()),
+        'cost_sum': float(cost.sum()),
+        'co2_sum': float(calculate_co2_emissions_series(distance, fuel).sum()),
+        'monthly': {},
+        'categories': {}
+    }
+    
+    if len(df) > 0 and 'Date' in df.columns:
+        months = pd.to_datetime(df['Date']).dt.strftime('%Y-%m')
+        monthly = distance.groupby(months).agg(['sum', 'count'])
+        aggregates['monthly'] = {
+            month: {'distance': float(row['sum']), 'count': int(row['count'])}
+            for month, row in monthly.iterrows()
+        }
+    
+    if len(df) > 0 and 'Category' in df.columns:
+        by_category = pd.DataFrame({'distance': distance, 'cost': cost}).groupby(df['Category'])
+        category_sums = by_category.sum()
+        category_counts = by_category.size()
+        aggregates['categories'] = {
+            category: {
+                'distance': float(category_sums.at[category, 'distance']),
+                'cost': float(category_sums.at[category, 'cost']),
+                'count': int(category_counts[category])
+            }
+            for category in category_sums.index
+        }
+    
+    aggregates['rollups'] = _build_rollups(df, distance, fuel, cost)
+    
+    return aggregates
+
+def _build_rollups(df, distance, fuel, cost):
+    """
+    Build the daily, ISO-weekly and monthly per-category rollups of a journey frame.
+    
+    Journeys are summed per (day, category) first; the weekly and monthly
+    rollups are then summed from those day rows rather than from the journeys.
+    """
+    rollups = {period: {} for period in ROLLUP_PERIODS}
+    if len(df) == 0 or 'Date' not in df.columns:
+        return rollups
+    
+    days = pd.to_datetime(df['Date'], errors='coerce').dt.normalize()
+    category = df['Category'].fillna('Other') if 'Category' in df.columns else pd.Series('Other', index=df.index)
+    values = pd.DataFrame({
+        'Day': days,
+        'Category': category.astype(str),
+        'distance': distance.fillna(0),
+        'fuel': fuel.fillna(0),
+        'cost': cost.fillna(0),
+        'co2': calculate_co2_emissions_series(distance, fuel).fillna(0),
+        'count': 1
+    }).dropna(subset=['Day'])
+    daily = values.groupby(['Day', 'Category'], sort=False).sum().reset_index()
+    
+    for period, period_key in ROLLUP_PERIODS.items():
+        grouped = daily.assign(Day=period_key(daily['Day'])).groupby(['Day', 'Category'], sort=True).sum()
+        table = rollups[period]
+        for (key, cat), sums in grouped.to_dict('index').items():
+            table.setdefault(key, {})[cat] = {
+                'distance': float(sums['distance']),
+                'fuel': float(sums['fuel']),
+                'cost': float(sums['cost']),
+                'co2': float(sums['co2']),
+                'count': int(sums['count'])
+            }
+    return rollups
+
+def _merge_accumulators(target, source):
+    """Add the numbers of a nested accumulator dictionary into target, in place."""
+    for key, value in source.items():
+        if isinstance(value, dict):
+            _merge_accumulators(target.setdefault(key, {}), value)
+        else:
+            target[key] = target.get(key, 0) + value
+    return target
+
+def merge_running_statistics(first, second):
+    """
+    Combine two sets of running aggregates into one.
+    
+    Cost is proportional to the size of both sets' accumulators, which grow
+    with the number of days, weeks, months and categories covered rather
+    than with the number of journeys.
+    """
+    merged = {
+        'count': first['count'] + second['count'],
+        'distance_sum': first['distance_sum'] + second['distance_sum'],
+        'fuel_sum': first['fuel_sum'] + second['fuel_sum'],
+        'fuel_count': first['fuel_count'] + second['fuel_count'],
+        'fuel_distance_sum': first['fuel_distance_sum'] + second['fuel_distance_sum'],
+        'cost_sum': first['cost_sum'] + second['cost_sum'],
+        'co2_sum': first['co2_sum'] + second['co2_sum'],
+    }
+    
+    maxima = [value for value in (first['distance_max'], second['distance_max']) if value is not None]
+    merged['distance_max'] = max(maxima) if maxima else None
+    
+    for section in ('monthly', 'categories', 'rollups'):
+        merged[section] = _merge_accumulators(copy.deepcopy(first.get(section, {})), second.get(section, {}))
+    
+    return merged
+
+def _save_running_statistics(path, aggregates):
+    """
+    Persist running aggregates next to a journey file, tagged with the file's
+    fingerprint. The delta log is folded into them, so it is removed.
+    """
+    stats_path = _running_statistics_path(path)
+    key = _data_file_key(path)
+    payload = {
+        'version': RUNNING_STATISTICS_VERSION,
+        'data_key': list(key) if key is not None else None,
+        'aggregates': aggregates
+    }
+    
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(stats_path) or '.', prefix='.stats-', suffix='.json')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(payload, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, stats_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    
+    if os.path.exists(_running_statistics_log_path(path)):
+        os.unlink(_running_statistics_log_path(path))
+
+def _read_running_statistics(path):
+    """
+    Return the persisted running statistics payload for a journey file, or None.
+    
+    Payloads written by an older layout of the aggregates are removed and
+    treated as missing, so they get rebuilt.
+    """
+    stats_path = _running_statistics_path(path)
+    try:
+        with open(stats_path, 'r') as f:
+            payload = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if payload.get('version') != RUNNING_STATISTICS_VERSION:
+        os.unlink(stats_path)
+        return None
+    return payload
+
+def _read_running_statistics_log(path):
+    """Return the deltas recorded in the running statistics log of a journey file."""
+    deltas = []
+    try:
+        with open(_running_statistics_log_path(path), 'r') as f:
+            for line in f:
+                try:
+                    deltas.append(json.loads(line))
+                except ValueError:
+                    # A line cut short by a crash ends the usable log
+                    break
+    except FileNotFoundError:
+        pass
+    return deltas
+
+def _append_running_statistics(path, key_before, new_rows):
+    """
+    Record the aggregates of newly appended journeys in the delta log.
+    
+    Each append writes one line holding the new journeys' aggregates and the
+    file fingerprints before and after the append, so its cost does not
+    depend on the size of the persisted aggregates. load_running_statistics
+    replays the log and compacts it into the statistics file; the log is
+    also compacted here once it grows past RUNNING_STATISTICS_LOG_LIMIT.
+    Deltas that do not chain on to the persisted aggregates (e.g. the file
+    was changed elsewhere) make the next load rebuild from scratch.
+    """
+    key_after = _data_file_key(path)
+    if key_before is None or key_after is None or not os.path.exists(_running_statistics_path(path)):
+        return
+    
+    delta = {
+        'key_before': list(key_before),
+        'key_after': list(key_after),
+        'aggregates': build_running_statistics(new_rows)
+    }
+    log_path = _running_statistics_log_path(path)
+    with open(log_path, 'a') as f:
+        f.write(json.dumps(delta) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+        log_size = f.tell()
+    
+    if log_size > RUNNING_STATISTICS_LOG_LIMIT:
+        load_running_statistics(path)
+
+# Running aggregates by journey file path, kept until the journey file,
+# statistics file or delta log changes: {'key', 'aggregates', 'rollups'}
+_running_statistics_cache = {}
+_running_statistics_cache_lock = threading.Lock()
+
+def _running_statistics_cache_key(path):
+    """Return the fingerprints of a journey file and its statistics files."""
+    return (
+        _data_file_key(path),
+        _data_file_key(_running_statistics_path(path)),
+        _data_file_key(_running_statistics_log_path(path))
+    )
+
+def _cached_running_statistics(path):
+    """
+    Return the cache entry of a journey file's running aggregates, loading
+    them if the journey file or its statistics files changed.
+    """
+    key = _running_statistics_cache_key(path)
+    with _running_statistics_cache_lock:
+        entry = _running_statistics_cache.get(path)
+        if entry is not None and entry['key'] == key:
+            return entry
+    
+    aggregates = _load_running_statistics(path)
+    entry = {'key': _running_statistics_cache_key(path), 'aggregates': aggregates, 'rollups': {}}
+    with _running_statistics_cache_lock:
+        _running_statistics_cache[path] = entry
+    return entry
+
+def load_running_statistics(path=None):
+    """
+    Return the running aggregates for a journey file.
+    
+    The persisted aggregates plus the deltas logged by appends are used when
+    together they reach the file's current fingerprint; the log is then
+    compacted into the statistics file. Otherwise the aggregates are rebuilt
+    from the full journey log and persisted again.
+    
+    The result is cached until the journey file or its statistics files
+    change, and shared between callers, so treat it as read-only.
+    """
+    return _cached_running_statistics(path or DATA_FILE)['aggregates']
+
+def _load_running_statistics(path):
+    """Load, replay and compact the running aggregates of a journey file (see load_running_statistics)."""
+    with _journey_write_lock:
+        key = _data_file_key(path)
+        payload = _read_running_statistics(path)
+        if payload is not None and key is not None:
+            aggregates = payload['aggregates']
+            reached = payload['data_key']
+            deltas = _read_running_statistics_log(path)
+            for delta in deltas:
+                if delta['key_before'] == reached:
+                    aggregates = merge_running_statistics(aggregates, delta['aggregates'])
+                    reached = delta['key_after']
+            if reached == list(key):
+                if deltas:
+                    _save_running_statistics(path, aggregates)
+                return aggregates
+        
+        aggregates = build_running_statistics(_read_journeys(path) if key is not None else pd.DataFrame(columns=JOURNEY_COLUMNS))
+        if key is not None:
+            _save_running_statistics(path, aggregates)
+    return aggregates
+
+def summarize_running_statistics(aggregates):
+    """
+    Turn running aggregates into the overview figures of calculate_statistics.
+    
+    Returns a dictionary with total_journeys, total_distance, avg_distance,
+    max_distance, total_fuel, fuel_economy, total_cost, co2_emissions,
+    monthly_distance and category_stats
+    """
+    count = aggregates['count']
+    total_fuel = aggregates['fuel_sum']
+    
+    monthly_distance = pd.DataFrame(
+        [(month, values['distance']) for month, values in sorted(aggregates['monthly'].items())],
+        columns=['Month', 'Distance']
+    )
+    category_stats = pd.DataFrame(
+        [(category, values['distance'], values['cost']) for category, values in sorted(aggregates['categories'].items())],
+        columns=['Category', 'Distance', 'Cost']
+    )
+    
+    return {
+        'total_journeys': count,
+        'total_distance': aggregates['distance_sum'],
+        'avg_distance': aggregates['distance_sum'] / count if count else float('nan'),
+        'max_distance': aggregates['distance_max'] if aggregates['distance_max'] is not None else float('nan'),
+        'total_fuel': total_fuel,
+        'fuel_economy': aggregates['fuel_distance_sum'] / total_fuel if aggregates['fuel_count'] and total_fuel > 0 else 0,
+        'total_cost': aggregates['cost_sum'],
+        'co2_emissions': aggregates['co2_sum'],
+        'monthly_distance': monthly_distance,
+        'category_stats': category_stats
+    }
+
+def get_running_statistics(path=None):
+    """Return overview statistics for a journey file from its running aggregates."""
+    return summarize_running_statistics(load_running_statistics(path))
+
+def get_rollup(period='monthly', vehicle=None, by_category=True, path=None):
+    """
+    Return one of the pre-aggregated rollup tables of a journey file.
+    
+    The rollups are part of the running aggregates, so this reads the small
+    persisted totals instead of the journey log.
+    
+    Parameters:
+    - period: 'daily', 'weekly' (ISO weeks, 'YYYY-Www') or 'monthly'
+    - vehicle: Vehicle whose journeys to summarize (defaults to the default vehicle)
+    - by_category: Keep one row per category within each period (default True)
+    - path: Journey file to summarize (overrides vehicle)
+    
+    Returns a DataFrame with Period, Category (if by_category), Distance,
+    Fuel, Cost, CO2 and Journeys, sorted by period. The frame is cached with
+    the running aggregates and shared between callers, so treat it as
+    read-only.
+    """
+    if period not in ROLLUP_PERIODS:
+        raise ValueError(f"Unknown rollup period '{period}'. Expected one of: {', '.join(ROLLUP_PERIODS)}")
+    
+    entry = _cached_running_statistics(path or get_vehicle_data_file(vehicle))
+    rollup = entry['rollups'].get((period, by_category))
+    if rollup is None:
+        rollup = _build_rollup_frame(entry['aggregates']['rollups'][period], by_category)
+        entry['rollups'][(period, by_category)] = rollup
+    return rollup
+
+def _build_rollup_frame(table, by_category):
+    """Turn one rollup table of the running aggregates into a sorted DataFrame (see get_rollup)."""
+    rollup = pd.DataFrame(
+        [
+            (key, category, values['distance'], values['fuel'], values['cost'], values['co2'], values['count'])
+            for key, categories in table.items()
+            for category, values in categories.items()
+        ],
+        columns=['Period', 'Category', 'Distance', 'Fuel', 'Cost', 'CO2', 'Journeys']
+    )
+    if not by_category:
+        rollup = rollup.drop(columns='Category').groupby('Period', as_index=False).sum()
+    return rollup.sort_values(list(rollup.columns[:2 if by_category else 1]), ignore_index=True)
+
+def get_fleet_statistics():
+    """
+    Return overview statistics for all vehicles together.
+    
+    Each vehicle partition's running aggregates are merged, so no journey
+    file is read in full unless its aggregates need rebuilding.
+    
+    Returns the summarize_running_statistics figures for the whole fleet,
+    plus 'vehicles': a DataFrame with one row of totals per vehicle
+    """
+    fleet = build_running_statistics(pd.DataFrame(columns=JOURNEY_COLUMNS))
+    vehicle_rows = []
+    for vehicle in list_vehicles():
+        aggregates = load_running_statistics(get_vehicle_data_file(vehicle))
+        fleet = merge_running_statistics(fleet, aggregates)
+        vehicle_rows.append((
+            vehicle, aggregates['count'], aggregates['distance_sum'], aggregates['fuel_sum'],
+            aggregates['cost_sum'], aggregates['co2_sum']
+        ))
+    
+    stats = summarize_running_statistics(fleet)
+    stats['vehicles'] = pd.DataFrame(
+        vehicle_rows, columns=['Vehicle', 'Journeys', 'Distance', 'Fuel', 'Cost', 'CO2']
+    )
+    return stats
+
+def verify_running_statistics(path=None, tolerance=1e-6):
+    """
+    Check the persisted running aggregates against a full rebuild.
+    
+    Returns a list of the aggregate fields that differ (empty if consistent)
+    """
+    path = path or DATA_FILE
+    persisted = load_running_statistics(path)
+    rebuilt = build_running_statistics(_read_journeys(path))
+    
+    def differs(a, b):
+        if isinstance(a, dict) and isinstance(b, dict):
+            return a.keys() != b.keys() or any(differs(a[k], b[k]) for k in a)
+        if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+            return abs(a - b) > tolerance * max(1.0, abs(a), abs(b))
+        return a != b
+    
+    return [field for field in rebuilt if differs(persisted.get(field), rebuilt[field])]
+
+# Problems detected by validate_journeys, as bit flags combined into one
+# reason code per journey
+VALIDATION_FLAGS = {
+    'invalid_date': 1,
+    'invalid_reading': 2,
+    'negative_distance': 4,
+    'future_date': 8,
+    'odometer_regression': 16,
+    'distance_mismatch': 32
+}
+
+VALIDATION_MESSAGES = {
+    'invalid_date': "Date is missing or unreadable.",
+    'invalid_reading': "Odometer readings are missing or not numbers.",
+    'negative_distance': "Ending odometer reading must be greater than starting reading.",
+    'future_date': "Journey date cannot be in the future.",
+    'odometer_regression': "Starting odometer reading is below the previous journey's ending reading.",
+    'distance_mismatch': "Distance does not match the odometer readings."
+}
+
+def validate_input(start_reading, end_reading, journey_date):
+    """Validate form input data."""
+    journey = pd.DataFrame({
+        'Date': [journey_date],
+        'Start_Reading': [start_reading],
+        'End_Reading': [end_reading]
+    })
+    _, reasons = validate_journeys(journey, checks=['negative_distance', 'future_date'])
+    
+    failed = describe_validation_reasons(reasons.iloc[0])
+    if failed:
+        return VALIDATION_MESSAGES[failed[0]]
+    
+    return None
+
+def validate_journeys(df, checks=None, distance_tolerance=0.05, odometer_tolerance=0.05):
+    """
+    Validate many journeys at once with column operations.
+    
+    Checks for unreadable dates and readings, negative distances, future
+    dates, odometer regressions (a journey starting below the previous
+    journey's ending reading, per vehicle when there is a Vehicle column,
+    in date order) and Distance values that disagree with End - Start.
+    
+    Parameters:
+    - df: DataFrame with journey data
+    - checks: names of the VALIDATION_FLAGS checks to run (optional, defaults to all)
+    - distance_tolerance: allowed difference in km between Distance and End - Start
+    - odometer_tolerance: how far in km a journey may start below the previous
+      journey's ending reading before it counts as an odometer regression
+    
+    Returns (valid, reasons): a boolean Series that is True for journeys
+    passing every check, and an integer Series of VALIDATION_FLAGS bits
+    for the checks each journey failed, both aligned with df
+    """
+    checks = set(VALIDATION_FLAGS if checks is None else checks)
+    count = len(df)
+    
+    def column(name):
+        if name in df.columns:
+            return pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=float)
+        return np.full(count, np.nan)
+    
+    if 'Date' in df.columns:
+        dates = df['Date'] if pd.api.types.is_datetime64_any_dtype(df['Date']) else pd.to_datetime(df['Date'], errors='coerce')
+    else:
+        dates = pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns]')
+    start = column('Start_Reading')
+    end = column('End_Reading')
+    distance = column('Distance')
+    
+    conditions = {}
+    with np.errstate(invalid='ignore'):
+        conditions['invalid_date'] = dates.isna().to_numpy()
+        conditions['invalid_reading'] = np.isnan(start) | np.isnan(end)
+        conditions['negative_distance'] = (end < start) | (distance < 0)
+        if 'future_date' in checks:
+            conditions['future_date'] = (dates.dt.normalize() > pd.Timestamp(datetime.now().date())).to_numpy()
+        if 'distance_mismatch' in checks:
+            conditions['distance_mismatch'] = np.abs(distance - (end - start)) > distance_tolerance
+        if 'odometer_regression' in checks:
+            # Compare each journey with the one before it, ordered by vehicle, then date, then log order
+            date_values = dates.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+            if 'Vehicle' in df.columns:
+                vehicles = pd.factorize(df['Vehicle'])[0]
+            else:
+                vehicles = np.zeros(count, dtype=np.int64)
+            order = np.lexsort((date_values, vehicles))
+            regression = np.zeros(count, dtype=bool)
+            if count > 1:
+                same_vehicle = vehicles[order][1:] == vehicles[order][:-1]
+                regression[order[1:]] = same_vehicle & (start[order][1:] < end[order][:-1] - odometer_tolerance)
+            conditions['odometer_regression'] = regression
+    
+    reasons = np.zeros(count, dtype=np.int64)
+    for name in checks:
+        reasons |= np.where(conditions[name], VALIDATION_FLAGS[name], 0)
+    
+    return pd.Series(reasons == 0, index=df.index), pd.Series(reasons, index=df.index)
+
+def describe_validation_reasons(code):
+    """
+    Return the names of the VALIDATION_FLAGS set in a reason code from
+    validate_journeys.
+    """
+    return [name for name, flag in VALIDATION_FLAGS.items() if int(code) & flag]
+
+# Odometer interval indexes by data file path, kept sorted by starting reading
+# so continuity queries are binary searches. See get_odometer_index.
+_odometer_indexes = {}
+_odometer_indexes_lock = threading.Lock()
+
+def _build_odometer_index(starts, ends, rows):
+    """
+    Build an odometer interval index from journey readings.
+    
+    Journeys are sorted by starting reading. 'reach' is the highest ending
+    reading of any journey up to each position, so the span between reach[i]
+    and starts[i + 1] is unlogged distance when positive and an overlap when
+    negative. 'gap_prefix' holds running totals of the unlogged distance.
+    """
+    order = np.lexsort((ends, starts))
+    starts, ends, rows = starts[order], ends[order], rows[order]
+    reach = np.maximum.accumulate(ends) if len(ends) else ends
+    gaps = starts[1:] - reach[:-1]
+    return {
+        'starts': starts,
+        'ends': ends,
+        'rows': rows,
+        'reach': reach,
+        'gaps': gaps,
+        'gap_prefix': np.concatenate([[0.0], np.cumsum(np.maximum(gaps, 0.0))])
+    }
+
+def _odometer_readings(df, first_row=0):
+    """Return (starts, ends, rows) for the journeys of a frame with both readings."""
+    starts = pd.to_numeric(df['Start_Reading'], errors='coerce').to_numpy(dtype=float)
+    ends = pd.to_numeric(df['End_Reading'], errors='coerce').to_numpy(dtype=float)
+    rows = np.arange(first_row, first_row + len(df))
+    known = ~(np.isnan(starts) | np.isnan(ends))
+    return starts[known], ends[known], rows[known]
+
+def get_odometer_index(path=None):
+    """
+    Return the odometer interval index of a journey file.
+    
+    The index is built once per data version and then kept up to date as
+    journeys are appended (see _update_odometer_index). Row numbers refer
+    to positions in the load_data frame.
+    """
+    path = path or DATA_FILE
+    key = _data_file_key(path)
+    with _journey_store_lock:
+        entry = _journey_store.get(path)
+        version = entry['version'] if entry is not None and entry['key'] == key else None
+    with _odometer_indexes_lock:
+        index = _odometer_indexes.get(path)
+        if index is not None and version is not None and index['version'] == version:
+            return index
+    
+    df = _load_journeys(path, ['Start_Reading', 'End_Reading'])
+    index = _build_odometer_index(*_odometer_readings(df))
+    index['count'] = len(df)
+    index['version'] = get_data_version(path)
+    
+    with _odometer_indexes_lock:
+        _odometer_indexes[path] = index
+    return index
+
+def _extend_odometer_array(buffers, name, current, values):
+    """
+    Return one array of an odometer index with values appended.
+    
+    The result is a view onto a buffer in buffers with spare capacity that
+    grows geometrically, so appends cost O(new values) amortized. Only the
+    slots past the end of current are written, so views handed out earlier
+    keep their length and contents.
+    """
+    size = len(current) + len(values)
+    buffer = buffers.get(name)
+    if buffer is None or len(buffer) < size:
+        buffer = np.empty(max(size, 2 * len(current), 16), dtype=np.result_type(current, values))
+        buffer[:len(current)] = current
+        buffers[name] = buffer
+    buffer[len(current):size] = values
+    return buffer[:size]
 
-def load_data():
-    """Load journey data from CSV file."""
-    if not os.path.exists(DATA_FILE):
-        # Create data directory if it doesn't exist
-        os.makedirs(os.path.dirname(DATA_FILE), exist_ok=True)
-        # Create empty DataFrame with specified columns
-        df = pd.DataFrame(columns=[
-            'Date', 'Start_Reading', 'End_Reading', 'Distance', 'Purpose', 
-            'Fuel_Consumption', 'Category', 'Tags', 'Fuel_Price', 'Cost'
-        ])
-        df.to_csv(DATA_FILE, index=False)
-        return df
+def _update_odometer_index(path, new_rows):
+    """
+    Fold appended journeys into a cached odometer index, or drop it after a
+    rewrite. Registered as a data change hook.
     
-    df = pd.read_csv(DATA_FILE)
-    df['Date'] = pd.to_datetime(df['Date']).dt.date
+    When the new readings sort after every indexed one (the usual case of
+    logging journeys in order) they are appended to the arrays' spare
+    capacity, and only their own reach, gaps and gap totals are computed.
+    Out-of-order readings are placed with a binary search and inserted,
+    which copies the arrays, and the running arrays are recomputed from the
+    first insertion point on.
     
-    # Handle backward compatibility for new columns
-    if 'Category' not in df.columns:
-        df['Category'] = 'Personal'  # Default category
+    The updated index is a new dictionary that replaces the cached one in a
+    single assignment, so readers holding the previous index keep a
+    consistent set of arrays.
+    """
+    with _odometer_indexes_lock:
+        index = _odometer_indexes.get(path)
+        versions = get_appended_data_version(path)
+        if index is None:
+            return
+        if new_rows is None or versions is None or index['version'] != versions[0]:
+            del _odometer_indexes[path]
+            return
+        
+        new_starts, new_ends, new_rows_at = _odometer_readings(new_rows, index['count'])
+        order = np.lexsort((new_ends, new_starts))
+        new_starts, new_ends, new_rows_at = new_starts[order], new_ends[order], new_rows_at[order]
+        size = len(index['starts'])
+        first = int(np.searchsorted(index['starts'], new_starts[0], side='right')) if len(new_starts) else size
+        
+        updated = dict(index)
+        if not len(new_starts):
+            pass
+        elif first == size:
+            reach = np.maximum.accumulate(np.concatenate([index['reach'][-1:], new_ends]))[-len(new_ends):]
+            previous_reach = np.concatenate([index['reach'][-1:], reach[:-1]])
+            gaps = new_starts[len(new_starts) - len(previous_reach):] - previous_reach
+            prefix = index['gap_prefix'][-1] + np.cumsum(np.maximum(gaps, 0.0))
+            # The buffers are shared with the previous index, which only sees their first slots
+            buffers = updated['buffers'] = dict(index.get('buffers', {}))
+            for name, values in (('starts', new_starts), ('ends', new_ends), ('rows', new_rows_at),
+                                 ('reach', reach), ('gaps', gaps), ('gap_prefix', prefix)):
+                updated[name] = _extend_odometer_array(buffers, name, index[name], values)
+        else:
+            positions = np.searchsorted(index['starts'], new_starts, side='right')
+            starts = np.insert(index['starts'], positions, new_starts)
+            ends = np.insert(index['ends'], positions, new_ends)
+            # Everything before the first insertion point is unchanged
+            reach = np.concatenate([
+                index['reach'][:first],
+                np.maximum.accumulate(np.concatenate([index['reach'][first - 1:first], ends[first:]]))[1 if first else 0:]
+            ])
+            gap_from = max(first - 1, 0)
+            gaps = np.concatenate([index['gaps'][:gap_from], starts[gap_from + 1:] - reach[gap_from:-1]])
+            updated.pop('buffers', None)
+            updated.update({
+                'starts': starts,
+                'ends': ends,
+                'rows': np.insert(index['rows'], positions, new_rows_at),
+                'reach': reach,
+                'gaps': gaps,
+                'gap_prefix': np.concatenate([
+                    index['gap_prefix'][:gap_from + 1],
+                    index['gap_prefix'][gap_from] + np.cumsum(np.maximum(gaps[gap_from:], 0.0))
+                ])
+            })
+        
+        updated['count'] = index['count'] + len(new_rows)
+        updated['version'] = versions[1]
+        _odometer_indexes[path] = updated
+
+register_data_change_hook(_update_odometer_index)
+
+def get_unlogged_distance(from_reading=None, to_reading=None, path=None):
+    """
+    Return the odometer distance not covered by any logged journey.
     
-    if 'Tags' not in df.columns:
-        df['Tags'] = ''  # Empty tags by default
+    Only gaps between journeys count, clipped to the from_reading to
+    to_reading range when given. Runs in O(log N) on the odometer index.
     
-    if 'Fuel_Price' not in df.columns:
-        df['Fuel_Price'] = DEFAULT_FUEL_PRICE
+    Parameters:
+    - from_reading: lowest odometer reading to consider (optional)
+    - to_reading: highest odometer reading to consider (optional)
+    - path: journey file (optional, defaults to DATA_FILE)
     
-    if 'Cost' not in df.columns:
-        # Calculate cost for existing entries
-        df['Cost'] = df.apply(
-            lambda row: calculate_journey_cost(row['Fuel_Consumption'], row['Fuel_Price']), 
-            axis=1
-        )
+    Returns the unlogged distance in km
+    """
+    if from_reading is not None and to_reading is not None and from_reading >= to_reading:
+        return 0.0
     
-    return df
+    index = get_odometer_index(path)
+    gap_starts = index['reach'][:-1]
+    gap_ends = index['starts'][1:]
+    prefix = index['gap_prefix']
+    
+    # Gaps are disjoint and ordered, so the ones in range are a contiguous run
+    first = 0 if from_reading is None else int(np.searchsorted(gap_ends, from_reading, side='right'))
+    last = len(gap_ends) if to_reading is None else int(np.searchsorted(gap_starts, to_reading, side='left'))
+    if first >= last:
+        return 0.0
+    
+    total = prefix[last] - prefix[first]
+    # Trim the gaps that straddle the range limits
+    if from_reading is not None and gap_starts[first] < from_reading < gap_ends[first]:
+        total -= from_reading - gap_starts[first]
+    if to_reading is not None and gap_starts[last - 1] < to_reading < gap_ends[last - 1]:
+        total -= gap_ends[last - 1] - to_reading
+    return float(total)
 
-def save_data(df):
-    """Save journey data to CSV file."""
-    df.to_csv(DATA_FILE, index=False)
+def find_odometer_gap(reading, path=None):
+    """
+    Return the unlogged stretch containing an odometer reading, as a
+    (from_reading, to_reading) tuple, or None if a journey covers it.
+    """
+    index = get_odometer_index(path)
+    position = int(np.searchsorted(index['starts'], reading, side='right'))
+    if position == 0 or position == len(index['starts']):
+        return None
+    low, high = index['reach'][position - 1], index['starts'][position]
+    if low < reading < high:
+        return (float(low), float(high))
+    return None
 
-def validate_input(start_reading, end_reading, journey_date):
-    """Validate form input data."""
-    if end_reading < start_reading:
-        return "Ending odometer reading must be greater than starting reading."
+def find_overlapping_journeys(start_reading, end_reading, path=None):
+    """
+    Return the load_data row numbers of journeys whose readings overlap the
+    start_reading to end_reading range.
     
-    if journey_date > datetime.now().date():
-        return "Journey date cannot be in the future."
+    The candidates are found with two binary searches; the cost beyond
+    O(log N) is proportional to the journeys in range.
+    """
+    index = get_odometer_index(path)
+    first = int(np.searchsorted(index['reach'], start_reading, side='right'))
+    last = int(np.searchsorted(index['starts'], end_reading, side='left'))
+    if first >= last:
+        return []
+    candidates = slice(first, last)
+    overlapping = index['ends'][candidates] > start_reading
+    return sorted(index['rows'][candidates][overlapping].tolist())
+
+def get_odometer_continuity_report(min_gap=0.0, top=10, path=None):
+    """
+    Summarize how well the journey log chains together.
     
-    return None
+    Parameters:
+    - min_gap: smallest unlogged distance in km reported as a gap
+    - top: number of largest gaps and overlaps to list
+    - path: journey file (optional, defaults to DATA_FILE)
+    
+    Returns a dictionary with journeys, unlogged_distance, gap_count,
+    overlap_count, overlap_distance, and largest_gaps/largest_overlaps lists
+    of (from_reading, to_reading, before_row, after_row) tuples
+    """
+    index = get_odometer_index(path)
+    gaps = index['gaps']
+    reach = index['reach'][:-1]
+    next_starts = index['starts'][1:]
+    # Readings the next journey shares with the journeys before it
+    overlap_ends = np.minimum(reach, index['ends'][1:])
+    overlaps = overlap_ends - next_starts
+    is_gap = gaps > min_gap
+    is_overlap = overlaps > 0
+    
+    # Position of the journey that reaches furthest up to each position
+    positions = np.arange(len(index['ends']))
+    reach_positions = np.maximum.accumulate(np.where(index['ends'] == index['reach'], positions, 0))
+    
+    def largest(mask, sizes, lows, highs):
+        found = np.flatnonzero(mask)
+        found = found[np.argsort(-sizes[found], kind='stable')[:top]]
+        return [
+            (float(lows[p]), float(highs[p]), int(index['rows'][reach_positions[p]]), int(index['rows'][p + 1]))
+            for p in found
+        ]
+    
+    return {
+        'journeys': len(index['starts']),
+        'unlogged_distance': float(gaps[is_gap].sum()),
+        'gap_count': int(is_gap.sum()),
+        'overlap_count': int(is_overlap.sum()),
+        'overlap_distance': float(overlaps[is_overlap].sum()),
+        'largest_gaps': largest(is_gap, gaps, reach, next_starts),
+        'largest_overlaps': largest(is_overlap, overlaps, next_starts, overlap_ends)
+    }
+
+# Journey themes used to pick summary icons from the journey purpose. Themes
+# are checked in order and the first one with a keyword in the purpose wins.
+# Within a theme, the variants are checked in order before falling back to
+# the theme's own icons. Keywords match anywhere in the lowercased purpose.
+JOURNEY_THEMES = [
+    {
+        'theme': 'work',
+        'keywords': ["work", "office", "job", "business", "meeting", "client", "presentation"],
+        'variants': [(["meeting", "client"], "👔", "🤝"), (["presentation"], "📊", "👩‍💼")],
+        'icons': ("💼", "🏢")
+    },
+    {
+        'theme': 'shopping',
+        'keywords': ["shop", "store", "mall", "grocery", "market", "shopping", "buy"],
+        'variants': [(["grocery", "food"], "🛒", "🍎"), (["clothes", "fashion"], "👚", "🛍️")],
+        'icons': ("🛒", "🛍️")
+    },
+    {
+        'theme': 'education',
+        'keywords': ["school", "college", "university", "class", "lecture", "study", "library"],
+        'variants': [(["library"], "📚", "🤓")],
+        'icons': ("🎓", "✏️")
+    },
+    {
+        'theme': 'travel',
+        'keywords': ["vacation", "holiday", "trip", "travel", "beach", "mountain", "hike"],
+        'variants': [(["beach"], "🏖️", "🌊"), (["mountain", "hike"], "⛰️", "🥾")],
+        'icons': ("✈️", "🧳")
+    },
+    {
+        'theme': 'social',
+        'keywords': ["family", "friend", "visit", "relative", "party", "dinner", "date"],
+        'variants': [(["party"], "🎉", "🥳"), (["dinner", "lunch"], "🍽️", "👪"), (["date"], "💖", "🌹")],
+        'icons': ("👪", "🏡")
+    },
+    {
+        'theme': 'health',
+        'keywords': ["doctor", "hospital", "medical", "health", "dentist", "appointment"],
+        'variants': [(["dentist"], "🦷", "😬")],
+        'icons': ("🏥", "🩺")
+    },
+    {
+        'theme': 'fitness',
+        'keywords': ["gym", "exercise", "workout", "fitness", "sport", "run", "swim"],
+        'variants': [(["run", "jog"], "🏃", "👟"), (["swim"], "🏊", "💦")],
+        'icons': ("🏋️", "💪")
+    },
+    {
+        'theme': 'food',
+        'keywords': ["restaurant", "dinner", "lunch", "eat", "food", "cafe", "coffee"],
+        'variants': [(["coffee", "cafe"], "☕", "🍰")],
+        'icons': ("🍽️", "🍕")
+    },
+    {
+        'theme': 'entertainment',
+        'keywords': ["movie", "cinema", "theater", "concert", "show", "museum", "park"],
+        'variants': [
+            (["movie", "cinema"], "🎬", "🍿"),
+            (["concert", "show"], "🎵", "🎤"),
+            (["museum"], "🏛️", "🖼️"),
+            (["park"], "🌳", "🌞")
+        ],
+        'icons': ("🎭", "🎟️")
+    }
+]
+
+# Icons for journeys that match no theme
+DEFAULT_JOURNEY_ICONS = ('other', "🚗", "✨")
+
+def _compile_journey_theme_matcher():
+    """
+    Compile every theme keyword into one regex that finds all keyword
+    occurrences in a single scan.
+    
+    The pattern is a lookahead alternation (longest keywords first), so it
+    reports the longest keyword starting at each position; the shorter
+    keywords starting there are exactly its keyword prefixes, which are
+    precomputed.
+    """
+    keywords = set()
+    for theme in JOURNEY_THEMES:
+        keywords.update(theme['keywords'])
+        for variant_keywords, _, _ in theme['variants']:
+            keywords.update(variant_keywords)
+    
+    ordered = sorted(keywords, key=lambda keyword: (-len(keyword), keyword))
+    pattern = re.compile('(?=(' + '|'.join(re.escape(keyword) for keyword in ordered) + '))')
+    prefixes = {
+        keyword: frozenset(other for other in keywords if keyword.startswith(other))
+        for keyword in keywords
+    }
+    return pattern, prefixes
+
+_JOURNEY_THEME_PATTERN, _JOURNEY_KEYWORD_PREFIXES = _compile_journey_theme_matcher()
+
+def classify_journey_purpose(purpose):
+    """
+    Pick the theme and summary icons for a journey purpose.
+    
+    Parameters:
+    - purpose: journey purpose text
+    
+    Returns a (theme, primary_icon, secondary_icon) tuple
+    """
+    if not isinstance(purpose, str):
+        return DEFAULT_JOURNEY_ICONS
+    
+    found = set()
+    for match in _JOURNEY_THEME_PATTERN.finditer(purpose.lower()):
+        found |= _JOURNEY_KEYWORD_PREFIXES[match.group(1)]
+    
+    if not found:
+        return DEFAULT_JOURNEY_ICONS
+    
+    for theme in JOURNEY_THEMES:
+        if found.isdisjoint(theme['keywords']):
+            continue
+        for variant_keywords, primary_icon, secondary_icon in theme['variants']:
+            if not found.isdisjoint(variant_keywords):
+                return (theme['theme'], primary_icon, secondary_icon)
+        return (theme['theme'],) + theme['icons']
+    
+    return DEFAULT_JOURNEY_ICONS
+
+def classify_journey_purposes(purposes):
+    """
+    Classify a whole column of journey purposes at once.
+    
+    Each distinct purpose is matched only once, so history views with many
+    repeated purposes stay cheap.
+    
+    Parameters:
+    - purposes: Series of journey purposes
+    
+    Returns a DataFrame with Theme, Primary_Icon and Secondary_Icon columns,
+    aligned with the input
+    """
+    codes, uniques = pd.factorize(purposes.astype(object).where(purposes.notna(), None).map(
+        lambda value: value.lower() if isinstance(value, str) else value
+    ))
+    classified = [classify_journey_purpose(value) for value in uniques]
+    classified.append(DEFAULT_JOURNEY_ICONS)  # code -1: missing purpose
+    
+    table = np.array(classified, dtype=object)
+    rows = table[codes]
+    return pd.DataFrame({
+        'Theme': rows[:, 0],
+        'Primary_Icon': rows[:, 1],
+        'Secondary_Icon': rows[:, 2]
+    }, index=purposes.index)
+
+# Phrase pools for journey summaries. Phrases with placeholders are
+# str.format templates filled in with the journey's figures.
+SUMMARY_TRAVEL_VERBS = ["traveled", "journeyed", "ventured", "zipped", "cruised"]
+
+SUMMARY_DISTANCE_PHRASES = {
+    'short': [
+        "🏠 Just a quick hop around the neighborhood",
+        "🏠 A short and sweet local journey",
+        "🏠 A quick errand around the corner",
+        "🏠 A brief jaunt in your local area"
+    ],
+    'medium': [
+        "🏙️ A pleasant cruise through the city",
+        "🏙️ A nice drive around town",
+        "🏙️ An urban adventure through the streets",
+        "🏙️ Exploring the cityscape on wheels"
+    ],
+    'long': [
+        "🛣️ A substantial journey on the open road",
+        "🛣️ Covering some serious distance today",
+        "🛣️ A significant trek across the landscape",
+        "🛣️ Eating up the kilometers on this road trip"
+    ],
+    'epic': [
+        "🗺️ An epic voyage across the map",
+        "🗺️ A remarkable long-distance expedition",
+        "🗺️ Conquering vast distances on this journey",
+        "🗺️ An impressive road trip adventure"
+    ]
+}
+
+SUMMARY_EFFICIENCY_PHRASES = {
+    'high': [
+        "🌱 Amazing eco-driving! Your {efficiency:.1f} km/L efficiency is saving the planet 🌎",
+        "🌿 Superb fuel economy of {efficiency:.1f} km/L! Mother Nature thanks you 🌳",
+        "🍃 Wonderful efficiency at {efficiency:.1f} km/L! Your car is purring with happiness",
+        "🌱 Eco-warrior status achieved with {efficiency:.1f} km/L! Keep up the green driving 🌿"
+    ],
+    'decent': [
+        "⛽ Good going with {efficiency:.1f} km/L! Your car is performing well",
+        "🚗 Solid fuel economy at {efficiency:.1f} km/L. Nice driving!",
+        "⛽ Decent efficiency of {efficiency:.1f} km/L - you're on the right track",
+        "🌱 Respectable {efficiency:.1f} km/L! A few more tweaks and you'll be an eco-star"
+    ],
+    'improve': [
+        "💨 Fuel economy was {efficiency:.1f} km/L - gentle acceleration could help improve this",
+        "💧 {efficiency:.1f} km/L recorded - try reducing cargo weight for better efficiency",
+        "⚡ Your {efficiency:.1f} km/L could be improved with steady cruising speeds",
+        "🌬️ Economy check: {efficiency:.1f} km/L - consider maintenance for better performance"
+    ]
+}
+
+SUMMARY_COST_PHRASES = [
+    "💰 This adventure cost ${cost:.2f} from your treasure chest",
+    "💸 Journey expense: a modest ${cost:.2f} from your wallet",
+    "💵 The price of this trip: ${cost:.2f} well spent",
+    "🪙 Investment in this journey: ${cost:.2f} for the memories"
+]
+
+SUMMARY_CO2_PHRASES = {
+    'low': [
+        "🌿 Tiny carbon pawprint of just {co2:.1f} kg CO₂",
+        "🍃 Earth-friendly journey with only {co2:.1f} kg CO₂ emitted",
+        "🌱 Minimal environmental impact: {co2:.1f} kg CO₂",
+        "🦋 Light as a butterfly's wing: {co2:.1f} kg CO₂"
+    ],
+    'mid': [
+        "🌎 Moderate eco-impact of {co2:.1f} kg CO₂",
+        "🌱 A reasonable carbon footprint: {co2:.1f} kg CO₂",
+        "🍃 Middle-of-the-road emissions at {co2:.1f} kg CO₂",
+        "🌿 Not too heavy, not too light: {co2:.1f} kg CO₂"
+    ],
+    'high': [
+        "🌍 A notable carbon footprint of {co2:.1f} kg CO₂",
+        "🌳 This journey's emissions ({co2:.1f} kg CO₂) could be offset with tree planting",
+        "🌲 Higher impact journey: {co2:.1f} kg CO₂ added to your carbon account",
+        "🌊 Something to consider: this trip produced {co2:.1f} kg CO₂"
+    ]
+}
+
+SUMMARY_TAG_PHRASES = [
+    "🏷️ Journey vibes: {tags}",
+    "✨ Tagged with: {tags}",
+    "📌 Bookmarked as: {tags}",
+    "🔖 Filed under: {tags}"
+]
+
+SUMMARY_TIME_PHRASES = {
+    'today': [
+        "🌟 Fresh off the road today!",
+        "🌞 Today's adventure logged",
+        "⏰ Hot off the press: journey completed today",
+        "✨ Just in: today's travel recorded"
+    ],
+    'yesterday': [
+        "🕰️ Yesterday's road memories",
+        "🌙 A journey from yesterday",
+        "📆 From your travels yesterday",
+        "⏱️ Logged from yesterday's adventures"
+    ],
+    'week': [
+        "📅 From your travels earlier this week",
+        "🗓️ A recent journey this week",
+        "🚗 Captured from your week's travels",
+        "🌈 From the roads traveled this week"
+    ],
+    'month': [
+        "📆 A journey from earlier this month",
+        "🗓️ Part of this month's travel story",
+        "🌙 From your monthly travels",
+        "🚗 One of this month's road adventures"
+    ],
+    'past': [
+        "🗓️ A journey from your travel archives",
+        "📜 From your historical travels",
+        "⏳ A blast from your driving past",
+        "🔍 Recovered from your journey memories"
+    ]
+}
+
+SUMMARY_FUN_FACTS = [
+    "💡 Fun fact: If this trip were walking, it would be about {steps:.0f} steps!",
+    "🌈 Did you know? The average car spends 95% of its time parked!",
+    "🔋 Eco-tip: Regular maintenance can improve fuel efficiency by up to 10%",
+    "🌡️ Climate note: Properly inflated tires can save up to 3% on fuel",
+    "🚦 Driving tip: Smooth acceleration can improve fuel economy significantly",
+    "💧 Fun fact: It takes about 39,090 gallons of water to manufacture a new car",
+    "🔄 Eco-tip: Keeping your air filter clean can improve gas mileage by up to 10%",
+    "⚡ Future thought: An electric car would use about {kwh:.1f} kWh for this journey"
+]
+
+def _distance_band(distance):
+    """Name the SUMMARY_DISTANCE_PHRASES pool for a journey distance."""
+    if distance < 5:
+        return 'short'
+    elif distance < 20:
+        return 'medium'
+    elif distance < 100:
+        return 'long'
+    return 'epic'
+
+def _recency_band(days_diff):
+    """Name the SUMMARY_TIME_PHRASES pool for a journey that is days_diff days old."""
+    if days_diff == 0:
+        return 'today'
+    elif days_diff == 1:
+        return 'yesterday'
+    elif days_diff < 7:
+        return 'week'
+    elif days_diff < 30:
+        return 'month'
+    return 'past'
+
+def _format_eco_tip(eco_tip):
+    """Render an eco tip as a summary line."""
+    return f"{eco_tip['icon']} **{eco_tip['title']}**: {eco_tip['description']}"
 
 def generate_journey_summary(journey_data):
     """Generate a personalized journey summary with cute icons and engaging text."""
@@ -92,240 +2288,50 @@ def generate_journey_summary(journey_data):
     # Get category icon
     category_icon = get_category_icon(category)
     
-    # Enhanced primary icon selection based on journey purpose keywords
-    primary_icon = "🚗"  # Default car icon
-    secondary_icon = "✨"  # Default secondary icon
-    
-    # Match common journey purposes to appropriate icons with more specific matches
-    purpose_words = purpose.split()
-    
-    # Work-related journeys
-    if any(word in purpose for word in ["work", "office", "job", "business", "meeting", "client", "presentation"]):
-        if "meeting" in purpose or "client" in purpose:
-            primary_icon = "👔"
-            secondary_icon = "🤝"
-        elif "presentation" in purpose:
-            primary_icon = "📊"
-            secondary_icon = "👩‍💼"
-        else:
-            primary_icon = "💼"
-            secondary_icon = "🏢"
-    
-    # Shopping journeys
-    elif any(word in purpose for word in ["shop", "store", "mall", "grocery", "market", "shopping", "buy"]):
-        if "grocery" in purpose or "food" in purpose:
-            primary_icon = "🛒"
-            secondary_icon = "🍎"
-        elif "clothes" in purpose or "fashion" in purpose:
-            primary_icon = "👚"
-            secondary_icon = "🛍️"
-        else:
-            primary_icon = "🛒"
-            secondary_icon = "🛍️"
-    
-    # Education journeys
-    elif any(word in purpose for word in ["school", "college", "university", "class", "lecture", "study", "library"]):
-        if "library" in purpose:
-            primary_icon = "📚"
-            secondary_icon = "🤓"
-        else:
-            primary_icon = "🎓"
-            secondary_icon = "✏️"
-    
-    # Vacation/travel journeys
-    elif any(word in purpose for word in ["vacation", "holiday", "trip", "travel", "beach", "mountain", "hike"]):
-        if "beach" in purpose:
-            primary_icon = "🏖️"
-            secondary_icon = "🌊"
-        elif "mountain" in purpose or "hike" in purpose:
-            primary_icon = "⛰️"
-            secondary_icon = "🥾"
-        else:
-            primary_icon = "✈️"
-            secondary_icon = "🧳"
-    
-    # Family/social journeys
-    elif any(word in purpose for word in ["family", "friend", "visit", "relative", "party", "dinner", "date"]):
-        if "party" in purpose:
-            primary_icon = "🎉"
-            secondary_icon = "🥳"
-        elif "dinner" in purpose or "lunch" in purpose:
-            primary_icon = "🍽️"
-            secondary_icon = "👪"
-        elif "date" in purpose:
-            primary_icon = "💖"
-            secondary_icon = "🌹"
-        else:
-            primary_icon = "👪"
-            secondary_icon = "🏡"
-    
-    # Health-related journeys
-    elif any(word in purpose for word in ["doctor", "hospital", "medical", "health", "dentist", "appointment"]):
-        if "dentist" in purpose:
-            primary_icon = "🦷"
-            secondary_icon = "😬"
-        else:
-            primary_icon = "🏥"
-            secondary_icon = "🩺"
-    
-    # Fitness journeys
-    elif any(word in purpose for word in ["gym", "exercise", "workout", "fitness", "sport", "run", "swim"]):
-        if "run" in purpose or "jog" in purpose:
-            primary_icon = "🏃"
-            secondary_icon = "👟"
-        elif "swim" in purpose:
-            primary_icon = "🏊"
-            secondary_icon = "💦"
-        else:
-            primary_icon = "🏋️"
-            secondary_icon = "💪"
-    
-    # Food-related journeys
-    elif any(word in purpose for word in ["restaurant", "dinner", "lunch", "eat", "food", "cafe", "coffee"]):
-        if "coffee" in purpose or "cafe" in purpose:
-            primary_icon = "☕"
-            secondary_icon = "🍰"
-        else:
-            primary_icon = "🍽️"
-            secondary_icon = "🍕"
-    
-    # Entertainment journeys
-    elif any(word in purpose for word in ["movie", "cinema", "theater", "concert", "show", "museum", "park"]):
-        if "movie" in purpose or "cinema" in purpose:
-            primary_icon = "🎬"
-            secondary_icon = "🍿"
-        elif "concert" in purpose or "show" in purpose:
-            primary_icon = "🎵"
-            secondary_icon = "🎤"
-        elif "museum" in purpose:
-            primary_icon = "🏛️"
-            secondary_icon = "🖼️"
-        elif "park" in purpose:
-            primary_icon = "🌳"
-            secondary_icon = "🌞"
-        else:
-            primary_icon = "🎭"
-            secondary_icon = "🎟️"
+    # Pick the primary/secondary icons from the journey purpose keywords
+    _, primary_icon, secondary_icon = classify_journey_purpose(purpose)
     
     # Create a more personalized and enthusiastic main summary
-    travel_verbs = ["traveled", "journeyed", "ventured", "zipped", "cruised"]
     import random
-    travel_verb = random.choice(travel_verbs)
+    travel_verb = random.choice(SUMMARY_TRAVEL_VERBS)
     
     # Add primary journey purpose statement with icon and category
     summary_parts.append(f"{primary_icon} You {travel_verb} {distance:.1f} km for {journey_data['Purpose']} {secondary_icon} {category_icon}")
     
     # More varied and personalized distance descriptions
-    if distance < 5:
-        small_trip_phrases = [
-            "🏠 Just a quick hop around the neighborhood",
-            "🏠 A short and sweet local journey",
-            "🏠 A quick errand around the corner",
-            "🏠 A brief jaunt in your local area"
-        ]
-        summary_parts.append(random.choice(small_trip_phrases))
-    elif distance < 20:
-        medium_trip_phrases = [
-            "🏙️ A pleasant cruise through the city",
-            "🏙️ A nice drive around town",
-            "🏙️ An urban adventure through the streets",
-            "🏙️ Exploring the cityscape on wheels"
-        ]
-        summary_parts.append(random.choice(medium_trip_phrases))
-    elif distance < 100:
-        long_trip_phrases = [
-            "🛣️ A substantial journey on the open road",
-            "🛣️ Covering some serious distance today",
-            "🛣️ A significant trek across the landscape",
-            "🛣️ Eating up the kilometers on this road trip"
-        ]
-        summary_parts.append(random.choice(long_trip_phrases))
-    else:
-        epic_trip_phrases = [
-            "🗺️ An epic voyage across the map",
-            "🗺️ A remarkable long-distance expedition",
-            "🗺️ Conquering vast distances on this journey",
-            "🗺️ An impressive road trip adventure"
-        ]
-        summary_parts.append(random.choice(epic_trip_phrases))
+    summary_parts.append(random.choice(SUMMARY_DISTANCE_PHRASES[_distance_band(distance)]))
     
     # Enhanced fuel efficiency insights with cute icons and personalized messages
     if fuel and not pd.isna(fuel) and fuel > 0:
         efficiency = distance / fuel  # km/L
         
         if efficiency > 15:
-            eco_phrases = [
-                f"🌱 Amazing eco-driving! Your {efficiency:.1f} km/L efficiency is saving the planet 🌎",
-                f"🌿 Superb fuel economy of {efficiency:.1f} km/L! Mother Nature thanks you 🌳",
-                f"🍃 Wonderful efficiency at {efficiency:.1f} km/L! Your car is purring with happiness",
-                f"🌱 Eco-warrior status achieved with {efficiency:.1f} km/L! Keep up the green driving 🌿"
-            ]
-            summary_parts.append(random.choice(eco_phrases))
+            efficiency_band = 'high'
         elif efficiency > 10:
-            decent_eco_phrases = [
-                f"⛽ Good going with {efficiency:.1f} km/L! Your car is performing well",
-                f"🚗 Solid fuel economy at {efficiency:.1f} km/L. Nice driving!",
-                f"⛽ Decent efficiency of {efficiency:.1f} km/L - you're on the right track",
-                f"🌱 Respectable {efficiency:.1f} km/L! A few more tweaks and you'll be an eco-star"
-            ]
-            summary_parts.append(random.choice(decent_eco_phrases))
+            efficiency_band = 'decent'
         else:
-            improve_eco_phrases = [
-                f"💨 Fuel economy was {efficiency:.1f} km/L - gentle acceleration could help improve this",
-                f"💧 {efficiency:.1f} km/L recorded - try reducing cargo weight for better efficiency",
-                f"⚡ Your {efficiency:.1f} km/L could be improved with steady cruising speeds",
-                f"🌬️ Economy check: {efficiency:.1f} km/L - consider maintenance for better performance"
-            ]
-            summary_parts.append(random.choice(improve_eco_phrases))
+            efficiency_band = 'improve'
+        summary_parts.append(random.choice(SUMMARY_EFFICIENCY_PHRASES[efficiency_band]).format(efficiency=efficiency))
         
         # More personalized cost information
-        cost_phrases = [
-            f"💰 This adventure cost ${cost:.2f} from your treasure chest",
-            f"💸 Journey expense: a modest ${cost:.2f} from your wallet",
-            f"💵 The price of this trip: ${cost:.2f} well spent",
-            f"🪙 Investment in this journey: ${cost:.2f} for the memories"
-        ]
-        summary_parts.append(random.choice(cost_phrases))
+        summary_parts.append(random.choice(SUMMARY_COST_PHRASES).format(cost=cost))
     
     # Enhanced CO2 emissions information with more engaging icons and messages
     if co2_emissions > 0:
         if co2_emissions < 5:
-            eco_messages = [
-                f"🌿 Tiny carbon pawprint of just {co2_emissions:.1f} kg CO₂",
-                f"🍃 Earth-friendly journey with only {co2_emissions:.1f} kg CO₂ emitted",
-                f"🌱 Minimal environmental impact: {co2_emissions:.1f} kg CO₂",
-                f"🦋 Light as a butterfly's wing: {co2_emissions:.1f} kg CO₂"
-            ]
-            summary_parts.append(random.choice(eco_messages))
+            co2_band = 'low'
         elif co2_emissions < 15:
-            mid_eco_messages = [
-                f"🌎 Moderate eco-impact of {co2_emissions:.1f} kg CO₂",
-                f"🌱 A reasonable carbon footprint: {co2_emissions:.1f} kg CO₂",
-                f"🍃 Middle-of-the-road emissions at {co2_emissions:.1f} kg CO₂",
-                f"🌿 Not too heavy, not too light: {co2_emissions:.1f} kg CO₂"
-            ]
-            summary_parts.append(random.choice(mid_eco_messages))
+            co2_band = 'mid'
         else:
-            high_eco_messages = [
-                f"🌍 A notable carbon footprint of {co2_emissions:.1f} kg CO₂",
-                f"🌳 This journey's emissions ({co2_emissions:.1f} kg CO₂) could be offset with tree planting",
-                f"🌲 Higher impact journey: {co2_emissions:.1f} kg CO₂ added to your carbon account",
-                f"🌊 Something to consider: this trip produced {co2_emissions:.1f} kg CO₂"
-            ]
-            summary_parts.append(random.choice(high_eco_messages))
+            co2_band = 'high'
+        summary_parts.append(random.choice(SUMMARY_CO2_PHRASES[co2_band]).format(co2=co2_emissions))
     
     # Add tags with more playful framing
     if tags and not pd.isna(tags) and tags.strip():
         tag_list = parse_tags(tags)
         if tag_list:
             tags_display = " ".join([f"#{tag}" for tag in tag_list])
-            tag_phrases = [
-                f"🏷️ Journey vibes: {tags_display}",
-                f"✨ Tagged with: {tags_display}",
-                f"📌 Bookmarked as: {tags_display}",
-                f"🔖 Filed under: {tags_display}"
-            ]
-            summary_parts.append(random.choice(tag_phrases))
+            summary_parts.append(random.choice(SUMMARY_TAG_PHRASES).format(tags=tags_display))
     
     # More personalized time context with cute icons
     today = datetime.now().date()
@@ -334,71 +2340,143 @@ def generate_journey_summary(journey_data):
         if hasattr(date, 'days'):  # Already a timedelta
             days_diff = date.days
         else:  # It's a date
+            if isinstance(date, datetime):  # Includes pandas Timestamps
+                date = date.date()
             days_diff = (today - date).days
     except:
         # Handle the case where date might not be a valid date object
         pass
     
-    if days_diff == 0:
-        today_phrases = [
-            "🌟 Fresh off the road today!",
-            "🌞 Today's adventure logged",
-            "⏰ Hot off the press: journey completed today",
-            "✨ Just in: today's travel recorded"
-        ]
-        summary_parts.append(random.choice(today_phrases))
-    elif days_diff == 1:
-        yesterday_phrases = [
-            "🕰️ Yesterday's road memories",
-            "🌙 A journey from yesterday",
-            "📆 From your travels yesterday",
-            "⏱️ Logged from yesterday's adventures"
-        ]
-        summary_parts.append(random.choice(yesterday_phrases))
-    elif days_diff < 7:
-        this_week_phrases = [
-            "📅 From your travels earlier this week",
-            "🗓️ A recent journey this week",
-            "🚗 Captured from your week's travels",
-            "🌈 From the roads traveled this week"
-        ]
-        summary_parts.append(random.choice(this_week_phrases))
-    elif days_diff < 30:
-        this_month_phrases = [
-            "📆 A journey from earlier this month",
-            "🗓️ Part of this month's travel story",
-            "🌙 From your monthly travels",
-            "🚗 One of this month's road adventures"
-        ]
-        summary_parts.append(random.choice(this_month_phrases))
-    else:
-        past_phrases = [
-            "🗓️ A journey from your travel archives",
-            "📜 From your historical travels",
-            "⏳ A blast from your driving past",
-            "🔍 Recovered from your journey memories"
-        ]
-        summary_parts.append(random.choice(past_phrases))
+    summary_parts.append(random.choice(SUMMARY_TIME_PHRASES[_recency_band(days_diff)]))
     
     # Add the personalized eco-driving tip if available
     if eco_tip:
-        summary_parts.append(f"{eco_tip['icon']} **{eco_tip['title']}**: {eco_tip['description']}")
+        summary_parts.append(_format_eco_tip(eco_tip))
     # Otherwise add a random fun fact
     else:
-        fun_facts = [
-            "💡 Fun fact: If this trip were walking, it would be about {:.0f} steps!".format(distance * 1300),
-            "🌈 Did you know? The average car spends 95% of its time parked!",
-            "🔋 Eco-tip: Regular maintenance can improve fuel efficiency by up to 10%",
-            "🌡️ Climate note: Properly inflated tires can save up to 3% on fuel",
-            "🚦 Driving tip: Smooth acceleration can improve fuel economy significantly",
-            "💧 Fun fact: It takes about 39,090 gallons of water to manufacture a new car",
-            "🔄 Eco-tip: Keeping your air filter clean can improve gas mileage by up to 10%",
-            "⚡ Future thought: An electric car would use about {:.1f} kWh for this journey".format(distance * 0.2)
-        ]
-        summary_parts.append(random.choice(fun_facts))
+        summary_parts.append(random.choice(SUMMARY_FUN_FACTS).format(steps=distance * 1300, kwh=distance * 0.2))
     
     return summary_parts
 
+def generate_journey_summaries(df, chunk_size=5000, seed=None):
+    """
+    Generate journey summaries for a whole journey history.
+    
+    Produces the same kind of summaries as generate_journey_summary, but the
+    figures, icons, phrase picks and eco tips are computed a chunk at a time
+    with column operations, and the summaries are yielded as they are built
+    so a full-history report never has to be held in memory at once.
+    
+    Parameters:
+    - df: DataFrame with journey data
+    - chunk_size: number of journeys processed per batch
+    - seed: random seed for reproducible phrase and tip picks (optional)
+    
+    Yields (index, summary_parts) pairs in frame order
+    """
+    rng = np.random.default_rng(seed)
+    today = pd.Timestamp(datetime.now().date())
+    
+    def choose_by_band(pools, bands):
+        # One random phrase per journey from the pool named by its band
+        codes, names = pd.factorize(np.asarray(bands, dtype=object))
+        sizes = np.array([len(pools[name]) for name in names], dtype=int)
+        table = np.empty((len(names), sizes.max(initial=0)), dtype=object)
+        for row, name in enumerate(names):
+            table[row, :sizes[row]] = pools[name]
+        picks = (rng.random(len(codes)) * sizes[codes]).astype(int)
+        return table[codes, picks].tolist()
+    
+    def choose(phrases, count):
+        # One random phrase per journey from a single pool
+        return [phrases[pick] for pick in rng.integers(0, len(phrases), count)]
+    
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size]
+        count = len(chunk)
+        
+        distance = pd.to_numeric(chunk['Distance'], errors='coerce').to_numpy(dtype=float)
+        if 'Fuel_Consumption' in chunk.columns:
+            fuel = pd.to_numeric(chunk['Fuel_Consumption'], errors='coerce').to_numpy(dtype=float)
+        else:
+            fuel = np.full(count, np.nan)
+        category = chunk['Category'] if 'Category' in chunk.columns else pd.Series('Personal', index=chunk.index)
+        
+        # Cost, filled in from fuel and fuel price where not recorded
+        if 'Fuel_Price' in chunk.columns:
+            fuel_price = pd.to_numeric(chunk['Fuel_Price'], errors='coerce').to_numpy(dtype=float)
+        else:
+            fuel_price = np.full(count, DEFAULT_FUEL_PRICE)
+        cost = (pd.to_numeric(chunk['Cost'], errors='coerce').to_numpy(dtype=float)
+                if 'Cost' in chunk.columns else np.zeros(count))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            has_fuel = fuel > 0
+            efficiency = distance / fuel
+        fuel_cost = np.where(np.isnan(fuel_price), 0.0, fuel * fuel_price)
+        cost = np.where((cost == 0) & has_fuel, fuel_cost, cost)
+        
+        co2 = calculate_co2_emissions_series(distance, fuel)
+        
+        eco_tips = select_eco_tips(distance, fuel, category, rng)
+        icons = classify_journey_purposes(chunk['Purpose'])
+        category_icons = [get_category_icon(value) for value in category.tolist()]
+        
+        with np.errstate(invalid='ignore'):
+            distance_bands = np.select(
+                [distance < 5, distance < 20, distance < 100], ['short', 'medium', 'long'], default='epic'
+            )
+            efficiency_bands = np.select([efficiency > 15, efficiency > 10], ['high', 'decent'], default='improve')
+            co2_bands = np.select([co2 < 5, co2 < 15], ['low', 'mid'], default='high')
+        
+        # Journeys with an unreadable date count as today's, like the single summary
+        dates = pd.to_datetime(chunk['Date'], errors='coerce').dt.normalize()
+        days_diff = (today - dates).dt.days.fillna(0).to_numpy()
+        recency_bands = np.select(
+            [days_diff == 0, days_diff == 1, days_diff < 7, days_diff < 30],
+            ['today', 'yesterday', 'week', 'month'], default='past'
+        )
+        
+        headlines = [
+            f"{primary_icon} You {verb} {journey_distance:.1f} km for {purpose} {secondary_icon} {category_icon}"
+            for primary_icon, verb, journey_distance, purpose, secondary_icon, category_icon in zip(
+                icons['Primary_Icon'],
+                choose(SUMMARY_TRAVEL_VERBS, count),
+                distance,
+                chunk['Purpose'].tolist(),
+                icons['Secondary_Icon'],
+                category_icons
+            )
+        ]
+        distance_lines = choose_by_band(SUMMARY_DISTANCE_PHRASES, distance_bands)
+        efficiency_lines = [
+            phrase.format(efficiency=value) if fueled else None
+            for phrase, value, fueled in zip(choose_by_band(SUMMARY_EFFICIENCY_PHRASES, efficiency_bands), efficiency, has_fuel)
+        ]
+        cost_lines = [
+            phrase.format(cost=value) if fueled else None
+            for phrase, value, fueled in zip(choose(SUMMARY_COST_PHRASES, count), cost, has_fuel)
+        ]
+        co2_lines = [
+            phrase.format(co2=value) if value > 0 else None
+            for phrase, value in zip(choose_by_band(SUMMARY_CO2_PHRASES, co2_bands), co2)
+        ]
+        
+        tag_lines = [None] * count
+        if 'Tags' in chunk.columns:
+            tag_phrases = choose(SUMMARY_TAG_PHRASES, count)
+            for position, tags in enumerate(chunk['Tags'].tolist()):
+                tag_list = parse_tags(tags) if isinstance(tags, str) else []
+                if tag_list:
+                    tags_display = " ".join([f"#{tag}" for tag in tag_list])
+                    tag_lines[position] = tag_phrases[position].format(tags=tags_display)
+        
+        time_lines = choose_by_band(SUMMARY_TIME_PHRASES, recency_bands)
+        tip_lines = [_format_eco_tip(tip) for tip in eco_tips]
+        
+        for index, *parts in zip(chunk.index, headlines, distance_lines, efficiency_lines, cost_lines,
+                                 co2_lines, tag_lines, time_lines, tip_lines):
+            yield index, [part for part in parts if part is not None]
+
 def calculate_journey_cost(fuel_consumption, fuel_price):
     """Calculate journey cost based on fuel consumption and price."""
     if pd.isna(fuel_consumption) or fuel_consumption <= 0 or pd.isna(fuel_price):
@@ -421,6 +2499,255 @@ def format_tags_for_storage(tags_list):
     
     return ', '.join(tags_list)
 
+def encode_tags(tags, vocabulary=None):
+    """
+    Dictionary-encode a Series of stored tag strings.
+    
+    Each distinct tag string is parsed once with parse_tags. The tags of
+    journey i are ids[offsets[i]:offsets[i + 1]], in stored order, and each
+    id is a position in the vocabulary.
+    
+    Parameters:
+    - tags: Series of comma-separated tag strings, as kept in the Tags column
+    - vocabulary: Existing vocabulary to extend (optional); known tags keep
+      their ids and new tags are added at the end
+    
+    Returns a dictionary with 'vocabulary' (list of tags), 'offsets'
+    (int64 array, one longer than tags) and 'ids' (int32 array)
+    """
+    vocabulary = list(vocabulary) if vocabulary is not None else []
+    tag_ids = {tag: tag_id for tag_id, tag in enumerate(vocabulary)}
+    
+    codes, uniques = pd.factorize(tags.fillna('').astype(str))
+    unique_ids = [
+        [tag_ids.setdefault(tag, len(tag_ids)) for tag in parse_tags(tags_string)]
+        for tags_string in uniques
+    ]
+    vocabulary.extend(list(tag_ids)[len(vocabulary):])
+    
+    unique_lengths = np.array([len(ids) for ids in unique_ids], dtype=np.int64)
+    unique_offsets = np.concatenate([[0], np.cumsum(unique_lengths)])
+    unique_flat = np.array([tag_id for ids in unique_ids for tag_id in ids], dtype=np.int32)
+    
+    # Expand the per-string id lists to one list per journey
+    lengths = unique_lengths[codes] if len(codes) else np.zeros(0, dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+    positions = np.repeat(unique_offsets[codes] - offsets[:-1], lengths) + np.arange(offsets[-1])
+    return {'vocabulary': vocabulary, 'offsets': offsets, 'ids': unique_flat[positions]}
+
+def decode_tags(encoded, index=None):
+    """
+    Turn dictionary-encoded tags back into the comma-separated storage format.
+    
+    Round-trips losslessly with encode_tags for strings written by
+    format_tags_for_storage.
+    
+    Returns a Series of tag strings (empty strings for journeys without tags)
+    """
+    vocabulary = np.array(encoded['vocabulary'] + [''], dtype=object)
+    tag_lists = np.split(vocabulary[encoded['ids']], encoded['offsets'][1:-1])
+    return pd.Series(
+        [format_tags_for_storage(list(tag_list)) for tag_list in tag_lists] if len(encoded['offsets']) > 1 else [],
+        index=index, dtype=object
+    )
+
+def concat_encoded_tags(first, second):
+    """Join two tag encodings over the same vocabulary (second's vocabulary may extend first's)."""
+    return {
+        'vocabulary': list(second['vocabulary']),
+        'offsets': np.concatenate([first['offsets'], second['offsets'][1:] + first['offsets'][-1]]),
+        'ids': np.concatenate([first['ids'], second['ids']])
+    }
+
+def _tag_incidence(encoded, first_row=0):
+    """Return (tag ids, row numbers) of an encoding, one pair per journey and tag, sorted by tag then row."""
+    counts = np.diff(encoded['offsets'])
+    rows = np.repeat(np.arange(first_row, first_row + len(counts)), counts)
+    ids = encoded['ids'].astype(np.int64)
+    order = np.lexsort((rows, ids))
+    ids, rows = ids[order], rows[order]
+    # A tag repeated within one journey's tags counts once
+    keep = np.concatenate(([True], (ids[1:] != ids[:-1]) | (rows[1:] != rows[:-1])))[:len(ids)]
+    return ids[keep], rows[keep]
+
+def _tag_postings(encoded, first_row=0):
+    """Map each tag of an encoding to the sorted row numbers carrying it."""
+    ids, rows = _tag_incidence(encoded, first_row)
+    bounds = np.searchsorted(ids, np.arange(len(encoded['vocabulary']) + 1))
+    return {
+        tag: rows[bounds[tag_id]:bounds[tag_id + 1]]
+        for tag_id, tag in enumerate(encoded['vocabulary'])
+        if bounds[tag_id + 1] > bounds[tag_id]
+    }
+
+# Inverted tag indexes by data file path: the dictionary-encoded Tags column
+# plus tag -> sorted array of the row numbers carrying it. See get_tag_index.
+_tag_indexes = {}
+_tag_indexes_lock = threading.Lock()
+
+def get_tag_index(path=None):
+    """
+    Return the inverted tag index of a journey file.
+    
+    The index is built once per data version and then kept up to date as
+    journeys are appended (see _update_tag_index). Row numbers refer to
+    positions in the load_data frame.
+    
+    Returns a dictionary with 'encoded' (see encode_tags), 'postings'
+    ({tag: sorted row number array}), 'count' and 'version'
+    """
+    path = path or DATA_FILE
+    key = _data_file_key(path)
+    with _journey_store_lock:
+        entry = _journey_store.get(path)
+        version = entry['version'] if entry is not None and entry['key'] == key else None
+    with _tag_indexes_lock:
+        index = _tag_indexes.get(path)
+        if index is not None and version is not None and index['version'] == version:
+            return index
+    
+    df = _load_journeys(path, ['Tags'])
+    encoded = encode_tags(df['Tags'])
+    index = {
+        'encoded': encoded,
+        'postings': _tag_postings(encoded),
+        'count': len(df),
+        'version': get_data_version(path)
+    }
+    
+    with _tag_indexes_lock:
+        _tag_indexes[path] = index
+    return index
+
+def _update_tag_index(path, new_rows):
+    """
+    Fold appended journeys into a cached tag index, or drop it after a
+    rewrite. Registered as a data change hook.
+    
+    The new rows are encoded against the existing vocabulary. They number
+    after every existing row, so their postings are concatenated onto the
+    existing arrays and stay sorted.
+    """
+    with _tag_indexes_lock:
+        index = _tag_indexes.get(path)
+        versions = get_appended_data_version(path)
+        if index is None:
+            return
+        if new_rows is None or versions is None or index['version'] != versions[0]:
+            del _tag_indexes[path]
+            return
+        
+        tags = new_rows['Tags'] if 'Tags' in new_rows.columns else pd.Series('', index=new_rows.index)
+        new_encoded = encode_tags(tags, index['encoded']['vocabulary'])
+        postings = dict(index['postings'])
+        for tag, rows in _tag_postings(new_encoded, index['count']).items():
+            postings[tag] = np.concatenate([postings[tag], rows]) if tag in postings else rows
+        index.update({
+            'encoded': concat_encoded_tags(index['encoded'], new_encoded),
+            'postings': postings,
+            'count': index['count'] + len(new_rows),
+            'version': versions[1]
+        })
+
+register_data_change_hook(_update_tag_index)
+
+def get_journey_tags(vehicle=None, with_counts=False):
+    """
+    Return the tags used on a vehicle's journeys, sorted alphabetically.
+    
+    Parameters:
+    - vehicle: Vehicle whose journeys to look at (defaults to the default vehicle)
+    - with_counts: Return {tag: number of journeys} instead of a list
+    """
+    postings = get_tag_index(get_vehicle_data_file(vehicle))['postings']
+    if with_counts:
+        return {tag: len(postings[tag]) for tag in sorted(postings)}
+    return sorted(postings)
+
+def get_tag_cooccurrence(vehicle=None):
+    """
+    Count how many journeys carry each pair of tags.
+    
+    Computed from the dictionary-encoded tags with integer counting, without
+    parsing any tag text. Each pass pairs every tag with the one d places
+    after it within the same journey, so the number of passes is the
+    largest number of tags on one journey. Only the pairs that occur are
+    counted, so memory grows with the pairs found rather than with the
+    square of the vocabulary.
+    
+    Returns a square DataFrame indexed by tag on both axes; the diagonal
+    holds the number of journeys carrying each tag
+    """
+    encoded = get_tag_index(get_vehicle_data_file(vehicle))['encoded']
+    vocabulary = encoded['vocabulary']
+    size = len(vocabulary)
+    ids, rows = _tag_incidence(encoded)
+    order = np.lexsort((ids, rows))
+    ids, rows = ids[order], rows[order]
+    
+    pairs = [ids * size + ids]
+    for d in range(1, len(ids)):
+        same = rows[d:] == rows[:-d]
+        if not same.any():
+            break
+        first, second = ids[:-d][same], ids[d:][same]
+        pairs.extend([first * size + second, second * size + first])
+    
+    # Count each distinct pair key from the boundaries of the sorted keys
+    keys = np.sort(np.concatenate(pairs))
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))[:len(keys)]
+    counts = np.diff(np.append(starts, len(keys)))
+    first, second = np.divmod(keys[starts], max(size, 1))
+    
+    used = sorted(first[first == second].tolist(), key=vocabulary.__getitem__)
+    positions = np.zeros(size, dtype=np.int64)
+    positions[used] = np.arange(len(used))
+    matrix = np.zeros((len(used), len(used)), dtype=np.int64)
+    matrix[positions[first], positions[second]] = counts
+    labels = [vocabulary[tag_id] for tag_id in used]
+    return pd.DataFrame(matrix, index=labels, columns=labels)
+
+def find_journey_rows_by_tags(tags, match='any', path=None, index=None):
+    """
+    Return the sorted row numbers of the journeys carrying the given tags.
+    
+    Parameters:
+    - tags: A tag or list of tags
+    - match: 'any' for journeys with at least one of the tags (OR), 'all'
+      for journeys with every tag (AND)
+    - path: Journey file to search (defaults to DATA_FILE)
+    - index: Tag index to search instead of path's (optional, see get_tag_index)
+    
+    Cost is proportional to the number of matching postings, not to the
+    number of journeys.
+    """
+    if match not in ('any', 'all'):
+        raise ValueError("match must be 'any' or 'all'")
+    if isinstance(tags, str):
+        tags = [tags]
+    postings = (index if index is not None else get_tag_index(path))['postings']
+    empty = np.array([], dtype=np.int64)
+    
+    if match == 'all':
+        lists = sorted((postings.get(tag, empty) for tag in dict.fromkeys(tags)), key=len)
+        if not lists:
+            return empty
+        rows = lists[0]
+        for other in lists[1:]:
+            if len(rows) == 0:
+                break
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
+    
+    lists = [postings[tag] for tag in dict.fromkeys(tags) if tag in postings]
+    if not lists:
+        return empty
+    if len(lists) == 1:
+        return lists[0]
+    # A stable sort merges the already sorted runs in near-linear time
+    rows = np.sort(np.concatenate(lists), kind='stable')
+    return rows[np.concatenate(([True], rows[1:] != rows[:-1]))]
+
 def get_category_icon(category):
     """Get an appropriate icon for a journey category."""
     category_icons = {
@@ -437,6 +2764,17 @@ def get_category_icon(category):
     
     return category_icons.get(category, "📌")
 
+# Kilograms of CO2 produced per liter of gasoline burned
+CO2_PER_LITER = 2.31
+
+# Average CO2 emissions in kg per km, used when fuel consumption is unknown
+CO2_EMISSION_FACTORS = {
+    'small': 0.15,    # Small car: 150g/km
+    'medium': 0.19,   # Medium car: 190g/km
+    'large': 0.25,    # Large car: 250g/km
+    'suv': 0.30       # SUV: 300g/km
+}
+
 def calculate_co2_emissions(distance, fuel_consumption=None, vehicle_type='medium'):
     """
     Calculate approximate CO2 emissions for a journey.
@@ -452,43 +2790,51 @@ def calculate_co2_emissions(distance, fuel_consumption=None, vehicle_type='mediu
     
     Returns CO2 emissions in kg
     """
-    if fuel_consumption and not pd.isna(fuel_consumption) and fuel_consumption > 0:
-        # Direct calculation based on fuel consumption
-        # Each liter of gasoline produces approximately 2.31kg of CO2
-        return fuel_consumption * 2.31
-    else:
-        # Estimation based on vehicle type and distance
-        # Average CO2 emissions in kg per km
-        emissions_factors = {
-            'small': 0.15,    # Small car: 150g/km
-            'medium': 0.19,   # Medium car: 190g/km
-            'large': 0.25,    # Large car: 250g/km
-            'suv': 0.30       # SUV: 300g/km
-        }
-        
-        factor = emissions_factors.get(vehicle_type.lower(), emissions_factors['medium'])
-        return distance * factor
+    return float(calculate_co2_emissions_series([distance], [fuel_consumption], vehicle_type)[0])
 
-def get_personalized_eco_tips(distance, fuel_consumption=None, category=None):
+def calculate_co2_emissions_series(distance, fuel_consumption=None, vehicle_type='medium'):
     """
-    Generate personalized eco-driving tips based on journey data.
+    Calculate approximate CO2 emissions for many journeys at once.
+    
+    Same rules as calculate_co2_emissions, evaluated with column operations:
+    2.31 kg per liter where fuel consumption is known and positive, the
+    per-km factor of the vehicle type otherwise.
     
     Parameters:
-    - distance: journey distance in km
-    - fuel_consumption: fuel used in liters (optional)
-    - category: journey category (e.g., 'Commute', 'Shopping', etc.)
+    - distance: journey distances in km (Series or array-like)
+    - fuel_consumption: fuel used in liters, same length as distance (optional)
+    - vehicle_type: a single vehicle type or one per journey
     
-    Returns a dictionary with eco tip information
+    Returns CO2 emissions in kg, as a Series aligned with distance if it is a
+    Series, otherwise as a NumPy array
     """
-    import random
+    index = distance.index if isinstance(distance, pd.Series) else None
+    distance_values = pd.to_numeric(pd.Series(distance), errors='coerce').to_numpy(dtype=float)
     
-    # Calculate efficiency if we have fuel data
-    efficiency = None
-    if fuel_consumption and not pd.isna(fuel_consumption) and fuel_consumption > 0 and distance > 0:
-        efficiency = distance / fuel_consumption  # km/L
+    if fuel_consumption is None:
+        fuel_values = np.full(len(distance_values), np.nan)
+    else:
+        fuel_values = pd.to_numeric(pd.Series(fuel_consumption), errors='coerce').to_numpy(dtype=float)
+    
+    if isinstance(vehicle_type, str):
+        factors = CO2_EMISSION_FACTORS.get(vehicle_type.lower(), CO2_EMISSION_FACTORS['medium'])
+    else:
+        factors = (pd.Series(vehicle_type).str.lower().map(CO2_EMISSION_FACTORS)
+                   .fillna(CO2_EMISSION_FACTORS['medium']).to_numpy(dtype=float))
     
+    with np.errstate(invalid='ignore'):
+        has_fuel = fuel_values > 0
+    emissions = np.where(has_fuel, fuel_values * CO2_PER_LITER, distance_values * factors)
+    
+    if index is not None:
+        return pd.Series(emissions, index=index)
+    return emissions
+
+# Eco-driving tips grouped by the journeys they apply to; see
+# _eligible_eco_tips for how the groups are combined
+ECO_TIPS = {
     # Basic tips for all journeys
-    basic_tips = [
+    'basic': [
         {
             "title": "Regular Maintenance Matters",
             "description": "A well-maintained vehicle can be up to 10% more fuel-efficient. Schedule regular check-ups for your car.",
@@ -531,10 +2877,10 @@ def get_personalized_eco_tips(distance, fuel_consumption=None, category=None):
             "impact": "low",
             "category": "comfort"
         }
-    ]
+    ],
     
     # Tips for short journeys
-    short_journey_tips = [
+    'short_journey': [
         {
             "title": "Consider Alternatives",
             "description": "For trips under 5 km, walking, cycling, or electric scooters can be faster, healthier, and eco-friendly alternatives.",
@@ -556,10 +2902,10 @@ def get_personalized_eco_tips(distance, fuel_consumption=None, category=None):
             "impact": "medium",
             "category": "efficiency"
         }
-    ]
+    ],
     
     # Tips for medium to long journeys
-    long_journey_tips = [
+    'long_journey': [
         {
             "title": "Cruise Control on Highways",
             "description": "Using cruise control on highways can save up to 6% on fuel by maintaining a steady speed.",
@@ -588,10 +2934,10 @@ def get_personalized_eco_tips(distance, fuel_consumption=None, category=None):
             "impact": "high",
             "category": "aerodynamics"
         }
-    ]
+    ],
     
     # Tips for low efficiency journeys
-    low_efficiency_tips = [
+    'low_efficiency': [
         {
             "title": "Aggressive Driving Costs",
             "description": "Speeding, rapid acceleration, and hard braking can lower gas mileage by 15-30% on highways and 10-40% in stop-and-go traffic.",
@@ -613,10 +2959,10 @@ def get_personalized_eco_tips(distance, fuel_consumption=None, category=None):
             "impact": "medium",
             "category": "maintenance"
         }
-    ]
+    ],
     
     # Category-specific tips
-    commute_tips = [
+    'commute': [
         {
             "title": "Consider Carpooling",
             "description": "Sharing your commute with coworkers can dramatically reduce your carbon footprint and save on fuel costs.",
@@ -631,9 +2977,9 @@ def get_personalized_eco_tips(distance, fuel_consumption=None, category=None):
             "impact": "medium",
             "category": "planning"
         }
-    ]
+    ],
     
-    shopping_tips = [
+    'shopping': [
         {
             "title": "Plan Multiple Stops",
             "description": "Plan your shopping trips to hit multiple stores in one journey, starting with the farthest location.",
@@ -649,25 +2995,55 @@ def get_personalized_eco_tips(distance, fuel_consumption=None, category=None):
             "category": "alternative"
         }
     ]
-    
-    # Eligible tips based on journey data
-    eligible_tips = basic_tips.copy()
+}
+
+def _eligible_eco_tips(short_journey, long_journey, low_efficiency, category):
+    """Collect the eco tips that apply to a journey, in selection order."""
+    eligible_tips = list(ECO_TIPS['basic'])
     
     # Add distance-based tips
-    if distance < 5:
-        eligible_tips.extend(short_journey_tips)
-    elif distance > 20:
-        eligible_tips.extend(long_journey_tips)
+    if short_journey:
+        eligible_tips.extend(ECO_TIPS['short_journey'])
+    elif long_journey:
+        eligible_tips.extend(ECO_TIPS['long_journey'])
     
     # Add efficiency-based tips
-    if efficiency is not None and efficiency < 10:
-        eligible_tips.extend(low_efficiency_tips)
+    if low_efficiency:
+        eligible_tips.extend(ECO_TIPS['low_efficiency'])
     
     # Add category-specific tips
     if category == 'Commute':
-        eligible_tips.extend(commute_tips)
+        eligible_tips.extend(ECO_TIPS['commute'])
     elif category == 'Shopping':
-        eligible_tips.extend(shopping_tips)
+        eligible_tips.extend(ECO_TIPS['shopping'])
+    
+    return eligible_tips
+
+def get_personalized_eco_tips(distance, fuel_consumption=None, category=None):
+    """
+    Generate personalized eco-driving tips based on journey data.
+    
+    Parameters:
+    - distance: journey distance in km
+    - fuel_consumption: fuel used in liters (optional)
+    - category: journey category (e.g., 'Commute', 'Shopping', etc.)
+    
+    Returns a dictionary with eco tip information
+    """
+    import random
+    
+    # Calculate efficiency if we have fuel data
+    efficiency = None
+    if fuel_consumption and not pd.isna(fuel_consumption) and fuel_consumption > 0 and distance > 0:
+        efficiency = distance / fuel_consumption  # km/L
+    
+    # Eligible tips based on journey data
+    eligible_tips = _eligible_eco_tips(
+        distance < 5,
+        distance > 20,
+        efficiency is not None and efficiency < 10,
+        category
+    )
     
     # Randomly select a tip from eligible ones
     selected_tip = random.choice(eligible_tips)
@@ -675,6 +3051,64 @@ def get_personalized_eco_tips(distance, fuel_consumption=None, category=None):
     return selected_tip
 
 
+def select_eco_tips(distance, fuel_consumption=None, category=None, rng=None):
+    """
+    Pick a personalized eco-driving tip for many journeys at once.
+    
+    Same eligibility rules as get_personalized_eco_tips; journeys are grouped
+    by which tip groups apply, and one random draw per journey indexes into
+    its group's tip pool.
+    
+    Parameters:
+    - distance: journey distances in km (Series or array-like)
+    - fuel_consumption: fuel used in liters, same length as distance (optional)
+    - category: journey categories, same length as distance (optional)
+    - rng: numpy random Generator (optional)
+    
+    Returns a list with one tip dictionary per journey
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    
+    distance_values = pd.to_numeric(pd.Series(distance), errors='coerce').to_numpy(dtype=float)
+    count = len(distance_values)
+    if fuel_consumption is None:
+        fuel_values = np.full(count, np.nan)
+    else:
+        fuel_values = pd.to_numeric(pd.Series(fuel_consumption), errors='coerce').to_numpy(dtype=float)
+    if category is None:
+        category_values = np.full(count, None, dtype=object)
+    else:
+        category_values = pd.Series(category).to_numpy(dtype=object)
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        short_journey = distance_values < 5
+        long_journey = distance_values > 20
+        low_efficiency = ((fuel_values > 0) & (distance_values > 0)
+                          & (distance_values / fuel_values < 10))
+    category_group = np.select(
+        [category_values == 'Commute', category_values == 'Shopping'], [1, 2], default=0
+    )
+    
+    # One code per combination of applicable tip groups
+    codes = (short_journey * 12 + long_journey * 6 + low_efficiency * 3 + category_group).astype(int)
+    pools = {}
+    for code in np.unique(codes):
+        pools[code] = _eligible_eco_tips(
+            bool(code // 12), bool(code // 6 % 2), bool(code // 3 % 2),
+            {1: 'Commute', 2: 'Shopping'}.get(code % 3)
+        )
+    
+    pool_sizes = np.zeros(24, dtype=int)
+    pool_table = np.empty((24, max((len(pool) for pool in pools.values()), default=0)), dtype=object)
+    for code, pool in pools.items():
+        pool_sizes[code] = len(pool)
+        pool_table[code, :len(pool)] = pool
+    
+    picks = (rng.random(count) * pool_sizes[codes]).astype(int)
+    return pool_table[codes, picks].tolist()
+
+
 def calculate_carbon_offset_options(co2_emissions):
     """
     Calculate carbon offset options based on CO2 emissions.
@@ -775,6 +3209,9 @@ def generate_route_optimization_suggestions(journey_data):
     """
     Generate route optimization suggestions based on journey patterns.
     
+    All per-journey work is done with grouped column operations, so the cost
+    grows linearly with the number of journeys.
+    
     Parameters:
     - journey_data: DataFrame with journey information
     
@@ -784,56 +3221,61 @@ def generate_route_optimization_suggestions(journey_data):
         return []
     
     suggestions = []
-    
-    # Create a copy to avoid modifying the original
-    df = journey_data.copy()
-    
-    # Ensure Date column is datetime if it exists
-    if 'Date' in df.columns:
-        df['Date'] = pd.to_datetime(df['Date'])
+    distance = journey_data['Distance']
     
     # Look for frequent destinations (more than 1 visit)
-    if 'Purpose' in df.columns:
-        purpose_counts = df['Purpose'].value_counts()
-        frequent_purposes = purpose_counts[purpose_counts > 1].index.tolist()
+    if 'Purpose' in journey_data.columns:
+        purpose = journey_data['Purpose']
+        purpose_counts = purpose.value_counts()
+        frequent_purposes = purpose_counts[purpose_counts > 1].index.tolist()[:3]  # Limit to top 3 frequent destinations
         
-        for purpose in frequent_purposes[:3]:  # Limit to top 3 frequent destinations
-            purpose_journeys = df[df['Purpose'] == purpose]
+        if frequent_purposes:
+            in_frequent = purpose.isin(frequent_purposes)
+            frequent = pd.DataFrame({'Purpose': purpose[in_frequent], 'Distance': distance[in_frequent]})
+            
+            has_fuel_column = 'Fuel_Consumption' in journey_data.columns
+            if has_fuel_column:
+                fuel = journey_data['Fuel_Consumption'][in_frequent]
+                frequent['Fuel_Known'] = fuel.notna()
+                # Efficiency of each journey, 0 where no fuel was logged
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    frequent['Efficiency'] = np.where(fuel > 0, frequent['Distance'] / fuel, 0)
             
-            # Check for frequent destinations
-            if len(purpose_journeys) >= 2:
-                avg_distance = purpose_journeys['Distance'].mean()
-                total_distance = purpose_journeys['Distance'].sum()
-                count = len(purpose_journeys)
+            grouped = frequent.groupby('Purpose', sort=False)
+            summary = grouped['Distance'].agg(['mean', 'sum', 'count'])
+            if has_fuel_column:
+                summary['fuel_known'] = grouped['Fuel_Known'].any()
+                summary['best_efficiency'] = grouped['Efficiency'].max()
+                summary['avg_efficiency'] = grouped['Efficiency'].mean()
+            
+            for purpose_name in frequent_purposes:
+                row = summary.loc[purpose_name]
+                avg_distance = row['mean']
+                total_distance = row['sum']
+                count = int(row['count'])
                 
                 # Calculate potential savings (assume 15% optimization potential)
                 potential_distance_saved = total_distance * 0.15
                 potential_fuel_saved = potential_distance_saved / 12  # Assuming 12 km/L average
                 
                 # If we have fuel consumption data, calculate efficiency
-                if 'Fuel_Consumption' in purpose_journeys.columns and not purpose_journeys['Fuel_Consumption'].isna().all():
-                    # Calculate efficiency for each journey to this destination
-                    purpose_journeys['Efficiency'] = purpose_journeys.apply(
-                        lambda row: row['Distance'] / row['Fuel_Consumption'] if row['Fuel_Consumption'] > 0 else 0, 
-                        axis=1
-                    )
-                    
-                    # Get the most efficient journey
-                    most_efficient = purpose_journeys.loc[purpose_journeys['Efficiency'].idxmax()]
-                    avg_efficiency = purpose_journeys['Efficiency'].mean()
+                if has_fuel_column and row['fuel_known']:
+                    best_efficiency = row['best_efficiency']
+                    avg_efficiency = row['avg_efficiency']
                     
                     # Use actual efficiency for better estimates
-                    potential_fuel_saved = potential_distance_saved / avg_efficiency
+                    with np.errstate(divide='ignore', invalid='ignore'):
+                        potential_fuel_saved = potential_distance_saved / avg_efficiency
                     
                     # Calculate CO2 savings (2.31 kg CO2 per liter of gasoline)
-                    co2_saved = potential_fuel_saved * 2.31
+                    co2_saved = potential_fuel_saved * CO2_PER_LITER
                     
                     # If the most efficient journey is significantly better than average
-                    if most_efficient['Efficiency'] > (avg_efficiency * 1.1) and most_efficient['Efficiency'] > 0:
+                    if best_efficiency > (avg_efficiency * 1.1) and best_efficiency > 0:
                         suggestions.append({
-                            'title': f"Optimize routes to {purpose}",
-                            'description': f"Your most efficient journey to {purpose} used {most_efficient['Efficiency']:.1f} km/L, " +
-                                          f"which is {((most_efficient['Efficiency']/avg_efficiency)-1)*100:.0f}% better than your average. " +
+                            'title': f"Optimize routes to {purpose_name}",
+                            'description': f"Your most efficient journey to {purpose_name} used {best_efficiency:.1f} km/L, " +
+                                          f"which is {((best_efficiency/avg_efficiency)-1)*100:.0f}% better than your average. " +
                                           f"Consider taking this route more often.",
                             'savings': f"Save ~{potential_fuel_saved:.1f}L fuel and {co2_saved:.1f}kg CO₂",
                             'icon': '🗺️'
@@ -842,44 +3284,41 @@ def generate_route_optimization_suggestions(journey_data):
                     # Generate suggestion based on frequency
                     if count >= 4:
                         suggestions.append({
-                            'title': f'Optimize {purpose} Route',
-                            'description': f'You travel to {purpose} frequently ({count} times). Consider finding a more efficient route or carpooling to save approximately {potential_distance_saved:.1f}km.',
+                            'title': f'Optimize {purpose_name} Route',
+                            'description': f'You travel to {purpose_name} frequently ({count} times). Consider finding a more efficient route or carpooling to save approximately {potential_distance_saved:.1f}km.',
                             'savings': f'Save ~{potential_fuel_saved:.1f}L fuel',
                             'icon': '🔄'
                         })
                     else:
                         suggestions.append({
-                            'title': f'Plan {purpose} Trips Better',
-                            'description': f'You\'ve made {count} trips to {purpose} with an average distance of {avg_distance:.1f}km. Combining errands or optimizing this route could reduce your travel distance.',
+                            'title': f'Plan {purpose_name} Trips Better',
+                            'description': f'You\'ve made {count} trips to {purpose_name} with an average distance of {avg_distance:.1f}km. Combining errands or optimizing this route could reduce your travel distance.',
                             'savings': f'Potential {potential_distance_saved:.1f}km reduction',
                             'icon': '📍'
                         })
     
     # Look for similar distance journeys that could be combined
     if 'Date' in journey_data.columns:
-        df = journey_data.copy()
-        df['Date'] = pd.to_datetime(df['Date'])
-        df['Day'] = df['Date'].dt.day_name()
-        df['DateOnly'] = df['Date'].dt.date
+        dates = pd.to_datetime(journey_data['Date'])
+        journey_days = dates.dt.normalize()
         
         # Check for short trips made on the same day
-        short_trips = df[df['Distance'] < 5]
-        if len(short_trips) >= 2:
-            short_trips_by_date = short_trips.groupby('DateOnly').size()
-            same_day_short_trips = short_trips_by_date[short_trips_by_date > 1].index.tolist()
+        is_short = distance < 5
+        if is_short.sum() >= 2:
+            short_trips_by_date = journey_days[is_short].value_counts()
+            same_day_short_trips = short_trips_by_date[short_trips_by_date > 1].index
             
-            if same_day_short_trips:
+            if len(same_day_short_trips) > 0:
                 # Count total days with multiple short trips
                 days_count = len(same_day_short_trips)
                 
-                # Filter short trips on those days
-                short_trips_to_combine = df[(df['Distance'] < 5) & (df['DateOnly'].isin(same_day_short_trips))]
-                total_short_distance = short_trips_to_combine['Distance'].sum()
+                # Total distance of the short trips on those days
+                total_short_distance = distance[is_short & journey_days.isin(same_day_short_trips)].sum()
                 
                 # Assume 20% distance reduction by combining trips
                 distance_saved = total_short_distance * 0.2
                 fuel_saved = distance_saved / 10  # Short trips are less efficient, assume 10 km/L
-                co2_saved = fuel_saved * 2.31
+                co2_saved = fuel_saved * CO2_PER_LITER
                 
                 suggestions.append({
                     'title': 'Combine Short Errands',
@@ -888,30 +3327,29 @@ def generate_route_optimization_suggestions(journey_data):
                     'icon': '🔗'
                 })
         
-        # Group by day of week for regular patterns
-        day_groups = df.groupby('Day')
+        # For each day of the week, find the first pair of consecutive journeys
+        # (in time order) made between 1 and 5 hours apart
+        by_day = pd.DataFrame({
+            'Day': dates.dt.day_name(),
+            'Date': dates,
+            'Purpose': journey_data['Purpose'] if 'Purpose' in journey_data.columns else None
+        }).sort_values(['Day', 'Date'], kind='stable')
         
-        for day, day_journeys in day_groups:
-            if len(day_journeys) > 1:
-                # Check if there are journeys on the same day that could be combined
-                day_journeys = day_journeys.sort_values('Date')
-                
-                for i in range(len(day_journeys) - 1):
-                    j1 = day_journeys.iloc[i]
-                    j2 = day_journeys.iloc[i+1]
-                    
-                    # If journeys are typically done on the same day within a few hours
-                    time_diff = (j2['Date'] - j1['Date']).total_seconds() / 3600
-                    
-                    if 1 < time_diff < 5:  # Between 1 and 5 hours apart
-                        suggestions.append({
-                            'title': f"Combine {j1['Purpose']} and {j2['Purpose']} trips",
-                            'description': f"You often do these journeys on the same {day} within {time_diff:.1f} hours. " +
-                                          f"Combining them could save fuel and reduce emissions.",
-                            'savings': "Potential 15-20% fuel savings",
-                            'icon': '📋'
-                        })
-                        break  # Just suggest one combination per day
+        day_groups = by_day.groupby('Day', sort=False)
+        by_day['Previous_Purpose'] = day_groups['Purpose'].shift()
+        by_day['Gap_Hours'] = day_groups['Date'].diff().dt.total_seconds() / 3600
+        
+        combinable = by_day[(by_day['Gap_Hours'] > 1) & (by_day['Gap_Hours'] < 5)].drop_duplicates('Day')
+        for day, first_purpose, second_purpose, time_diff in zip(
+            combinable['Day'], combinable['Previous_Purpose'], combinable['Purpose'], combinable['Gap_Hours']
+        ):
+            suggestions.append({
+                'title': f"Combine {first_purpose} and {second_purpose} trips",
+                'description': f"You often do these journeys on the same {day} within {time_diff:.1f} hours. " +
+                              f"Combining them could save fuel and reduce emissions.",
+                'savings': "Potential 15-20% fuel savings",
+                'icon': '📋'
+            })
     
     # Add general route optimization tips if specific ones couldn't be generated
     if not suggestions:
@@ -968,32 +3406,32 @@ def analyze_driving_patterns(df):
         # Calculate efficiency for each journey
         df_with_fuel = df[df['Fuel_Consumption'].notna() & (df['Fuel_Consumption'] > 0)]
         if not df_with_fuel.empty:
-            df_with_fuel = df_with_fuel.copy()
-            df_with_fuel['Efficiency'] = df_with_fuel['Distance'] / df_with_fuel['Fuel_Consumption']
-            df_with_fuel = df_with_fuel.sort_values('Date')
+            df_with_fuel = df_with_fuel.assign(
+                Efficiency=df_with_fuel['Distance'] / df_with_fuel['Fuel_Consumption']
+            ).sort_values('Date')
             
-            # Get efficiency values
-            efficiencies = df_with_fuel['Efficiency'].tolist()
+            # Efficiency values as an array, in date order
+            efficiencies = df_with_fuel['Efficiency'].to_numpy(dtype=float)
             
-            # Store efficiency data for visualization
+            # Store efficiency data for visualization, built column-wise
+            journey_dates = pd.to_datetime(df_with_fuel['Date'], errors='coerce')
+            date_labels = journey_dates.dt.strftime('%Y-%m-%d')
+            if journey_dates.isna().any():
+                date_labels = date_labels.where(journey_dates.notna(), df_with_fuel['Date'].astype(str))
             analysis['efficiency_data'] = [
-                {
-                    'date': row['Date'].strftime('%Y-%m-%d') if hasattr(row['Date'], 'strftime') else str(row['Date']),
-                    'efficiency': row['Efficiency'],
-                    'distance': row['Distance'],
-                    'purpose': row['Purpose']
-                }
-                for _, row in df_with_fuel.iterrows()
+                {'date': date, 'efficiency': efficiency, 'distance': distance, 'purpose': purpose}
+                for date, efficiency, distance, purpose in zip(
+                    date_labels.tolist(), efficiencies.tolist(),
+                    df_with_fuel['Distance'].tolist(), df_with_fuel['Purpose'].tolist()
+                )
             ]
             
             # Check for efficiency trend
             if len(efficiencies) >= 3:
                 # Simple trend analysis
-                first_half = efficiencies[:len(efficiencies)//2]
-                second_half = efficiencies[len(efficiencies)//2:]
-                
-                first_avg = sum(first_half) / len(first_half)
-                second_avg = sum(second_half) / len(second_half)
+                half = len(efficiencies) // 2
+                first_avg = efficiencies[:half].mean()
+                second_avg = efficiencies[half:].mean()
                 
                 if second_avg > first_avg * 1.05:
                     analysis['efficiency_trend'] = 'improving'
@@ -1018,12 +3456,11 @@ def analyze_driving_patterns(df):
                     })
             
             # Analyze variation in efficiency
-            avg_efficiency = 0
+            avg_efficiency = efficiencies.mean()
+            max_efficiency = efficiencies.max()
             variation = 0
             if len(efficiencies) >= 3:
-                avg_efficiency = sum(efficiencies) / len(efficiencies)
-                max_efficiency = max(efficiencies)
-                min_efficiency = min(efficiencies)
+                min_efficiency = efficiencies.min()
                 variation = (max_efficiency - min_efficiency) / avg_efficiency
                 
                 if variation > 0.3:  # More than 30% variation
@@ -1034,8 +3471,7 @@ def analyze_driving_patterns(df):
                     })
                     
                     # Find the most efficient journey
-                    most_efficient_idx = efficiencies.index(max_efficiency)
-                    most_efficient_journey = df_with_fuel.iloc[most_efficient_idx]
+                    most_efficient_journey = df_with_fuel.iloc[int(efficiencies.argmax())]
                     
                     analysis['recommendations'].append({
                         'title': 'Replicate Your Best Efficiency',
@@ -1044,13 +3480,12 @@ def analyze_driving_patterns(df):
                     })
             
             # Calculate eco score (0-100)
-            avg_efficiency = sum(efficiencies) / len(efficiencies)
             # Score scale: 10 km/L = 50 points, 20 km/L = 100 points
             eco_score = min(100, max(0, 50 + (avg_efficiency - 10) * 5))
             analysis['eco_score'] = round(eco_score)
             
             # Calculate improvement potential
-            best_efficiency = max(efficiencies)
+            best_efficiency = max_efficiency
             if best_efficiency > avg_efficiency:
                 potential_improvement = ((best_efficiency / avg_efficiency) - 1) * 100
                 analysis['improvement_potential'] = round(potential_improvement)
@@ -1063,17 +3498,16 @@ def analyze_driving_patterns(df):
                         'impact': 'high'
                     })
             
-            # Identify good and bad driving patterns
-            df_with_fuel['Category'] = df_with_fuel['Category'].fillna('Other')
-            
             # Analyze by category if we have category data
             if 'Category' in df_with_fuel.columns:
-                category_efficiencies = df_with_fuel.groupby('Category')['Efficiency'].mean().to_dict()
+                category_efficiencies = df_with_fuel['Efficiency'].groupby(
+                    df_with_fuel['Category'].fillna('Other')
+                ).mean()
                 
                 # Find best and worst performing categories
                 if len(category_efficiencies) > 1:
-                    best_category = max(category_efficiencies.items(), key=lambda x: x[1])
-                    worst_category = min(category_efficiencies.items(), key=lambda x: x[1])
+                    best_category = (category_efficiencies.idxmax(), category_efficiencies.max())
+                    worst_category = (category_efficiencies.idxmin(), category_efficiencies.min())
                     
                     if best_category[1] > worst_category[1] * 1.15:  # At least 15% difference
                         analysis['patterns'].append({
@@ -1083,12 +3517,11 @@ def analyze_driving_patterns(df):
                         })
             
             # Analyze short trips efficiency
-            short_trips = df_with_fuel[df_with_fuel['Distance'] < 5]
-            long_trips = df_with_fuel[df_with_fuel['Distance'] >= 5]
+            is_short_trip = df_with_fuel['Distance'].to_numpy() < 5
             
-            if not short_trips.empty and not long_trips.empty:
-                short_efficiency = short_trips['Efficiency'].mean()
-                long_efficiency = long_trips['Efficiency'].mean()
+            if is_short_trip.any() and not is_short_trip.all():
+                short_efficiency = efficiencies[is_short_trip].mean()
+                long_efficiency = efficiencies[~is_short_trip].mean()
                 
                 if short_efficiency < long_efficiency * 0.85:  # Short trips at least 15% less efficient
                     analysis['patterns'].append({
@@ -1369,7 +3802,357 @@ def generate_weekly_eco_challenges(stats=None, current_week=None):
     
     return weekly_challenges
 
-def update_eco_challenge_progress(challenges, journey_data, current_week=None):
+def build_iso_week_index(journey_data):
+    """
+    Build an (ISO year, ISO week) index over a journey frame.
+    
+    Week keys are computed once with a vectorized dt.isocalendar() and
+    argsorted, so the journeys of any week can then be sliced with a binary
+    search (see get_iso_week_journeys).
+    
+    Parameters:
+    - journey_data: DataFrame with journey information
+    
+    Returns a dictionary with the parsed dates, the sort order and the sorted week keys
+    """
+    dates = pd.to_datetime(journey_data['Date'])
+    iso = dates.dt.isocalendar()
+    # Encode (year, week) as year * 100 + week; journeys without a date get key 0
+    keys = (iso['year'].fillna(0).astype('int64') * 100 + iso['week'].fillna(0).astype('int64')).to_numpy()
+    order = np.argsort(keys, kind='stable')
+    return {
+        'dates': dates,
+        'order': order,
+        'sorted_keys': keys[order]
+    }
+
+def get_iso_week_journeys(journey_data, week_index, iso_year, iso_week):
+    """
+    Return the journeys of one ISO week, using an index from build_iso_week_index.
+    
+    The returned frame keeps the original row order and has its Date column
+    as datetimes.
+    """
+    key = iso_year * 100 + iso_week
+    start, end = np.searchsorted(week_index['sorted_keys'], [key, key + 1])
+    positions = week_index['order'][start:end]
+    return journey_data.iloc[positions].assign(Date=week_index['dates'].iloc[positions])
+
+def build_weekly_challenge_features(week_journeys, previous_week_journeys=None, previous_week_co2=None):
+    """
+    Compute the per-week features shared by all eco-challenge evaluators.
+    
+    Everything the evaluators need (efficiency, CO2, hour, weekday and daily
+    sums) is derived in a single pass over the week's journeys, so evaluating
+    any number of active challenges costs one pass rather than one each.
+    
+    Parameters:
+    - week_journeys: DataFrame with the journeys of the challenge week (Date as datetimes)
+    - previous_week_journeys: DataFrame with the journeys of the week before (optional)
+    - previous_week_co2: CO2 total of the week before, e.g. from the weekly rollup
+      (optional, used instead of previous_week_journeys)
+    
+    Returns a dictionary of feature frames and totals
+    """
+    dates = week_journeys['Date']
+    distance = week_journeys['Distance']
+    fuel = week_journeys['Fuel_Consumption'] if 'Fuel_Consumption' in week_journeys.columns else pd.Series(np.nan, index=week_journeys.index)
+    has_fuel = fuel.notna() & (fuel > 0)
+    
+    journeys = pd.DataFrame({
+        'Date': dates,
+        'Day': dates.dt.date,
+        'Distance': distance,
+        'Fuel_Consumption': fuel,
+        'Has_Fuel': has_fuel,
+        'Efficiency': (distance / fuel).where(has_fuel),
+        'CO2': calculate_co2_emissions_series(distance, fuel),
+        'Hour': dates.dt.hour,
+        'Weekday': dates.dt.dayofweek
+    })
+    if 'Purpose' in week_journeys.columns:
+        journeys['Purpose'] = week_journeys['Purpose']
+    if 'Category' in week_journeys.columns:
+        journeys['Category'] = week_journeys['Category']
+    
+    fuel_journeys = journeys[has_fuel]
+    
+    daily_aggregations = {'Distance': ('Distance', 'sum'), 'CO2': ('CO2', 'sum')}
+    if 'Purpose' in journeys.columns:
+        daily_aggregations['Purposes'] = ('Purpose', 'nunique')
+    daily = journeys.groupby('Day').agg(**daily_aggregations)
+    
+    daily_fuel = fuel_journeys.groupby('Day')[['Distance', 'Fuel_Consumption']].sum()
+    daily_efficiency = (daily_fuel['Distance'] / daily_fuel['Fuel_Consumption']).where(daily_fuel['Fuel_Consumption'] > 0, 0)
+    
+    if previous_week_co2 is None and previous_week_journeys is not None and not previous_week_journeys.empty:
+        previous_week_co2 = calculate_co2_emissions_series(
+            previous_week_journeys['Distance'], previous_week_journeys.get('Fuel_Consumption')
+        ).sum()
+    
+    return {
+        'journeys': journeys,
+        'fuel_journeys': fuel_journeys,
+        'daily': daily,
+        'daily_efficiency': daily_efficiency,
+        'total_distance': distance.sum(),
+        'total_fuel': fuel.sum(),
+        'total_co2': journeys['CO2'].sum(),
+        'previous_week_co2': previous_week_co2
+    }
+
+def _longest_true_run(flags):
+    """Return the length of the longest run of consecutive True values in a boolean array."""
+    padded = np.concatenate(([False], np.asarray(flags, dtype=bool), [False])).astype(np.int8)
+    edges = np.diff(padded)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return int((ends - starts).max()) if len(starts) else 0
+
+def _evaluate_average_efficiency(challenge, features):
+    """efficiency_1: average km/L over the week's journeys with fuel data."""
+    journeys_with_fuel = features['fuel_journeys']
+    if not journeys_with_fuel.empty:
+        total_distance = journeys_with_fuel['Distance'].sum()
+        total_fuel = journeys_with_fuel['Fuel_Consumption'].sum()
+        avg_efficiency = total_distance / total_fuel if total_fuel > 0 else 0
+        
+        # Update progress (as percentage of target)
+        target = challenge['target']
+        progress = min(100, (avg_efficiency / target) * 100)
+        challenge['progress'] = round(progress)
+        challenge['current_value'] = round(avg_efficiency, 2)
+        
+        # Check if completed
+        if avg_efficiency >= target:
+            challenge['completed'] = True
+
+def _evaluate_best_efficiency(challenge, journeys):
+    """Update a challenge from the best efficiency among the given journeys."""
+    if not journeys.empty:
+        best_efficiency = journeys['Efficiency'].max()
+        
+        # Update progress (as percentage of target)
+        target = challenge['target']
+        progress = min(100, (best_efficiency / target) * 100)
+        challenge['progress'] = round(progress)
+        challenge['current_value'] = round(best_efficiency, 2)
+        
+        # Check if completed
+        if best_efficiency >= target:
+            challenge['completed'] = True
+
+def _evaluate_highway_efficiency(challenge, features):
+    """efficiency_2: best km/L on a highway journey (assumption: distance >= 20km)."""
+    journeys_with_fuel = features['fuel_journeys']
+    _evaluate_best_efficiency(challenge, journeys_with_fuel[journeys_with_fuel['Distance'] >= 20])
+
+def _evaluate_city_efficiency(challenge, features):
+    """efficiency_3: best km/L on a city journey (assumption: 5km <= distance < 20km)."""
+    journeys_with_fuel = features['fuel_journeys']
+    _evaluate_best_efficiency(challenge, journeys_with_fuel[
+        (journeys_with_fuel['Distance'] >= 5) & (journeys_with_fuel['Distance'] < 20)
+    ])
+
+def _evaluate_carbon_reduction(challenge, features):
+    """reduction_1: CO2 reduction compared to the previous week."""
+    prev_week_co2 = features['previous_week_co2']
+    if prev_week_co2 is not None and prev_week_co2 > 0:
+        reduction_factor = 1 - (features['total_co2'] / prev_week_co2)
+        
+        # Update progress (percentage of target reduction)
+        target = 1 - challenge['target']  # Target is expressed as reduction percentage
+        progress = min(100, (reduction_factor / target) * 100)
+        challenge['progress'] = max(0, round(progress))  # Ensure progress isn't negative
+        challenge['current_value'] = round(reduction_factor * 100, 1)  # Store as percentage
+        
+        # Check if completed
+        if reduction_factor >= target:
+            challenge['completed'] = True
+
+def _evaluate_distance_with_limited_fuel(challenge, features):
+    """reduction_2: travel a target distance within a fuel budget."""
+    total_distance = features['total_distance']
+    total_fuel = features['total_fuel']
+    
+    # Update progress (percentage of target distance)
+    distance_target = challenge['target']
+    fuel_limit = challenge['max_fuel']
+    
+    distance_progress = min(100, (total_distance / distance_target) * 100)
+    challenge['progress'] = round(distance_progress)
+    challenge['current_value'] = round(total_distance, 1)
+    challenge['current_fuel'] = round(total_fuel, 2)
+    
+    # Check if completed
+    if total_distance >= distance_target and total_fuel <= fuel_limit:
+        challenge['completed'] = True
+
+def _evaluate_minimal_impact_day(challenge, features):
+    """reduction_3: a day whose journeys total under the CO2 target."""
+    daily_co2 = features['daily']['CO2']
+    if not daily_co2.empty:
+        min_daily_co2 = daily_co2.min()
+        
+        # Update progress (reversed percentage of target - lower is better)
+        target = challenge['target']
+        progress = min(100, (target / max(min_daily_co2, 0.1)) * 100)
+        challenge['progress'] = round(progress)
+        challenge['current_value'] = round(min_daily_co2, 2)
+        
+        # Check if completed
+        if min_daily_co2 <= target:
+            challenge['completed'] = True
+
+def _evaluate_efficiency_variation(challenge, features):
+    """consistency_1: spread of efficiency across the week's journeys."""
+    efficiency = features['fuel_journeys']['Efficiency']
+    
+    if len(efficiency) >= 3:  # Need at least 3 journeys to calculate variation
+        max_eff = efficiency.max()
+        min_eff = efficiency.min()
+        avg_eff = efficiency.mean()
+        
+        # Calculate variation as (max-min)/avg
+        if avg_eff > 0:
+            variation = (max_eff - min_eff) / avg_eff
+            
+            # Update progress (reversed percentage of target - lower variation is better)
+            target = challenge['target']
+            progress = min(100, (target / max(variation, 0.01)) * 100)
+            challenge['progress'] = round(progress)
+            challenge['current_value'] = round(variation * 100, 1)  # Store as percentage
+            
+            # Check if completed
+            if variation <= target:
+                challenge['completed'] = True
+
+def _evaluate_efficiency_streak(challenge, features):
+    """consistency_2: consecutive journeys at or above the target efficiency."""
+    journeys_with_fuel = features['fuel_journeys']
+    
+    if not journeys_with_fuel.empty:
+        # Longest streak of journeys (in date order) with efficiency >= target
+        efficiency = journeys_with_fuel.sort_values('Date')['Efficiency'].to_numpy()
+        max_streak = _longest_true_run(efficiency >= challenge['target'])
+        
+        # Update progress
+        target_streak = challenge['streak']
+        progress = min(100, (max_streak / target_streak) * 100)
+        challenge['progress'] = round(progress)
+        challenge['current_value'] = max_streak
+        
+        # Check if completed
+        if max_streak >= target_streak:
+            challenge['completed'] = True
+
+def _evaluate_daily_improvement(challenge, features):
+    """consistency_3: consecutive days of improving average efficiency."""
+    daily_efficiency = features['daily_efficiency']
+    
+    if not daily_efficiency.empty:
+        # Longest run of day-over-day improvements; add 1 since we're counting transitions
+        improvements = np.diff(daily_efficiency.sort_index().to_numpy()) > 0
+        max_streak = _longest_true_run(improvements) + 1
+        
+        # Update progress
+        target_days = challenge['target']
+        progress = min(100, (max_streak / target_days) * 100)
+        challenge['progress'] = round(progress)
+        challenge['current_value'] = max_streak
+        
+        # Check if completed
+        if max_streak >= target_days:
+            challenge['completed'] = True
+
+def _evaluate_errand_combiner(challenge, features):
+    """planning_1: several purposes in one day within a distance budget."""
+    daily = features['daily']
+    
+    max_purposes = 0
+    has_qualifying_day = False
+    
+    if 'Purposes' in daily.columns:
+        qualifying = daily[(daily['Purposes'] >= challenge['target']) & (daily['Distance'] <= challenge['max_distance'])]
+        if not qualifying.empty:
+            has_qualifying_day = True
+            max_purposes = int(qualifying['Purposes'].max())
+    
+    # Update progress (based on number of purposes)
+    target_purposes = challenge['target']
+    progress = min(100, (max_purposes / target_purposes) * 100)
+    challenge['progress'] = round(progress)
+    challenge['current_value'] = max_purposes
+    
+    # Check if completed
+    if has_qualifying_day:
+        challenge['completed'] = True
+
+def _evaluate_rush_hour_avoider(challenge, features):
+    """planning_2: share of weekday journeys outside peak hours (7-9am, 4-6pm)."""
+    journeys = features['journeys']
+    hours = journeys['Hour'][journeys['Weekday'] < 5]  # Monday to Friday
+    
+    total_journeys = len(hours)
+    if total_journeys > 0:
+        is_rush_hour = ((hours >= 7) & (hours < 9)) | ((hours >= 16) & (hours < 18))
+        non_rush_percentage = ((~is_rush_hour).sum() / total_journeys) * 100
+        
+        # Update progress
+        challenge['progress'] = round(non_rush_percentage)
+        challenge['current_value'] = round(non_rush_percentage, 1)
+        
+        # Check if completed
+        if non_rush_percentage >= challenge['target']:
+            challenge['completed'] = True
+
+def _evaluate_weekend_warrior(challenge, features):
+    """planning_3: share of shopping/errand journeys made at the weekend."""
+    journeys = features['journeys']
+    shopping_categories = ['Shopping', 'Errands', 'Groceries']
+    
+    if 'Category' in journeys.columns:
+        is_shopping = journeys['Category'].isin(shopping_categories)
+    elif 'Purpose' in journeys.columns:
+        # Try to identify shopping journeys by purpose if category not available
+        is_shopping = journeys['Purpose'].str.contains('|'.join(shopping_categories), case=False, na=False)
+    else:
+        return
+    
+    total_shopping = int(is_shopping.sum())
+    if total_shopping > 0:
+        weekend_shopping = int((is_shopping & (journeys['Weekday'] >= 5)).sum())  # Saturday and Sunday
+        
+        # Calculate percentage of weekend shopping
+        weekend_percentage = (weekend_shopping / total_shopping) * 100
+        
+        # Update progress
+        challenge['progress'] = round(weekend_percentage)
+        challenge['current_value'] = round(weekend_percentage, 1)
+        
+        # Check if completed
+        if weekend_percentage >= challenge['target']:
+            challenge['completed'] = True
+
+# Eco-challenge evaluators by challenge id. Each is called as
+# evaluator(challenge, features) with the output of build_weekly_challenge_features
+# and updates the challenge's progress in place.
+CHALLENGE_EVALUATORS = {
+    'efficiency_1': _evaluate_average_efficiency,
+    'efficiency_2': _evaluate_highway_efficiency,
+    'efficiency_3': _evaluate_city_efficiency,
+    'reduction_1': _evaluate_carbon_reduction,
+    'reduction_2': _evaluate_distance_with_limited_fuel,
+    'reduction_3': _evaluate_minimal_impact_day,
+    'consistency_1': _evaluate_efficiency_variation,
+    'consistency_2': _evaluate_efficiency_streak,
+    'consistency_3': _evaluate_daily_improvement,
+    'planning_1': _evaluate_errand_combiner,
+    'planning_2': _evaluate_rush_hour_avoider,
+    'planning_3': _evaluate_weekend_warrior
+}
+
+def update_eco_challenge_progress(challenges, journey_data, current_week=None, current_year=None, weekly_rollup=None):
     """
     Update progress for the active eco-challenges
     
@@ -1377,15 +4160,20 @@ def update_eco_challenge_progress(challenges, journey_data, current_week=None):
     - challenges: List of active eco-challenges
     - journey_data: DataFrame with journey information
     - current_week: Current ISO week number (optional)
+    - current_year: ISO year of current_week (optional, defaults to the current ISO year)
+    - weekly_rollup: Weekly rollup from get_rollup('weekly') (optional); when given,
+      the previous week's totals are read from it instead of from journey_data
     
     Returns updated challenges list
     """
     import datetime
-    import pandas as pd
     
-    # Set current week if not provided
+    # Set current week and year if not provided
+    today_iso = datetime.date.today().isocalendar()
     if current_week is None:
-        current_week = datetime.datetime.now().isocalendar()[1]
+        current_week = today_iso[1]
+    if current_year is None:
+        current_year = today_iso[0]
     
     # Filter for only the current week's challenges
     current_challenges = [c for c in challenges if c.get('week_id') == current_week]
@@ -1393,344 +4181,37 @@ def update_eco_challenge_progress(challenges, journey_data, current_week=None):
     if not current_challenges or journey_data.empty:
         return challenges
     
-    # Ensure we have datetime for Date column
-    df = journey_data.copy()
-    df['Date'] = pd.to_datetime(df['Date'])
-    
-    # Filter for only journeys from this week
-    this_week_mask = df['Date'].apply(lambda d: d.isocalendar()[1] == current_week)
-    this_week_journeys = df[this_week_mask]
+    # Index the journeys by ISO (year, week) once, then slice weeks from it
+    week_index = build_iso_week_index(journey_data)
+    this_week_journeys = get_iso_week_journeys(journey_data, week_index, current_year, current_week)
     
     if this_week_journeys.empty:
         return challenges
     
+    # Get previous ISO week (handles year boundaries and 53-week years)
+    prev_year, prev_week, _ = (
+        datetime.date.fromisocalendar(current_year, current_week, 1) - datetime.timedelta(days=7)
+    ).isocalendar()
+    if weekly_rollup is not None:
+        previous_week = weekly_rollup[weekly_rollup['Period'] == f"{prev_year}-W{prev_week:02d}"]
+        prev_week_journeys = None
+        prev_week_co2 = previous_week['CO2'].sum() if not previous_week.empty else None
+    else:
+        prev_week_journeys = get_iso_week_journeys(journey_data, week_index, prev_year, prev_week)
+        prev_week_co2 = None
+    
+    # Compute the week's features once and share them between all evaluators
+    features = build_weekly_challenge_features(this_week_journeys, prev_week_journeys, prev_week_co2)
+    
     # Process each active challenge
     for challenge in current_challenges:
-        challenge_type = challenge.get('type', '')
-        challenge_id = challenge.get('id', '')
-        
         # Skip already completed challenges
         if challenge.get('completed', False):
             continue
         
-        # Handle efficiency challenges
-        if challenge_type == 'efficiency':
-            if challenge_id == 'efficiency_1':  # Average efficiency
-                journeys_with_fuel = this_week_journeys[this_week_journeys['Fuel_Consumption'].notna() & (this_week_journeys['Fuel_Consumption'] > 0)]
-                if not journeys_with_fuel.empty:
-                    total_distance = journeys_with_fuel['Distance'].sum()
-                    total_fuel = journeys_with_fuel['Fuel_Consumption'].sum()
-                    avg_efficiency = total_distance / total_fuel if total_fuel > 0 else 0
-                    
-                    # Update progress (as percentage of target)
-                    target = challenge['target']
-                    progress = min(100, (avg_efficiency / target) * 100)
-                    challenge['progress'] = round(progress)
-                    challenge['current_value'] = round(avg_efficiency, 2)
-                    
-                    # Check if completed
-                    if avg_efficiency >= target:
-                        challenge['completed'] = True
-            
-            elif challenge_id == 'efficiency_2':  # Highway efficiency
-                # Identify highway journeys (assumption: distance >= 20km)
-                highway_journeys = this_week_journeys[(this_week_journeys['Distance'] >= 20) & 
-                                                     this_week_journeys['Fuel_Consumption'].notna() & 
-                                                     (this_week_journeys['Fuel_Consumption'] > 0)]
-                
-                if not highway_journeys.empty:
-                    # Calculate efficiency for each highway journey
-                    highway_journeys['Efficiency'] = highway_journeys['Distance'] / highway_journeys['Fuel_Consumption']
-                    best_efficiency = highway_journeys['Efficiency'].max()
-                    
-                    # Update progress (as percentage of target)
-                    target = challenge['target']
-                    progress = min(100, (best_efficiency / target) * 100)
-                    challenge['progress'] = round(progress)
-                    challenge['current_value'] = round(best_efficiency, 2)
-                    
-                    # Check if completed
-                    if best_efficiency >= target:
-                        challenge['completed'] = True
-            
-            elif challenge_id == 'efficiency_3':  # City efficiency
-                # Identify city journeys (assumption: 5km <= distance < 20km)
-                city_journeys = this_week_journeys[(this_week_journeys['Distance'] >= 5) & 
-                                                  (this_week_journeys['Distance'] < 20) & 
-                                                  this_week_journeys['Fuel_Consumption'].notna() & 
-                                                  (this_week_journeys['Fuel_Consumption'] > 0)]
-                
-                if not city_journeys.empty:
-                    # Calculate efficiency for each city journey
-                    city_journeys['Efficiency'] = city_journeys['Distance'] / city_journeys['Fuel_Consumption']
-                    best_efficiency = city_journeys['Efficiency'].max()
-                    
-                    # Update progress (as percentage of target)
-                    target = challenge['target']
-                    progress = min(100, (best_efficiency / target) * 100)
-                    challenge['progress'] = round(progress)
-                    challenge['current_value'] = round(best_efficiency, 2)
-                    
-                    # Check if completed
-                    if best_efficiency >= target:
-                        challenge['completed'] = True
-        
-        # Handle reduction challenges
-        elif challenge_type == 'reduction':
-            if challenge_id == 'reduction_1':  # Carbon reduction compared to previous week
-                # Get previous week number
-                prev_week = current_week - 1
-                if prev_week <= 0:  # Handle year boundary
-                    prev_week = 52
-                
-                # Filter for previous week's journeys
-                prev_week_mask = df['Date'].apply(lambda d: d.isocalendar()[1] == prev_week)
-                prev_week_journeys = df[prev_week_mask]
-                
-                if not prev_week_journeys.empty and not this_week_journeys.empty:
-                    # Calculate CO2 for both weeks
-                    prev_week_co2 = prev_week_journeys.apply(
-                        lambda row: calculate_co2_emissions(row['Distance'], row.get('Fuel_Consumption')),
-                        axis=1
-                    ).sum()
-                    
-                    this_week_co2 = this_week_journeys.apply(
-                        lambda row: calculate_co2_emissions(row['Distance'], row.get('Fuel_Consumption')),
-                        axis=1
-                    ).sum()
-                    
-                    if prev_week_co2 > 0:
-                        reduction_factor = 1 - (this_week_co2 / prev_week_co2)
-                        
-                        # Update progress (percentage of target reduction)
-                        target = 1 - challenge['target']  # Target is expressed as reduction percentage
-                        progress = min(100, (reduction_factor / target) * 100)
-                        challenge['progress'] = max(0, round(progress))  # Ensure progress isn't negative
-                        challenge['current_value'] = round(reduction_factor * 100, 1)  # Store as percentage
-                        
-                        # Check if completed
-                        if reduction_factor >= target:
-                            challenge['completed'] = True
-            
-            elif challenge_id == 'reduction_2':  # Distance with limited fuel
-                total_distance = this_week_journeys['Distance'].sum()
-                total_fuel = this_week_journeys['Fuel_Consumption'].sum()
-                
-                # Update progress (percentage of target distance)
-                distance_target = challenge['target']
-                fuel_limit = challenge['max_fuel']
-                
-                distance_progress = min(100, (total_distance / distance_target) * 100)
-                challenge['progress'] = round(distance_progress)
-                challenge['current_value'] = round(total_distance, 1)
-                challenge['current_fuel'] = round(total_fuel, 2)
-                
-                # Check if completed
-                if total_distance >= distance_target and total_fuel <= fuel_limit:
-                    challenge['completed'] = True
-            
-            elif challenge_id == 'reduction_3':  # Minimal impact day
-                # Group journeys by date and calculate daily CO2
-                daily_journeys = this_week_journeys.groupby(this_week_journeys['Date'].dt.date)
-                
-                min_daily_co2 = float('inf')
-                for day, day_journeys in daily_journeys:
-                    daily_co2 = day_journeys.apply(
-                        lambda row: calculate_co2_emissions(row['Distance'], row.get('Fuel_Consumption')),
-                        axis=1
-                    ).sum()
-                    
-                    if daily_co2 < min_daily_co2:
-                        min_daily_co2 = daily_co2
-                
-                if min_daily_co2 < float('inf'):
-                    # Update progress (reversed percentage of target - lower is better)
-                    target = challenge['target']
-                    progress = min(100, (target / max(min_daily_co2, 0.1)) * 100)
-                    challenge['progress'] = round(progress)
-                    challenge['current_value'] = round(min_daily_co2, 2)
-                    
-                    # Check if completed
-                    if min_daily_co2 <= target:
-                        challenge['completed'] = True
-        
-        # Handle consistency challenges
-        elif challenge_type == 'consistency':
-            if challenge_id == 'consistency_1':  # Efficiency variation
-                journeys_with_fuel = this_week_journeys[this_week_journeys['Fuel_Consumption'].notna() & (this_week_journeys['Fuel_Consumption'] > 0)]
-                
-                if len(journeys_with_fuel) >= 3:  # Need at least 3 journeys to calculate variation
-                    # Calculate efficiency for each journey
-                    journeys_with_fuel['Efficiency'] = journeys_with_fuel['Distance'] / journeys_with_fuel['Fuel_Consumption']
-                    
-                    max_eff = journeys_with_fuel['Efficiency'].max()
-                    min_eff = journeys_with_fuel['Efficiency'].min()
-                    avg_eff = journeys_with_fuel['Efficiency'].mean()
-                    
-                    # Calculate variation as (max-min)/avg
-                    if avg_eff > 0:
-                        variation = (max_eff - min_eff) / avg_eff
-                        
-                        # Update progress (reversed percentage of target - lower variation is better)
-                        target = challenge['target']
-                        progress = min(100, (target / max(variation, 0.01)) * 100)
-                        challenge['progress'] = round(progress)
-                        challenge['current_value'] = round(variation * 100, 1)  # Store as percentage
-                        
-                        # Check if completed
-                        if variation <= target:
-                            challenge['completed'] = True
-            
-            elif challenge_id == 'consistency_2':  # Efficiency streak
-                journeys_with_fuel = this_week_journeys[this_week_journeys['Fuel_Consumption'].notna() & (this_week_journeys['Fuel_Consumption'] > 0)]
-                
-                if not journeys_with_fuel.empty:
-                    # Calculate efficiency for each journey
-                    journeys_with_fuel = journeys_with_fuel.sort_values('Date')
-                    journeys_with_fuel['Efficiency'] = journeys_with_fuel['Distance'] / journeys_with_fuel['Fuel_Consumption']
-                    
-                    # Find longest streak of journeys with efficiency >= target
-                    target_efficiency = challenge['target']
-                    target_streak = challenge['streak']
-                    
-                    current_streak = 0
-                    max_streak = 0
-                    
-                    for _, journey in journeys_with_fuel.iterrows():
-                        if journey['Efficiency'] >= target_efficiency:
-                            current_streak += 1
-                            max_streak = max(max_streak, current_streak)
-                        else:
-                            current_streak = 0
-                    
-                    # Update progress
-                    progress = min(100, (max_streak / target_streak) * 100)
-                    challenge['progress'] = round(progress)
-                    challenge['current_value'] = max_streak
-                    
-                    # Check if completed
-                    if max_streak >= target_streak:
-                        challenge['completed'] = True
-            
-            elif challenge_id == 'consistency_3':  # Daily improvement
-                journeys_with_fuel = this_week_journeys[this_week_journeys['Fuel_Consumption'].notna() & (this_week_journeys['Fuel_Consumption'] > 0)]
-                
-                if not journeys_with_fuel.empty:
-                    # Group by day and calculate average efficiency
-                    daily_journeys = journeys_with_fuel.groupby(journeys_with_fuel['Date'].dt.date)
-                    daily_efficiency = {}
-                    
-                    for day, day_journeys in daily_journeys:
-                        total_distance = day_journeys['Distance'].sum()
-                        total_fuel = day_journeys['Fuel_Consumption'].sum()
-                        daily_efficiency[day] = total_distance / total_fuel if total_fuel > 0 else 0
-                    
-                    # Sort days and check for consecutive improvements
-                    sorted_days = sorted(daily_efficiency.keys())
-                    
-                    current_streak = 0
-                    max_streak = 0
-                    
-                    for i in range(1, len(sorted_days)):
-                        if daily_efficiency[sorted_days[i]] > daily_efficiency[sorted_days[i-1]]:
-                            current_streak += 1
-                            max_streak = max(max_streak, current_streak)
-                        else:
-                            current_streak = 0
-                    
-                    # Add 1 to max_streak since we're counting transitions
-                    max_streak += 1
-                    
-                    # Update progress
-                    target_days = challenge['target']
-                    progress = min(100, (max_streak / target_days) * 100)
-                    challenge['progress'] = round(progress)
-                    challenge['current_value'] = max_streak
-                    
-                    # Check if completed
-                    if max_streak >= target_days:
-                        challenge['completed'] = True
-        
-        # Handle planning challenges
-        elif challenge_type == 'planning':
-            if challenge_id == 'planning_1':  # Errand combiner
-                # Group journeys by day
-                daily_journeys = this_week_journeys.groupby(this_week_journeys['Date'].dt.date)
-                
-                max_purposes = 0
-                has_qualifying_day = False
-                
-                for day, day_journeys in daily_journeys:
-                    # Check unique purposes
-                    if 'Purpose' in day_journeys.columns:
-                        unique_purposes = day_journeys['Purpose'].nunique()
-                        day_distance = day_journeys['Distance'].sum()
-                        
-                        if unique_purposes >= challenge['target'] and day_distance <= challenge['max_distance']:
-                            has_qualifying_day = True
-                            max_purposes = max(max_purposes, unique_purposes)
-                
-                # Update progress (based on number of purposes)
-                target_purposes = challenge['target']
-                progress = min(100, (max_purposes / target_purposes) * 100)
-                challenge['progress'] = round(progress)
-                challenge['current_value'] = max_purposes
-                
-                # Check if completed
-                if has_qualifying_day:
-                    challenge['completed'] = True
-            
-            elif challenge_id == 'planning_2':  # Rush hour avoider
-                weekday_journeys = this_week_journeys[this_week_journeys['Date'].dt.dayofweek < 5]  # Monday to Friday
-                
-                if not weekday_journeys.empty:
-                    # Check if journeys are outside rush hours
-                    weekday_journeys['Hour'] = weekday_journeys['Date'].dt.hour
-                    
-                    total_journeys = len(weekday_journeys)
-                    non_rush_journeys = len(weekday_journeys[
-                        ~((weekday_journeys['Hour'] >= 7) & (weekday_journeys['Hour'] < 9)) &
-                        ~((weekday_journeys['Hour'] >= 16) & (weekday_journeys['Hour'] < 18))
-                    ])
-                    
-                    # Calculate percentage of non-rush hour journeys
-                    if total_journeys > 0:
-                        non_rush_percentage = (non_rush_journeys / total_journeys) * 100
-                        
-                        # Update progress
-                        challenge['progress'] = round(non_rush_percentage)
-                        challenge['current_value'] = round(non_rush_percentage, 1)
-                        
-                        # Check if completed
-                        if non_rush_percentage >= challenge['target']:
-                            challenge['completed'] = True
-            
-            elif challenge_id == 'planning_3':  # Weekend warrior
-                # Filter for shopping/errand journeys
-                shopping_categories = ['Shopping', 'Errands', 'Groceries']
-                
-                if 'Category' in this_week_journeys.columns:
-                    shopping_journeys = this_week_journeys[this_week_journeys['Category'].isin(shopping_categories)]
-                elif 'Purpose' in this_week_journeys.columns:
-                    # Try to identify shopping journeys by purpose if category not available
-                    shopping_journeys = this_week_journeys[this_week_journeys['Purpose'].str.contains('|'.join(shopping_categories), case=False, na=False)]
-                else:
-                    shopping_journeys = pd.DataFrame()
-                
-                if not shopping_journeys.empty:
-                    total_shopping = len(shopping_journeys)
-                    weekend_shopping = len(shopping_journeys[shopping_journeys['Date'].dt.dayofweek >= 5])  # Saturday and Sunday
-                    
-                    # Calculate percentage of weekend shopping
-                    weekend_percentage = (weekend_shopping / total_shopping) * 100 if total_shopping > 0 else 0
-                    
-                    # Update progress
-                    challenge['progress'] = round(weekend_percentage)
-                    challenge['current_value'] = round(weekend_percentage, 1)
-                    
-                    # Check if completed
-                    if weekend_percentage >= challenge['target']:
-                        challenge['completed'] = True
+        evaluator = CHALLENGE_EVALUATORS.get(challenge.get('id', ''))
+        if evaluator is not None:
+            evaluator(challenge, features)
     
     return challenges
 
@@ -1800,8 +4281,68 @@ def generate_leaderboard_data(user_points=0):
     
     return leaderboard
 
+# LRU cache of calculate_statistics results, keyed by a fingerprint of the journey data
+STATISTICS_CACHE_SIZE = 8
+_statistics_cache = OrderedDict()
+_statistics_cache_lock = threading.Lock()
+_statistics_cache_stats = {'hits': 0, 'misses': 0}
+
+def _frame_fingerprint(df):
+    """Return a content hash of a DataFrame (columns, index and values)."""
+    row_hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    digest = hashlib.blake2b(row_hashes.tobytes(), digest_size=16)
+    digest.update('\x1f'.join(map(str, df.columns)).encode('utf-8'))
+    return digest.hexdigest()
+
+def clear_statistics_cache(path=None, new_rows=None):
+    """Drop all memoized statistics. Registered as a data change hook, hence the unused parameters."""
+    with _statistics_cache_lock:
+        _statistics_cache.clear()
+
+register_data_change_hook(clear_statistics_cache)
+
+def get_statistics_cache_stats():
+    """Return hit/miss counters and the number of entries of the statistics cache."""
+    with _statistics_cache_lock:
+        return {
+            'hits': _statistics_cache_stats['hits'],
+            'misses': _statistics_cache_stats['misses'],
+            'entries': len(_statistics_cache)
+        }
+
 def calculate_statistics(df):
-    """Calculate journey statistics."""
+    """
+    Calculate journey statistics.
+    
+    Results are memoized by a content hash of the journey data, keeping the
+    STATISTICS_CACHE_SIZE most recently used, and dropped whenever journeys
+    are saved. The returned dictionary is shared between callers, so treat
+    it as read-only.
+    """
+    key = _frame_fingerprint(df)
+    with _statistics_cache_lock:
+        if key in _statistics_cache:
+            _statistics_cache.move_to_end(key)
+            _statistics_cache_stats['hits'] += 1
+            return _statistics_cache[key]
+    
+    stats = _compute_statistics(df)
+    
+    with _statistics_cache_lock:
+        _statistics_cache_stats['misses'] += 1
+        _statistics_cache[key] = stats
+        while len(_statistics_cache) > STATISTICS_CACHE_SIZE:
+            _statistics_cache.popitem(last=False)
+    
+    return stats
+
+def _compute_statistics(df):
+    """
+    Calculate journey statistics without consulting the cache.
+    
+    The journey frame is only read: derived values such as the month of each
+    journey are kept in separate Series, never added as columns to df.
+    """
     stats = {
         'total_journeys': len(df),
         'total_distance': df['Distance'].sum(),
@@ -1825,18 +4366,18 @@ def calculate_statistics(df):
     
     # Calculate CO2 emissions
     # Sum of individual journey emissions
-    stats['co2_emissions'] = df.apply(
-        lambda row: calculate_co2_emissions(row['Distance'], row.get('Fuel_Consumption')),
-        axis=1
-    ).sum()
+    stats['co2_emissions'] = calculate_co2_emissions_series(df['Distance'], df.get('Fuel_Consumption')).sum()
     
     # Calculate carbon offset options
     stats['carbon_offset_options'] = calculate_carbon_offset_options(stats['co2_emissions'])
     
-    # Calculate monthly distance
-    df['Month'] = pd.to_datetime(df['Date']).dt.strftime('%Y-%m')
-    monthly_distance = df.groupby('Month')['Distance'].sum().reset_index()
-    stats['monthly_distance'] = monthly_distance
+    # Calculate monthly distance, grouping by a month key rather than a new column
+    months = pd.to_datetime(df['Date']).dt.to_period('M')
+    monthly_distance = df['Distance'].groupby(months).sum()
+    stats['monthly_distance'] = pd.DataFrame({
+        'Month': monthly_distance.index.strftime('%Y-%m'),
+        'Distance': monthly_distance.to_numpy()
+    })
     
     # Calculate stats by category if available
     if 'Category' in df.columns:
@@ -1853,3 +4394,163 @@ def calculate_statistics(df):
     stats['driving_patterns'] = analyze_driving_patterns(df)
     
     return stats
+
+def _pack_fleet_buffers(frames):
+    """
+    Pack the analysis columns of several vehicles' journeys into shared
+    memory blocks, one block per column with the vehicles back to back.
+    
+    Text columns are stored as integer codes into label lists shared by all
+    vehicles, and dates as datetime64[ns] integers, so workers rebuild their
+    frames from plain NumPy buffers instead of unpickling DataFrames. The
+    layout and label lists reach each worker process once, through the pool
+    initializer (see _init_fleet_worker).
+    
+    Returns (blocks, layout, labels, spans): the SharedMemory blocks (the
+    caller closes and unlinks them), {column: (block name, dtype)},
+    {column: labels} and {vehicle: (start, stop)}
+    """
+    combined = pd.concat(list(frames.values()), ignore_index=True) if frames else pd.DataFrame(columns=ANALYSIS_COLUMNS)
+    spans = {}
+    start = 0
+    for vehicle, df in frames.items():
+        spans[vehicle] = (start, start + len(df))
+        start += len(df)
+    
+    columns = {
+        'Date': pd.to_datetime(combined['Date']).to_numpy(dtype='datetime64[ns]').view(np.int64),
+        'Distance': pd.to_numeric(combined['Distance'], errors='coerce').to_numpy(dtype=float),
+        'Fuel_Consumption': pd.to_numeric(combined['Fuel_Consumption'], errors='coerce').to_numpy(dtype=float),
+        'Cost': pd.to_numeric(combined['Cost'], errors='coerce').to_numpy(dtype=float)
+    }
+    labels = {}
+    for column in ('Purpose', 'Category'):
+        codes, uniques = pd.factorize(combined[column])
+        columns[column] = codes.astype(np.int32)
+        labels[column] = list(uniques)
+    
+    blocks = []
+    layout = {}
+    try:
+        for column, values in columns.items():
+            block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            blocks.append(block)
+            np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+            layout[column] = (block.name, values.dtype.str)
+    except BaseException:
+        for block in blocks:
+            block.close()
+            block.unlink()
+        raise
+    
+    return blocks, layout, labels, spans
+
+# Shared buffer layout and label lists of the fleet report, set once in each
+# worker process by _init_fleet_worker
+_fleet_worker_state = {}
+
+def _init_fleet_worker(layout, labels):
+    """Pool initializer: keep the fleet buffer layout and label lists for this worker's tasks."""
+    _fleet_worker_state['layout'] = layout
+    _fleet_worker_state['labels'] = labels
+
+def _unpack_fleet_frame(start, stop, layout, labels):
+    """Rebuild one vehicle's analysis frame from the shared fleet buffers."""
+    data = {}
+    for column, (name, dtype) in layout.items():
+        block = shared_memory.SharedMemory(name=name)
+        try:
+            # Copy the slice out so the block can be closed straight away
+            data[column] = np.ndarray((stop,), dtype=dtype, buffer=block.buf)[start:stop].copy()
+        finally:
+            block.close()
+    
+    # Dates as load_data returns them, so results match the serial path exactly
+    data['Date'] = pd.Series(data['Date'].view('datetime64[ns]')).dt.date.to_numpy()
+    for column, column_labels in labels.items():
+        # Code -1 marks a missing value
+        data[column] = np.asarray(column_labels + [np.nan], dtype=object)[data[column]]
+    return pd.DataFrame(data)[ANALYSIS_COLUMNS]
+
+def _fleet_vehicle_statistics(start, stop):
+    """Worker entry point: statistics, driving patterns and route suggestions for one vehicle."""
+    return _compute_statistics(_unpack_fleet_frame(
+        start, stop, _fleet_worker_state['layout'], _fleet_worker_state['labels']
+    ))
+
+def _merge_fleet_statistics(vehicle_stats):
+    """Combine per-vehicle calculate_statistics results into fleet totals."""
+    fleet = {
+        'total_journeys': sum(stats['total_journeys'] for stats in vehicle_stats.values()),
+        'total_distance': float(sum(stats['total_distance'] for stats in vehicle_stats.values())),
+        'total_fuel': float(sum(stats['total_fuel'] for stats in vehicle_stats.values())),
+        'total_cost': float(sum(stats['total_cost'] for stats in vehicle_stats.values())),
+        'co2_emissions': float(sum(stats['co2_emissions'] for stats in vehicle_stats.values()))
+    }
+    # Distance driven on logged fuel, recovered from each vehicle's fuel economy
+    fuel_distance = sum(stats['fuel_economy'] * stats['total_fuel'] for stats in vehicle_stats.values())
+    fleet['fuel_economy'] = fuel_distance / fleet['total_fuel'] if fleet['total_fuel'] > 0 else 0
+    
+    monthly = [stats['monthly_distance'] for stats in vehicle_stats.values()]
+    categories = [stats['category_stats'] for stats in vehicle_stats.values() if 'category_stats' in stats]
+    fleet['monthly_distance'] = (pd.concat(monthly).groupby('Month')['Distance'].sum().reset_index()
+                                 if monthly else pd.DataFrame(columns=['Month', 'Distance']))
+    fleet['category_stats'] = (pd.concat(categories).groupby('Category')[['Distance', 'Cost']].sum().reset_index()
+                               if categories else pd.DataFrame(columns=['Category', 'Distance', 'Cost']))
+    return fleet
+
+def generate_fleet_report(vehicles=None, max_workers=None, compare_serial=False):
+    """
+    Calculate statistics, driving patterns and route suggestions for every
+    vehicle, in parallel worker processes.
+    
+    Each vehicle's journeys are analyzed in a ProcessPoolExecutor worker.
+    The journeys are handed over as shared-memory NumPy buffers (see
+    _pack_fleet_buffers). The text label lists are sent once per worker
+    process, so each task is just a (start, stop) row range and only the
+    results cross the process boundary per vehicle.
+    
+    Parameters:
+    - vehicles: vehicle ids to include (optional, defaults to all vehicles)
+    - max_workers: number of worker processes (optional, defaults to the CPU count)
+    - compare_serial: also run the same analysis serially in this process and
+      report the speedup
+    
+    Returns a dictionary with:
+    - vehicles: {vehicle: calculate_statistics results}
+    - fleet: merged totals, fuel economy, monthly_distance and category_stats
+    - timing: workers, parallel_seconds, and with compare_serial also
+      serial_seconds and speedup
+    """
+    vehicles = list_vehicles() if vehicles is None else [normalize_vehicle_id(vehicle) for vehicle in vehicles]
+    frames = {vehicle: load_data(columns=ANALYSIS_COLUMNS, vehicle=vehicle) for vehicle in vehicles}
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(frames)))
+    
+    started = time.perf_counter()
+    blocks, layout, labels, spans = _pack_fleet_buffers(frames)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_fleet_worker,
+                                 initargs=(layout, labels)) as executor:
+            futures = {
+                vehicle: executor.submit(_fleet_vehicle_statistics, start, stop)
+                for vehicle, (start, stop) in spans.items()
+            }
+            vehicle_stats = {vehicle: future.result() for vehicle, future in futures.items()}
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+    timing = {'workers': workers, 'parallel_seconds': time.perf_counter() - started}
+    
+    if compare_serial:
+        started = time.perf_counter()
+        for df in frames.values():
+            _compute_statistics(df.copy())
+        timing['serial_seconds'] = time.perf_counter() - started
+        timing['speedup'] = timing['serial_seconds'] / timing['parallel_seconds'] if timing['parallel_seconds'] > 0 else 0.0
+    
+    return {
+        'vehicles': vehicle_stats,
+        'fleet': _merge_fleet_statistics(vehicle_stats),
+        'timing': timing
+    }